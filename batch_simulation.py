@@ -0,0 +1,176 @@
+"""
+Batched Parameter Sweeps: Irreversible Heat Transfer
+====================================================
+Simulates many reservoir configurations at once. Every parameter may be an
+array; all cases advance together as 2-D (n_cases, n_steps) arrays instead of
+one IrreversibleHeatTransfer object per case.
+"""
+
+import numpy as np
+
+from irreversible_heat_transfer import (TRAJECTORY_FIELDS, equilibrium_temperature,
+                                        linear_trajectories)
+
+
+class BatchHeatTransfer:
+    """
+    Irreversible heat transfer for a whole batch of reservoir pairs.
+
+    Mirrors IrreversibleHeatTransfer: after run() the attributes T_hot,
+    T_cold, Q_transferred, S_gen_cumulative and heat_flux hold
+    (n_cases, n_steps) arrays, and the summary vectors S_gen_final,
+    Q_final, time_to_equilibrium and T_eq hold one value per case.
+    """
+
+    def __init__(self, T_hot_initial, T_cold_initial, h=50, mass_hot=1.0,
+                 mass_cold=1.0, c_p=1000, system_type="Closed",
+                 engine="Vectorized", dt=0.1, t_max=200):
+        """
+        Initialize the batch.
+
+        Parameters:
+        -----------
+        T_hot_initial, T_cold_initial : float or array_like
+            Initial reservoir temperatures (K)
+        h : float or array_like
+            Heat transfer coefficient (W/K)
+        mass_hot, mass_cold : float or array_like
+            Reservoir masses (kg)
+        c_p : float or array_like
+            Specific heat capacity (J/kg·K)
+        system_type : str
+            Type of system shared by all cases: 'Closed', 'Open', or 'Isolated'
+        engine : str
+            'Vectorized' (explicit Euler, same results as
+            IrreversibleHeatTransfer.step()) or 'Exact' (analytic solution)
+        dt : float
+            Time step (s)
+        t_max : float
+            Maximum time (s)
+
+        All array parameters are broadcast to a common 1-D shape (n_cases,).
+        """
+        if engine not in ("Vectorized", "Exact"):
+            raise ValueError(f"Unknown engine '{engine}', expected 'Vectorized' or 'Exact'")
+        params = np.broadcast_arrays(*(np.atleast_1d(np.asarray(p, dtype=float))
+                                       for p in (T_hot_initial, T_cold_initial, h,
+                                                 mass_hot, mass_cold, c_p)))
+        if params[0].ndim != 1:
+            raise ValueError("Batch parameters must broadcast to a 1-D array of cases")
+        (self.T_hot_0, self.T_cold_0, self.h,
+         self.m_hot, self.m_cold, self.c_p) = params
+        self.n_cases = len(self.T_hot_0)
+
+        self.system_type = system_type
+        self.engine = engine
+        self.dt = dt
+        self.t_max = t_max
+
+        self.time = np.arange(0, self.t_max, self.dt)
+        self.n_steps = len(self.time)
+        self.T_eq = equilibrium_temperature(self.T_hot_0, self.T_cold_0,
+                                            self.m_hot, self.m_cold, self.c_p)
+
+    def run(self, store_trajectories=True, chunk_size=64, equilibrium_tol=0.01,
+            fields=TRAJECTORY_FIELDS, decimate=1, out=None):
+        """
+        Simulate every case.
+
+        Parameters:
+        -----------
+        store_trajectories : bool
+            Keep the (n_cases, n_samples) arrays. Set to False for large
+            sweeps where only the summary vectors are needed; memory then
+            stays at O(chunk_size * n_steps).
+        chunk_size : int
+            Number of cases evaluated together; small chunks keep the
+            temporaries cache-resident
+        equilibrium_tol : float
+            |T_hot - T_cold| (K) below which a case counts as equilibrated
+        fields : sequence of str
+            Which of TRAJECTORY_FIELDS to store; the others are set to None
+        decimate : int
+            Store every decimate-th sample; the sample times are in time_samples
+        out : dict, optional
+            Preallocated (n_cases, n_samples) arrays to write the stored fields
+            into, e.g. views onto a shared-memory buffer
+        """
+        self.time_samples = self.time[::decimate]
+        stored = tuple(fields) if store_trajectories else ()
+        out = {} if out is None else out
+        for name in TRAJECTORY_FIELDS:
+            if name not in stored:
+                setattr(self, name, None)
+            elif name in out:
+                setattr(self, name, out[name])
+            else:
+                setattr(self, name, np.empty((self.n_cases, len(self.time_samples))))
+
+        self.S_gen_final = np.empty(self.n_cases)
+        self.Q_final = np.empty(self.n_cases)
+
+        h = self.h if self.system_type != "Isolated" else np.zeros(self.n_cases)
+        method = "Euler" if self.engine == "Vectorized" else "Exact"
+        self.time_to_equilibrium = self._time_to_equilibrium(h, method, equilibrium_tol)
+        for start in range(0, self.n_cases, chunk_size):
+            sl = slice(start, min(start + chunk_size, self.n_cases))
+            T_hot, T_cold, Q, S_gen, flux = linear_trajectories(
+                self.T_hot_0[sl], self.T_cold_0[sl], h[sl],
+                self.m_hot[sl] * self.c_p[sl], self.m_cold[sl] * self.c_p[sl],
+                self.dt, self.n_steps, method=method)
+            if method == "Euler":
+                # step() never evaluates the rate at the final sample
+                flux[:, -1] = 0.0
+
+            self.S_gen_final[sl] = S_gen[:, -1]
+            self.Q_final[sl] = Q[:, -1]
+
+            for name, values in zip(TRAJECTORY_FIELDS, (T_hot, T_cold, Q, S_gen, flux)):
+                if name in stored:
+                    getattr(self, name)[sl] = values[:, ::decimate]
+        return self
+
+    def _time_to_equilibrium(self, h, method, tol):
+        """
+        First sample time at which |T_hot - T_cold| <= tol, NaN if never reached.
+
+        |ΔT| decays by |1 - k*dt| per Euler step or exp(-k*dt) per exact step,
+        so the step count follows from a logarithm instead of a scan over
+        the trajectory. An Euler step with k*dt = 1 equilibrates in one step.
+        """
+        dT_0 = np.abs(self.T_hot_0 - self.T_cold_0)
+        k = h * (1 / (self.m_hot * self.c_p) + 1 / (self.m_cold * self.c_p))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if method == "Euler":
+                decay = np.abs(1 - k * self.dt)
+                log_decay = np.log(decay)
+            else:
+                log_decay = -k * self.dt
+            steps = np.ceil(np.log(tol / dT_0) / log_decay)
+        steps = np.where(log_decay < 0, steps, np.nan)
+        if method == "Euler":
+            # log(0) = -inf would give 0 steps
+            steps = np.where(decay == 0, 1.0, steps)
+        steps = np.where(dT_0 <= tol, 0.0, steps)
+        steps[steps > self.n_steps - 1] = np.nan
+        return steps * self.dt
+
+    def summary(self):
+        """Return the per-case summary vectors as a dict of arrays."""
+        return {
+            "T_eq": self.T_eq,
+            "S_gen_final": self.S_gen_final,
+            "Q_final": self.Q_final,
+            "time_to_equilibrium": self.time_to_equilibrium,
+        }
+
+
+def simulate_batch(T_hot_initial, T_cold_initial, h=50, mass_hot=1.0, mass_cold=1.0,
+                   c_p=1000, **kwargs):
+    """Convenience wrapper: build a BatchHeatTransfer and run it to completion."""
+    run_kwargs = {key: kwargs.pop(key) for key in
+                  ("store_trajectories", "chunk_size", "equilibrium_tol",
+                   "fields", "decimate", "out") if key in kwargs}
+    batch = BatchHeatTransfer(T_hot_initial, T_cold_initial, h, mass_hot, mass_cold,
+                              c_p, **kwargs)
+    return batch.run(**run_kwargs)
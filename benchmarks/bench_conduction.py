@@ -0,0 +1,60 @@
+"""
+Throughput benchmark: Crank–Nicolson conduction solver
+======================================================
+Builds bars and plates of increasing size, times the one-off sparse LU
+factorization and a number of time steps, and reports the stepping
+throughput in cell-steps per second.
+
+Usage:
+    python benchmarks/bench_conduction.py --steps 20
+    python benchmarks/bench_conduction.py --grids 1000000 1000x1000
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from conduction_solver import ConductionSolver
+
+
+def parse_grid(text):
+    """'1000' -> (1000,), '300x200' -> (300, 200)."""
+    return tuple(int(n) for n in text.lower().split("x"))
+
+
+def throughput(cells, steps, dt):
+    """(factorization seconds, cell-steps per second) for one grid."""
+    start = time.perf_counter()
+    solver = ConductionSolver(400, 300, cells=cells, dt=dt, t_max=dt * (steps + 1))
+    setup = time.perf_counter() - start
+    n_cells = solver.n_nodes - 2
+    first = solver.current_step
+    start = time.perf_counter()
+    while solver.step():
+        pass
+    elapsed = time.perf_counter() - start
+    # np.arange rounding in the solver's time grid can add or drop a step
+    return setup, n_cells * (solver.current_step - first) / elapsed
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Measure conduction solver throughput.")
+    parser.add_argument("--grids", nargs="+", default=["10000", "1000000", "100x100", "1000x1000"],
+                        help="grid sizes: nx for a bar, NXxNY for a plate")
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--dt", type=float, default=1.0)
+    args = parser.parse_args()
+
+    for text in args.grids:
+        cells = parse_grid(text)
+        setup, rate = throughput(cells, args.steps, args.dt)
+        print(f"{text:>10}: setup + factorization {setup:6.2f} s, "
+              f"{rate / 1e6:7.2f} M cell-steps/s")
+
+
+if __name__ == "__main__":
+    main()
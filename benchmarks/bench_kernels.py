@@ -0,0 +1,59 @@
+"""
+Step throughput benchmark: 'Python' vs 'Numba' backend of the Loop engine
+=========================================================================
+Runs the same explicit Euler simulation with both backends, once with
+constant properties and once with c_p(T) / h(T) tables, and reports steps
+per second. The Numba timings exclude the one-off JIT compilation.
+
+Usage:
+    python benchmarks/bench_kernels.py --t-max 20000
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from compiled_kernels import HAVE_NUMBA
+from irreversible_heat_transfer import IrreversibleHeatTransfer
+from material_properties import PropertyTable
+
+
+def steps_per_second(backend, t_max, tables):
+    """Best-of-three throughput of run_full_simulation()."""
+    kwargs = {}
+    if tables:
+        kwargs = dict(c_p_table=PropertyTable.from_polynomial([800, 0.8], 200, 600),
+                      h_table=PropertyTable.from_polynomial([20, 0.1], 200, 600))
+    sim = IrreversibleHeatTransfer(450, 250, engine="Loop", backend=backend, **kwargs)
+    sim.t_max = t_max
+    sim.run_full_simulation()  # warm-up (JIT compilation)
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        sim.run_full_simulation()
+        best = min(best, time.perf_counter() - start)
+    return (sim.n_steps - 1) / best
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare the Loop engine backends.")
+    parser.add_argument("--t-max", type=float, default=20000)
+    args = parser.parse_args()
+
+    if not HAVE_NUMBA:
+        print("Numba is not installed: the 'Numba' backend runs the kernel as plain Python")
+    for tables in (False, True):
+        label = "property tables" if tables else "constant properties"
+        rates = {backend: steps_per_second(backend, args.t_max, tables)
+                 for backend in ("Python", "Numba")}
+        print(f"{label}: Python {rates['Python'] / 1e6:7.3f} M steps/s, "
+              f"Numba {rates['Numba'] / 1e6:7.3f} M steps/s, "
+              f"speedup {rates['Numba'] / rates['Python']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
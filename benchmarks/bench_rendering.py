@@ -0,0 +1,64 @@
+"""
+Frame-time benchmark: 'Redraw' vs 'Blit' rendering of InteractiveVisualizer
+===========================================================================
+Replays the animation on the Agg backend and times one frame: five
+simulation steps plus the drawing work. 'Redraw' rebuilds all five axes and
+renders the whole figure; 'Blit' restores the cached background and redraws
+only the animated artists.
+
+Usage:
+    python benchmarks/bench_rendering.py --frames 200
+"""
+
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+import numpy as np
+
+from irreversible_heat_transfer import InteractiveVisualizer
+
+
+def frame_times(render_mode, frames):
+    """Per-frame wall times (s) for one render mode."""
+    vis = InteractiveVisualizer(render_mode=render_mode)
+    vis.fig.canvas.draw()
+    vis.sim.reset_simulation()
+    vis.is_playing = True
+    times = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        vis.animate(None)
+        if render_mode == "Redraw":
+            # draw_idle() is deferred on Agg; render now so the cost is counted
+            vis.fig.canvas.draw()
+        times.append(time.perf_counter() - start)
+        if not vis.is_playing:
+            vis.sim.reset_simulation()
+            vis.is_playing = True
+    return np.array(times)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare Redraw and Blit frame times.")
+    parser.add_argument("--frames", type=int, default=200)
+    args = parser.parse_args()
+
+    results = {mode: frame_times(mode, args.frames) for mode in ("Redraw", "Blit")}
+    for mode, times in results.items():
+        median = np.median(times)
+        print(f"{mode:>6}: median {median * 1e3:7.2f} ms/frame, "
+              f"p95 {np.percentile(times, 95) * 1e3:7.2f} ms, {1 / median:6.1f} FPS")
+    speedup = np.median(results["Redraw"]) / np.median(results["Blit"])
+    print(f"Blit speedup: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Startup benchmark: import cost of the headless simulation core
+==============================================================
+Imports each module in a fresh interpreter, timing `import numpy` first
+and then the module itself, so the table shows how much of the import
+time is NumPy and how much is the project's own code. matplotlib.pyplot
+is included for comparison. Headless modules must not load matplotlib;
+the script exits with status 1 if one does.
+
+Usage:
+    python benchmarks/bench_startup.py --repeat 10
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+# Modules a batch worker, pool worker or the service imports without a display
+HEADLESS = ("irreversible_heat_transfer", "batch_simulation", "entropy_analysis",
+            "simulation_service", "example_calculation")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import numpy
+numpy_done = time.perf_counter()
+import {module}
+done = time.perf_counter()
+print(json.dumps({{"numpy": numpy_done - start, "module": done - numpy_done,
+                   "matplotlib": "matplotlib" in sys.modules}}))
+"""
+
+
+def import_times(module, repeat):
+    """Median NumPy and module import times (s) over fresh interpreters."""
+    samples = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", _PROBE.format(module=module)],
+                                cwd=ROOT, check=True, capture_output=True, text=True).stdout
+        samples.append(json.loads(output))
+    return (statistics.median(s["numpy"] for s in samples),
+            statistics.median(s["module"] for s in samples),
+            any(s["matplotlib"] for s in samples))
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Time headless imports of the core.")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    leaks = []
+    print(f"{'module':<28}{'numpy':>10}{'module':>10}{'numpy share':>14}  matplotlib")
+    for module in HEADLESS + ("matplotlib.pyplot",):
+        numpy_time, module_time, matplotlib = import_times(module, args.repeat)
+        share = numpy_time / (numpy_time + module_time)
+        print(f"{module:<28}{numpy_time * 1000:8.1f}ms{module_time * 1000:8.1f}ms"
+              f"{share:13.0%}  {'loaded' if matplotlib else '-'}")
+        if matplotlib and module in HEADLESS:
+            leaks.append(module)
+    if leaks:
+        print(f"matplotlib imported by headless modules: {', '.join(leaks)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
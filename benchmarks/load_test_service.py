@@ -0,0 +1,157 @@
+"""
+Load test: simulation_service on localhost
+==========================================
+Starts simulation_service.py in a subprocess (or targets a running one
+with --port and --no-server) and drives it with many concurrent keep-alive
+HTTP clients. Each client repeatedly POSTs a parameter set drawn from a
+pool of --distinct sets, so identical requests overlap and exercise
+coalescing and the response cache, and reads the whole NDJSON stream.
+Reports requests per second, latency percentiles and the service counters.
+
+Usage:
+    python benchmarks/load_test_service.py --clients 64 --requests 5000
+    python benchmarks/load_test_service.py --distinct 0        # every request unique
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+import numpy as np
+
+
+async def _request(reader, writer, method, path, body=b""):
+    """One keep-alive HTTP request; returns (status, body) with chunks joined."""
+    writer.write(b"%s %s HTTP/1.1\r\nHost: localhost\r\nContent-Length: %d\r\n\r\n%s"
+                 % (method.encode(), path.encode(), len(body), body))
+    await writer.drain()
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+    status = int(head.split(" ", 2)[1])
+    headers = {name.strip().lower(): value.strip() for name, value in
+               (line.split(":", 1) for line in head.split("\r\n")[1:] if ":" in line)}
+    if "content-length" in headers:
+        return status, await reader.readexactly(int(headers["content-length"]))
+    parts = []
+    while True:
+        size = int((await reader.readuntil(b"\r\n")).strip(), 16)
+        parts.append(await reader.readexactly(size + 2))
+        if size == 0:
+            return status, b"".join(part[:-2] for part in parts)
+
+
+async def _client(port, bodies, queue, latencies, failures):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port, limit=2**20)
+    try:
+        while True:
+            try:
+                i = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            status, body = await _request(reader, writer, "POST", "/simulate", bodies[i])
+            latencies.append(time.perf_counter() - start)
+            if status != 200 or not body.endswith(b"\n"):
+                failures.append(status)
+    finally:
+        writer.close()
+
+
+async def run_load(port, clients, requests, distinct, decimate, seed):
+    """Issue `requests` requests from `clients` connections; returns the results."""
+    rng = np.random.default_rng(seed)
+    n_sets = distinct or requests
+    grid = dict(T_hot_initial=rng.integers(31, 51, n_sets) * 10.0,
+                T_cold_initial=rng.integers(25, 31, n_sets) * 10.0,
+                h=rng.integers(1, 21, n_sets) * 10.0,
+                mass_hot=rng.integers(2, 51, n_sets) / 10)
+    sets = [json.dumps({**{name: float(values[i]) for name, values in grid.items()},
+                        "decimate": decimate}).encode() for i in range(n_sets)]
+    bodies = [sets[i] for i in (rng.integers(0, n_sets, requests) if distinct
+                                else range(requests))]
+
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(i)
+    latencies, failures = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(port, bodies, queue, latencies, failures)
+                           for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    _, stats = await _request(reader, writer, "GET", "/stats")
+    writer.close()
+    return elapsed, np.array(latencies), failures, json.loads(stats)
+
+
+def _wait_for_port(port, process, timeout=60):
+    async def probe():
+        _, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.close()
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError("the service exited during startup")
+        try:
+            asyncio.run(probe())
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"no service on port {port} after {timeout} s")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load-test the simulation service.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--no-server", action="store_true",
+                        help="target an already running service")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--distinct", type=int, default=200,
+                        help="size of the parameter pool; 0 makes every request unique")
+    parser.add_argument("--decimate", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    process = None
+    if not args.no_server:
+        command = [sys.executable, os.path.join(ROOT, "simulation_service.py"),
+                   "--port", str(args.port)]
+        if args.workers:
+            command += ["--workers", str(args.workers)]
+        process = subprocess.Popen(command, stdout=subprocess.DEVNULL,
+                                   stderr=subprocess.DEVNULL)
+    try:
+        _wait_for_port(args.port, process)
+        elapsed, latencies, failures, stats = asyncio.run(run_load(
+            args.port, args.clients, args.requests, args.distinct, args.decimate,
+            args.seed))
+    finally:
+        if process is not None:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    print(f"{len(latencies)} requests from {args.clients} clients in {elapsed:.2f} s: "
+          f"{len(latencies) / elapsed:,.0f} requests/s")
+    print(f"latency p50 {p50:.1f} ms, p95 {p95:.1f} ms, p99 {p99:.1f} ms, "
+          f"max {latencies.max() * 1000:.1f} ms")
+    print(f"failures: {len(failures)}")
+    print("service: " + ", ".join(f"{name} {value}" for name, value in stats.items()))
+
+
+if __name__ == "__main__":
+    main()
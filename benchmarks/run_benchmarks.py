@@ -0,0 +1,277 @@
+"""
+Benchmark Suite: Simulator and Renderer Hot Paths
+=================================================
+Times the hot paths of the project, records the peak Python memory of
+each case with tracemalloc, and writes the results as JSON so runs from
+different commits can be compared against a regression threshold.
+
+Cases:
+- run_full_simulation for every engine over several dt / t_max settings
+- step() per-call cost (Python and Numba backends)
+- InteractiveVisualizer.plot_all plus a full render on the Agg backend
+- example_calculation.plot_entropy_vs_temperature_difference
+
+Timing follows timeit: every case is called `number` times per repeat,
+`number` being calibrated so one repeat takes at least --min-time
+seconds; the median and minimum per-call times over the repeats are
+stored. Memory is measured in a separate call, since tracemalloc slows
+down the code it traces.
+
+Usage:
+    python benchmarks/run_benchmarks.py run                   # -> benchmarks/results/<commit>.json
+    python benchmarks/run_benchmarks.py run --filter plot_all --output new.json
+    python benchmarks/run_benchmarks.py compare old.json new.json --threshold 0.1
+"""
+
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import matplotlib
+matplotlib.use("Agg")
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+# name -> setup function returning the callable to time
+BENCHMARKS = {}
+
+# Bytes added to both peaks before comparing them (see compare)
+MEMORY_FLOOR = 64 * 2**10
+
+
+def benchmark(name):
+    """Register a setup function under name; setup time is not measured."""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def _simulation_case(engine, dt, t_max):
+    def setup():
+        from irreversible_heat_transfer import IrreversibleHeatTransfer
+        sim = IrreversibleHeatTransfer(engine=engine)
+        sim.dt, sim.t_max = dt, t_max
+        return sim.run_full_simulation
+    return setup
+
+
+for _engine in ("Loop", "Vectorized", "Exact", "Adaptive"):
+    for _dt, _t_max in ((0.1, 200), (0.01, 200), (0.1, 2000)):
+        benchmark(f"run_full_simulation[{_engine},dt={_dt},t_max={_t_max}]")(
+            _simulation_case(_engine, _dt, _t_max))
+
+
+def _step_case(backend):
+    def setup():
+        from irreversible_heat_transfer import IrreversibleHeatTransfer
+        sim = IrreversibleHeatTransfer(engine="Loop", backend=backend)
+
+        def call():
+            if not sim.step():
+                sim.reset_simulation()
+        return call
+    return setup
+
+
+for _backend in ("Python", "Numba"):
+    benchmark(f"step[{_backend}]")(_step_case(_backend))
+
+
+def _plot_all_case(render_mode):
+    def setup():
+        from irreversible_heat_transfer import InteractiveVisualizer
+        vis = InteractiveVisualizer(render_mode=render_mode, interactive=False)
+        vis.fig.canvas.draw()
+
+        def call():
+            vis.plot_all()
+            # draw_idle() is deferred on Agg; render now so the cost is counted
+            vis.fig.canvas.draw()
+        return call
+    return setup
+
+
+for _mode in ("Redraw", "Blit"):
+    benchmark(f"plot_all[{_mode}]")(_plot_all_case(_mode))
+
+
+@benchmark("example_calculation.plot_entropy_vs_temperature_difference")
+def _example_sweep():
+    import contextlib
+    import io
+    from example_calculation import plot_entropy_vs_temperature_difference
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_"), "entropy.png")
+
+    def call():
+        with contextlib.redirect_stdout(io.StringIO()):
+            plot_entropy_vs_temperature_difference(path)
+    return call
+
+
+def measure(setup, repeat=5, min_time=0.2):
+    """Per-call timings and peak traced memory of one benchmark."""
+    function = setup()
+    function()  # warm-up: imports, JIT compilation, caches
+
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+
+    times = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        times.append((time.perf_counter() - start) / number)
+
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "median": statistics.median(times),
+        "min": min(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "number": number,
+        "repeat": repeat,
+        "peak_memory_bytes": peak,
+    }
+
+
+def metadata():
+    """Machine and revision information stored with every result file."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "matplotlib": matplotlib.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run(pattern=None, repeat=5, min_time=0.2, verbose=True):
+    """Run every benchmark whose name matches the regular expression pattern."""
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if pattern and not re.search(pattern, name):
+            continue
+        results[name] = measure(setup, repeat=repeat, min_time=min_time)
+        if verbose:
+            r = results[name]
+            print(f"{name:<62} {_format_time(r['median'])}  "
+                  f"peak {r['peak_memory_bytes'] / 2**20:8.2f} MiB")
+    return {"metadata": metadata(), "results": results}
+
+
+def compare(base, new, threshold=0.1, memory_threshold=0.1):
+    """
+    Print per-case ratios new/base and return the names of regressions.
+
+    A case regresses when its median time grows by more than threshold or
+    its peak memory by more than memory_threshold (relative, after adding
+    MEMORY_FLOOR to both peaks).
+    """
+    regressions = []
+    print(f"{'benchmark':<62} {'base':>10} {'new':>10} {'ratio':>7} {'memory':>7}")
+    for name in sorted(set(base["results"]) & set(new["results"])):
+        b, n = base["results"][name], new["results"][name]
+        ratio = n["median"] / b["median"]
+        # The floor keeps kilobyte-sized noise in tiny peaks from counting
+        memory = ((n["peak_memory_bytes"] + MEMORY_FLOOR)
+                  / (b["peak_memory_bytes"] + MEMORY_FLOOR))
+        flag = ""
+        if ratio > 1 + threshold or memory > 1 + memory_threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        print(f"{name:<62} {_format_time(b['median'])} {_format_time(n['median'])} "
+              f"{ratio:7.2f} {memory:7.2f}{flag}")
+    for name in sorted(set(base["results"]) ^ set(new["results"])):
+        print(f"{name:<62} only in {'base' if name in base['results'] else 'new'}")
+    return regressions
+
+
+def _format_time(seconds):
+    """Human-readable duration with a fixed width of 10 characters."""
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:7.2f} {unit:<2}"
+    return f"{seconds / 1e-9:7.2f} ns"
+
+
+def main():
+    """Command-line entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run or compare the benchmark suite.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="run the benchmarks and save JSON")
+    run_parser.add_argument("--filter", help="regular expression selecting benchmarks")
+    run_parser.add_argument("--output", help="result file (default: results/<commit>.json)")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--min-time", type=float, default=0.2,
+                            help="minimum seconds per repeat")
+    run_parser.add_argument("--list", action="store_true", help="only list the benchmarks")
+    compare_parser = subparsers.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.1,
+                                help="allowed relative slowdown of the median time")
+    compare_parser.add_argument("--memory-threshold", type=float, default=0.1,
+                                help="allowed relative growth of the peak memory")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        if args.list:
+            print("\n".join(name for name in BENCHMARKS
+                            if not args.filter or re.search(args.filter, name)))
+            return
+        report = run(args.filter, repeat=args.repeat, min_time=args.min_time)
+        output = args.output
+        if output is None:
+            commit = (report["metadata"]["commit"] or "unknown")[:12]
+            output = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                  "results", f"{commit}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {output}")
+    else:
+        with open(args.base) as f:
+            base = json.load(f)
+        with open(args.new) as f:
+            new = json.load(f)
+        regressions = compare(base, new, args.threshold, args.memory_threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond the thresholds")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Compiled Stepping Kernels
+=========================
+The explicit Euler update of IrreversibleHeatTransfer.step() written as a
+plain function over arrays and scalars, compiled with Numba's @njit when
+it is installed. One call advances any number of steps with no attribute
+lookups, string comparisons or method dispatch inside the loop, which is
+what makes the 'Numba' backend fast for models without a closed form
+(temperature-dependent property tables).
+
+Without Numba, njit falls back to the identity decorator and the same
+kernel runs as ordinary Python: slower, but with identical results.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """Identity stand-in for numba.njit."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda function: function
+
+# Placeholder for an absent property table
+NO_TABLE = (0.0, 1.0, np.zeros(0))
+
+
+def table_arrays(table):
+    """(T_min, dT, values) of a PropertyTable, or NO_TABLE for None."""
+    if table is None:
+        return NO_TABLE
+    return table.T_min, table.dT, table.values
+
+
+@njit(cache=True)
+def _interpolate(T, T_min, dT, values):
+    """Scalar version of PropertyTable.__call__ (same arithmetic)."""
+    x = (T - T_min) / dT
+    i = min(max(np.floor(x), 0.0), len(values) - 2.0)
+    w = x - i
+    f0 = values[int(i)]
+    return f0 + w * (values[int(i) + 1] - f0)
+
+
+@njit(cache=True)
+def euler_steps(T_hot, T_cold, Q_transferred, S_gen_cumulative, heat_flux,
+                start, stop, h, m_hot, m_cold, c_p, dt, isolated,
+                h_T_min, h_dT, h_values, cp_T_min, cp_dT, cp_values):
+    """
+    Advance the trajectory arrays from index start to index stop in place.
+
+    Mirrors IrreversibleHeatTransfer.step(): heat_flux[i] holds the rate
+    evaluated at sample i, and property tables are used when their value
+    arrays are non-empty.
+    """
+    for i in range(start, stop):
+        T_h = T_hot[i]
+        T_c = T_cold[i]
+        if isolated:
+            Q_dot = 0.0
+        elif len(h_values) > 0:
+            Q_dot = _interpolate(0.5 * (T_h + T_c), h_T_min, h_dT, h_values) * (T_h - T_c)
+        else:
+            Q_dot = h * (T_h - T_c)
+        heat_flux[i] = Q_dot
+
+        if isolated:
+            T_hot[i + 1] = T_h
+            T_cold[i + 1] = T_c
+        else:
+            if len(cp_values) > 0:
+                C_hot = m_hot * _interpolate(T_h, cp_T_min, cp_dT, cp_values)
+                C_cold = m_cold * _interpolate(T_c, cp_T_min, cp_dT, cp_values)
+            else:
+                C_hot = m_hot * c_p
+                C_cold = m_cold * c_p
+            T_hot[i + 1] = T_h + -Q_dot * dt / C_hot
+            T_cold[i + 1] = T_c + Q_dot * dt / C_cold
+
+        Q_transferred[i + 1] = Q_transferred[i] + Q_dot * dt
+        if Q_dot == 0 or T_h == T_c:
+            S_gen_dot = 0.0
+        else:
+            S_gen_dot = Q_dot * (1 / T_c - 1 / T_h)
+        S_gen_cumulative[i + 1] = S_gen_cumulative[i] + S_gen_dot * dt
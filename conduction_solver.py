@@ -0,0 +1,183 @@
+"""
+Spatially Resolved Conduction Between the Reservoirs
+====================================================
+Replaces the lumped coefficient h of IrreversibleHeatTransfer by a
+conducting bar (1-D) or plate (2-D) discretized into finite volumes. The
+hot reservoir touches the x = 0 face, the cold reservoir the x = length
+face; all other faces are adiabatic. Reservoirs and cells together form a
+ThermalNetwork (reservoir-to-cell links conduct through half a cell).
+
+Time stepping is Crank–Nicolson,
+
+    (C/dt + L/2) T^{n+1} = (C/dt - L/2) T^n,
+
+which is unconditionally stable. The left-hand matrix is factorized once
+(sparse LU) and the factors are reused for every step. Heat and entropy
+generation are evaluated at the midpoint temperatures (T^n + T^{n+1}) / 2,
+so the face fluxes are exactly the ones the scheme applies: energy is
+conserved to round-off and every face generates S_gen >= 0.
+"""
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+
+from thermal_network import ThermalNetwork
+
+HOT, COLD = 0, 1
+
+
+class ConductionSolver(ThermalNetwork):
+    """
+    Crank–Nicolson conduction through a solid joining two finite reservoirs.
+
+    After run_full_simulation() the same trajectories as
+    IrreversibleHeatTransfer are available (time, T_hot, T_cold, heat_flux,
+    Q_transferred, S_gen_cumulative), plus field snapshots of the solid in
+    T_field_history.
+    """
+
+    def __init__(self, T_hot_initial, T_cold_initial, mass_hot=1.0, mass_cold=1.0,
+                 c_p=1000, cells=(100,), length=0.1, width=0.05, thickness=0.05,
+                 conductivity=400, density=8960, specific_heat_solid=385,
+                 dt=0.1, t_max=200):
+        """
+        Parameters:
+        -----------
+        T_hot_initial, T_cold_initial : float
+            Initial reservoir temperatures (K); the solid starts at their mean
+        mass_hot, mass_cold : float
+            Reservoir masses (kg)
+        c_p : float
+            Reservoir specific heat capacity (J/kg·K)
+        cells : tuple of int
+            (nx,) for a bar or (nx, ny) for a plate
+        length : float
+            Distance between the reservoirs along x (m)
+        width, thickness : float
+            Extent of the solid along y and z (m); a bar has cross-section
+            width * thickness
+        conductivity : float
+            Thermal conductivity of the solid (W/m·K)
+        density, specific_heat_solid : float
+            Density (kg/m³) and specific heat (J/kg·K) of the solid
+        dt : float
+            Time step (s); any value is stable
+        t_max : float
+            Maximum time (s)
+        """
+        nx, ny = (tuple(cells) + (1,))[:2]
+        self.shape = tuple(cells)
+        self.nx, self.ny = nx, ny
+        self.T_hot_0 = T_hot_initial
+        self.T_cold_0 = T_cold_initial
+        self.m_hot = mass_hot
+        self.m_cold = mass_cold
+        self.c_p = c_p
+        dx, dy = length / nx, width / ny
+
+        cell = 2 + np.arange(nx * ny).reshape(nx, ny)
+        G_x = conductivity * dy * thickness / dx
+        G_y = conductivity * dx * thickness / dy
+        edges = [
+            np.column_stack([cell[:-1].ravel(), cell[1:].ravel()]),
+            np.column_stack([cell[:, :-1].ravel(), cell[:, 1:].ravel()]),
+            np.column_stack([np.full(ny, HOT), cell[0]]),
+            np.column_stack([cell[-1], np.full(ny, COLD)]),
+        ]
+        conductance = np.concatenate([
+            np.full(len(edges[0]), G_x),
+            np.full(len(edges[1]), G_y),
+            np.full(2 * ny, 2 * G_x),
+        ])
+        T_initial = np.full(2 + nx * ny, 0.5 * (T_hot_initial + T_cold_initial))
+        T_initial[[HOT, COLD]] = T_hot_initial, T_cold_initial
+        heat_capacity = np.full(2 + nx * ny, density * specific_heat_solid * dx * dy * thickness)
+        heat_capacity[[HOT, COLD]] = mass_hot * c_p, mass_cold * c_p
+
+        super().__init__(T_initial, heat_capacity, np.vstack(edges), conductance,
+                         dt=dt, t_max=t_max)
+        # Edges whose flow leaves the hot reservoir
+        self.hot_edges = np.flatnonzero(self.edges[:, 0] == HOT)
+        self.factorize()
+
+    @classmethod
+    def from_simulation(cls, sim, **solid):
+        """Conduction solver with the reservoirs and time grid of an IrreversibleHeatTransfer."""
+        if sim.c_p_table is not None:
+            raise ValueError("the conduction solver uses a constant reservoir c_p")
+        return cls(sim.T_hot_0, sim.T_cold_0, mass_hot=sim.m_hot, mass_cold=sim.m_cold,
+                   c_p=sim.c_p, dt=sim.dt, t_max=sim.t_max, **solid)
+
+    def factorize(self):
+        """
+        Assemble the Crank–Nicolson matrices and factorize the implicit one.
+
+        Call again after changing dt, C or G.
+        """
+        L = self.laplacian
+        C_dt = sp.diags(self.C / self.dt)
+        self.rhs_matrix = (C_dt - 0.5 * L).tocsr()
+        # The matrix is symmetric: order for A + Aᵀ to limit fill-in
+        self.lu = splu((C_dt + 0.5 * L).tocsc(), permc_spec="MMD_AT_PLUS_A")
+
+    @property
+    def T_field(self):
+        """Current temperatures of the solid, shaped like the grid."""
+        return self.T[2:].reshape(self.shape)
+
+    def reset_simulation(self):
+        """Reset to initial conditions."""
+        super().reset_simulation()
+        self.Q_out_hot = 0.0
+
+    def step(self):
+        """Advance one Crank–Nicolson step with the prefactorized matrix."""
+        if self.current_step >= self.n_steps - 1:
+            return False
+        T_new = self.lu.solve(self.rhs_matrix @ self.T)
+        T_mid = 0.5 * (self.T + T_new)
+        Q_dot = self.calculate_heat_transfer_rate(T_mid)
+        S_gen_dot = self.calculate_entropy_generation_rate(Q_dot, T_mid)
+        self.T = T_new
+        self.Q_edges += Q_dot * self.dt
+        self.S_gen_edges += S_gen_dot * self.dt
+        self.S_gen_total += S_gen_dot.sum() * self.dt
+        self.last_heat_flux = Q_dot[self.hot_edges].sum()
+        self.Q_out_hot += self.last_heat_flux * self.dt
+        self.current_step += 1
+        return True
+
+    def run_full_simulation(self, field_every=None):
+        """
+        Run to t_max.
+
+        Parameters:
+        -----------
+        field_every : int, optional
+            Store a snapshot of the solid's temperature field every
+            field_every steps in T_field_history (default: none)
+        """
+        self.reset_simulation()
+        n = self.n_steps
+        self.time = np.arange(n) * self.dt
+        self.T_hot = np.zeros(n)
+        self.T_cold = np.zeros(n)
+        self.heat_flux = np.zeros(n)
+        self.Q_transferred = np.zeros(n)
+        self.S_gen_cumulative = np.zeros(n)
+        snapshots = []
+
+        for i in range(n):
+            self.T_hot[i] = self.T[HOT]
+            self.T_cold[i] = self.T[COLD]
+            self.Q_transferred[i] = self.Q_out_hot
+            self.S_gen_cumulative[i] = self.S_gen_total
+            if field_every and i % field_every == 0:
+                snapshots.append(self.T_field.copy())
+            if not self.step():
+                break
+            # Heat leaving the hot reservoir during the step starting at i
+            self.heat_flux[i] = self.last_heat_flux
+        self.T_field_history = np.array(snapshots)
+        return self
@@ -0,0 +1,175 @@
+"""
+Entropy and Exergy Analysis: Irreversible Heat Transfer
+=======================================================
+Closed-form end states of two reservoirs brought into thermal contact until
+they equilibrate. Every input may be an N-D array: temperatures, masses,
+c_p and the ambient temperature broadcast against each other, so a whole
+design grid is evaluated in one call instead of one Python iteration per
+point.
+
+    T_eq       = (C_hot T_hot + C_cold T_cold) / (C_hot + C_cold)
+    Q          = C_hot (T_hot - T_eq)
+    ΔS_hot     = C_hot ln(T_eq / T_hot),   ΔS_cold = C_cold ln(T_eq / T_cold)
+    S_gen      = ΔS_hot + ΔS_cold
+    X_destroyed = T_ambient S_gen           (lost work, Gouy-Stodola)
+    W_carnot   = (1 - T_low / T_high) |Q|   (Carnot engine between the
+                                             initial temperatures)
+
+with C = m c_p. Grids too large to hold every temporary at once (10⁸ points
+and up) go through evaluate_grid(), which walks rectangular blocks of the
+broadcast shape and writes into preallocated (e.g. memory-mapped) outputs.
+
+Usage:
+    result = irreversible_outcome(400, 300)
+    result.S_gen, result.exergy_destroyed
+
+    T_hot = np.linspace(310, 500, 1000)[:, None, None]
+    m_hot = np.linspace(0.1, 10, 1000)[None, :, None]
+    c_p = np.linspace(400, 4200, 100)[None, None, :]
+    grid = evaluate_grid(T_hot, 300, m_hot, 1.0, c_p, fields=("S_gen",),
+                         dtype=np.float32)
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from irreversible_heat_transfer import equilibrium_temperature
+
+# Quantities returned by irreversible_outcome(), in order
+OUTCOME_FIELDS = ("T_eq", "Q", "dS_hot", "dS_cold", "S_gen",
+                  "exergy_destroyed", "eta_carnot", "W_carnot")
+
+IrreversibleOutcome = namedtuple("IrreversibleOutcome", OUTCOME_FIELDS)
+
+
+def irreversible_outcome(T_hot, T_cold, m_hot=1.0, m_cold=1.0, c_p=1000, T_ambient=298.0):
+    """
+    End state of direct heat transfer between two reservoirs.
+
+    Parameters:
+    -----------
+    T_hot, T_cold : float or array_like
+        Initial reservoir temperatures (K)
+    m_hot, m_cold : float or array_like
+        Reservoir masses (kg)
+    c_p : float or array_like
+        Specific heat capacity (J/kg·K)
+    T_ambient : float or array_like
+        Dead-state temperature for the exergy destruction (K)
+
+    Returns:
+    --------
+    IrreversibleOutcome
+        T_eq (K), Q (J, positive from hot to cold), dS_hot, dS_cold and
+        S_gen (J/K), exergy_destroyed (J), eta_carnot and W_carnot (J),
+        each with the broadcast shape of the inputs. Scalar inputs give
+        scalars.
+    """
+    T_hot, T_cold, m_hot, m_cold, c_p, T_ambient = (
+        np.asarray(a, dtype=float) for a in (T_hot, T_cold, m_hot, m_cold, c_p, T_ambient))
+    C_hot = m_hot * c_p
+    C_cold = m_cold * c_p
+
+    T_eq = equilibrium_temperature(T_hot, T_cold, m_hot, m_cold, c_p)
+    Q = T_hot - T_eq
+    Q *= C_hot
+    dS_hot = np.log(T_eq / T_hot)
+    dS_hot *= C_hot
+    dS_cold = np.log(T_eq / T_cold)
+    dS_cold *= C_cold
+    S_gen = dS_hot + dS_cold
+    exergy_destroyed = T_ambient * S_gen
+    # 1 - T_low / T_high, so the bound stays non-negative when T_hot < T_cold
+    eta_carnot = 1 - np.minimum(T_hot, T_cold) / np.maximum(T_hot, T_cold)
+    W_carnot = eta_carnot * np.abs(Q)
+
+    return IrreversibleOutcome(*(np.asarray(value)[()] for value in (
+        T_eq, Q, dS_hot, dS_cold, S_gen, exergy_destroyed, eta_carnot, W_carnot)))
+
+
+def _blocks(shape, chunk_size):
+    """
+    Yield index tuples of slices that tile `shape` in rectangular blocks.
+
+    Each block covers whole trailing axes and at most chunk_size elements
+    (at least one row of the last axis), so every input can be sliced as a
+    view instead of gathered element by element.
+    """
+    ndim = len(shape)
+    # First axis k whose trailing sub-array fits into one chunk
+    k = ndim
+    while k > 0 and int(np.prod(shape[k - 1:])) <= chunk_size:
+        k -= 1
+    if k == 0:
+        if ndim == 0:
+            yield ()
+            return
+        k = 1
+    axis = k - 1
+    inner = int(np.prod(shape[axis + 1:]))
+    rows = max(1, chunk_size // inner)
+    for outer in np.ndindex(*shape[:axis]):
+        head = tuple(slice(i, i + 1) for i in outer)
+        for start in range(0, shape[axis], rows):
+            yield head + (slice(start, min(start + rows, shape[axis])),)
+
+
+def _take_block(a, index):
+    """Slice block `index` out of `a`, keeping the length-1 broadcast axes as they are."""
+    return a[tuple(slice(None) if n == 1 else idx for n, idx in zip(a.shape, index))]
+
+
+def evaluate_grid(T_hot, T_cold, m_hot=1.0, m_cold=1.0, c_p=1000, T_ambient=298.0,
+                  fields=OUTCOME_FIELDS, chunk_size=1 << 20, dtype=np.float64, out=None):
+    """
+    irreversible_outcome() over a large broadcast grid, one block at a time.
+
+    Inputs are never broadcast to the full grid: each block slices the
+    original arrays, so only the requested outputs are allocated at full
+    size and temporaries stay at O(chunk_size).
+
+    Parameters:
+    -----------
+    T_hot, T_cold, m_hot, m_cold, c_p, T_ambient : float or array_like
+        As for irreversible_outcome(); shaped to broadcast, e.g.
+        T_hot[:, None, None] and m_hot[None, :, None]
+    fields : sequence of str
+        Which of OUTCOME_FIELDS to return; the others are set to None
+    chunk_size : int
+        Approximate number of grid points evaluated together
+    dtype : numpy dtype
+        dtype of the output arrays (computation is always float64)
+    out : dict, optional
+        Preallocated arrays of the broadcast shape to write fields into,
+        e.g. np.memmap or np.lib.format.open_memmap for grids beyond RAM
+
+    Returns:
+    --------
+    IrreversibleOutcome
+        Arrays of the broadcast shape for the requested fields, None elsewhere
+    """
+    unknown = set(fields) - set(OUTCOME_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields {sorted(unknown)}, expected a subset of {OUTCOME_FIELDS}")
+    inputs = [np.asarray(a, dtype=float)
+              for a in (T_hot, T_cold, m_hot, m_cold, c_p, T_ambient)]
+    shape = np.broadcast_shapes(*(a.shape for a in inputs))
+    inputs = [a.reshape((1,) * (len(shape) - a.ndim) + a.shape) for a in inputs]
+
+    out = {} if out is None else out
+    results = {}
+    for name in fields:
+        if name in out:
+            if out[name].shape != shape:
+                raise ValueError(f"out['{name}'] has shape {out[name].shape}, expected {shape}")
+            results[name] = out[name]
+        else:
+            results[name] = np.empty(shape, dtype=dtype)
+
+    for index in _blocks(shape, chunk_size):
+        block = irreversible_outcome(*(_take_block(a, index) for a in inputs))
+        for name in fields:
+            results[name][index] = getattr(block, name)
+
+    return IrreversibleOutcome(*(results.get(name) for name in OUTCOME_FIELDS))
@@ -5,7 +5,8 @@ This script demonstrates the key calculations without the full GUI.
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
+
+from entropy_analysis import irreversible_outcome
 
 def calculate_irreversible_heat_transfer():
     """
@@ -29,25 +30,27 @@ def calculate_irreversible_heat_transfer():
     print(f"  Cold reservoir: T = {T_cold_initial} K, mass = {m_cold} kg")
     print(f"  Specific heat:  c_p = {c_p} J/(kg·K)")
     
-    # Calculate equilibrium temperature (energy conservation)
-    T_eq = (m_hot * c_p * T_hot_initial + m_cold * c_p * T_cold_initial) / \
-           (m_hot * c_p + m_cold * c_p)
+    # All end-state quantities in one call (see entropy_analysis.py)
+    T_ambient = 298  # K (25°C)
+    result = irreversible_outcome(T_hot_initial, T_cold_initial, m_hot, m_cold, c_p,
+                                  T_ambient)
+    T_eq = result.T_eq
     
     print(f"\nEquilibrium Temperature:")
     print(f"  T_equilibrium = {T_eq} K")
     
-    # Calculate heat transferred
-    Q_transferred = m_hot * c_p * (T_hot_initial - T_eq)
+    # Heat transferred
+    Q_transferred = result.Q
     
     print(f"\nHeat Transferred:")
     print(f"  Q = {Q_transferred} J = {Q_transferred/1000} kJ")
     
-    # Calculate entropy change for each reservoir
+    # Entropy change for each reservoir
     # ΔS = m × c_p × ln(T_final / T_initial)
     
-    Delta_S_hot = m_hot * c_p * np.log(T_eq / T_hot_initial)
-    Delta_S_cold = m_cold * c_p * np.log(T_eq / T_cold_initial)
-    Delta_S_total = Delta_S_hot + Delta_S_cold
+    Delta_S_hot = result.dS_hot
+    Delta_S_cold = result.dS_cold
+    Delta_S_total = result.S_gen
     
     print(f"\nEntropy Changes:")
     print(f"  ΔS_hot  = {Delta_S_hot:.2f} J/K (negative - entropy decreases)")
@@ -59,9 +62,8 @@ def calculate_irreversible_heat_transfer():
     print(f"  This confirms the process is IRREVERSIBLE!")
     print(f"  (Second Law: ΔS_universe ≥ 0, here ΔS_universe > 0)")
     
-    # Calculate lost work (exergy destruction)
-    T_ambient = 298  # K (25°C)
-    lost_work = T_ambient * Delta_S_total
+    # Lost work (exergy destruction)
+    lost_work = result.exergy_destroyed
     
     print(f"\nLost Work Potential (Exergy Destruction):")
     print(f"  W_lost = T_ambient × ΔS_gen = {T_ambient} K × {Delta_S_total:.2f} J/K")
@@ -72,8 +74,8 @@ def calculate_irreversible_heat_transfer():
     # Efficiency comparison
     print(f"\n{'Comparison with Reversible Process:':-^70}")
     # Carnot efficiency between initial temperatures
-    eta_carnot = 1 - T_cold_initial / T_hot_initial
-    W_max_reversible = eta_carnot * Q_transferred
+    eta_carnot = result.eta_carnot
+    W_max_reversible = result.W_carnot
     
     print(f"  If we used a Carnot engine between these reservoirs:")
     print(f"  Maximum efficiency: η = {eta_carnot*100:.2f}%")
@@ -87,29 +89,20 @@ def calculate_irreversible_heat_transfer():
     return T_eq, Delta_S_total, Q_transferred
 
 
-def plot_entropy_vs_temperature_difference():
+def plot_entropy_vs_temperature_difference(output_path="entropy_vs_temperature.png",
+                                           m_hot=1.0, m_cold=1.0, c_p=1000):
     """
     Show how entropy generation depends on initial temperature difference.
+    
+    The plot is saved to output_path.
     """
+    import matplotlib.pyplot as plt
     
     T_cold = 300  # K (fixed)
     T_hot_range = np.linspace(310, 500, 50)  # K
     
-    m = 1.0  # kg
-    c_p = 1000  # J/(kg·K)
-    
-    entropy_generated = []
-    
-    for T_hot in T_hot_range:
-        # Equilibrium temperature
-        T_eq = (T_hot + T_cold) / 2  # Equal masses
-        
-        # Entropy generation
-        Delta_S_hot = m * c_p * np.log(T_eq / T_hot)
-        Delta_S_cold = m * c_p * np.log(T_eq / T_cold)
-        Delta_S_total = Delta_S_hot + Delta_S_cold
-        
-        entropy_generated.append(Delta_S_total)
+    # Entropy generation for the whole sweep at once
+    entropy_generated = irreversible_outcome(T_hot_range, T_cold, m_hot, m_cold, c_p).S_gen
     
     # Create plot
     plt.figure(figsize=(10, 6))
@@ -128,8 +121,8 @@ def plot_entropy_vs_temperature_difference():
              fontsize=10, va='top')
     
     plt.tight_layout()
-    plt.savefig('/home/claude/entropy_vs_temperature.png', dpi=150, bbox_inches='tight')
-    print("Plot saved: entropy_vs_temperature.png")
+    plt.savefig(output_path, dpi=150, bbox_inches='tight')
+    print(f"Plot saved: {output_path}")
     plt.close()
 
 
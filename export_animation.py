@@ -0,0 +1,192 @@
+"""
+Headless Export: Animations and Figures
+=======================================
+Renders the five InteractiveVisualizer panels for a simulation on the Agg
+backend, without a window. The simulation runs once in the parent and its
+trajectory is handed to the workers through an on-disk SimulationCache
+tier, which they read memory-mapped. Frames are rendered in parallel by
+worker processes (each one builds its figure once and renders a contiguous
+run of frames) and are then stitched into a video with ffmpeg, or kept as a
+PNG sequence.
+
+Usage:
+    python export_animation.py heat_transfer.mp4 --T-hot 450 --h 80
+    python export_animation.py frames/ --steps-per-frame 10 --workers 8
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from irreversible_heat_transfer import IrreversibleHeatTransfer
+from simulation_cache import ENTRY_FIELDS, SimulationCache, simulation_key
+
+FRAME_PATTERN = "frame_%06d.png"
+VIDEO_EXTENSIONS = (".mp4", ".mkv", ".mov", ".avi", ".webm")
+
+
+def _render_frames(sim, jobs, dpi, render_mode, cache_dir):
+    """
+    Worker: render (step, path) jobs with one headless figure.
+
+    The trajectory is loaded from the parent's cache in cache_dir, so the
+    worker never simulates. The figure is drawn in full once; in 'Blit' mode later frames only
+    redraw the animated artists over the cached background before the Agg
+    buffer is written out, skipping savefig's full re-render.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from PIL import Image
+    from irreversible_heat_transfer import InteractiveVisualizer
+
+    cache = SimulationCache(max_bytes=0, directory=cache_dir)
+    vis = InteractiveVisualizer(cache=cache, sim=sim, interactive=False,
+                                render_mode=render_mode)
+    vis.fig.set_dpi(dpi)
+    canvas = vis.fig.canvas
+    vis.plot_all()
+    canvas.draw()
+    for step, path in jobs:
+        vis.sim.current_step = step
+        if render_mode == "Blit":
+            vis.blit_frame()
+        else:
+            vis.plot_all()
+            canvas.draw()
+        # Fast PNG compression: frames are usually re-encoded into a video
+        Image.fromarray(np.asarray(canvas.buffer_rgba())).save(path, compress_level=1)
+    plt.close(vis.fig)
+    return len(jobs)
+
+
+def _render_parallel(sim, jobs, dpi, render_mode, max_workers):
+    """
+    Split jobs into contiguous chunks and render them on a process pool.
+
+    sim must have been run; its trajectory is stored once in a temporary
+    cache directory that every worker reads memory-mapped.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    # A few chunks per worker balance the load; a minimum chunk length keeps
+    # the one-off figure setup amortized
+    n_chunks = max(1, min(4 * max_workers, len(jobs) // 50))
+    chunks = [list(chunk) for chunk in np.array_split(np.arange(len(jobs)), n_chunks)]
+    cache_dir = tempfile.mkdtemp(prefix="trajectory_")
+    try:
+        SimulationCache(max_bytes=0, directory=cache_dir).put(
+            simulation_key(sim), np.vstack([getattr(sim, name) for name in ENTRY_FIELDS]))
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(_render_frames, sim, [jobs[i] for i in chunk], dpi,
+                                   render_mode, cache_dir)
+                       for chunk in chunks if chunk]
+            return sum(future.result() for future in futures)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def stitch_frames(frame_dir, output, fps=20):
+    """Encode a directory of FRAME_PATTERN images into a video with ffmpeg."""
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise RuntimeError("ffmpeg was not found on PATH; export to a directory "
+                           "to keep the PNG sequence instead")
+    subprocess.run([ffmpeg, "-y", "-loglevel", "error", "-framerate", str(fps),
+                    "-i", os.path.join(frame_dir, FRAME_PATTERN),
+                    "-c:v", "libx264", "-pix_fmt", "yuv420p",
+                    # libx264 needs even frame dimensions
+                    "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", output],
+                   check=True)
+
+
+def export_animation(sim, output, steps_per_frame=5, fps=20, dpi=100,
+                     max_workers=None, render_mode="Blit"):
+    """
+    Render the animation of a simulation to a video or a PNG sequence.
+
+    Parameters:
+    -----------
+    sim : IrreversibleHeatTransfer
+        Simulation to render; it is run to completion first
+    output : str
+        Video file (.mp4, .mkv, .mov, .avi, .webm) or a directory for PNGs
+    steps_per_frame : int
+        Simulation steps between frames (the interactive animation uses 5)
+    fps : int
+        Frame rate of the video
+    dpi : int
+        Resolution of the rendered frames
+    max_workers : int, optional
+        Number of rendering processes (default: os.cpu_count())
+    render_mode : str
+        InteractiveVisualizer render mode used by the workers
+
+    Returns:
+    --------
+    int
+        Number of frames rendered
+    """
+    sim.run_full_simulation()
+    steps = list(range(0, sim.n_steps, steps_per_frame))
+    if steps[-1] != sim.n_steps - 1:
+        steps.append(sim.n_steps - 1)
+
+    to_video = output.lower().endswith(VIDEO_EXTENSIONS)
+    frame_dir = tempfile.mkdtemp(prefix="frames_") if to_video else output
+    os.makedirs(frame_dir, exist_ok=True)
+    try:
+        jobs = [(step, os.path.join(frame_dir, FRAME_PATTERN % number))
+                for number, step in enumerate(steps)]
+        n_frames = _render_parallel(sim, jobs, dpi, render_mode, max_workers)
+        if to_video:
+            stitch_frames(frame_dir, output, fps)
+    finally:
+        if to_video:
+            shutil.rmtree(frame_dir, ignore_errors=True)
+    return n_frames
+
+
+def export_figure(sim, path, step=None, dpi=150, render_mode="Blit"):
+    """Save the five panels at one step (default: the final state) as an image."""
+    sim.run_full_simulation()
+    step = sim.n_steps - 1 if step is None else step
+    _render_parallel(sim, [(step, path)], dpi, render_mode, max_workers=1)
+
+
+def main():
+    """Command-line entry point."""
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Export the heat transfer animation headlessly.")
+    parser.add_argument("output", help="video file or directory for a PNG sequence")
+    parser.add_argument("--T-hot", type=float, default=400)
+    parser.add_argument("--T-cold", type=float, default=300)
+    parser.add_argument("--h", type=float, default=50)
+    parser.add_argument("--mass-ratio", type=float, default=1.0)
+    parser.add_argument("--system-type", default="Closed",
+                        choices=["Closed", "Open", "Isolated"])
+    parser.add_argument("--steps-per-frame", type=int, default=5)
+    parser.add_argument("--fps", type=int, default=20)
+    parser.add_argument("--dpi", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    sim = IrreversibleHeatTransfer(args.T_hot, args.T_cold, mass_hot=args.mass_ratio,
+                                   mass_cold=1.0, system_type=args.system_type,
+                                   engine="Vectorized")
+    sim.h = args.h
+    start = time.perf_counter()
+    n_frames = export_animation(sim, args.output, steps_per_frame=args.steps_per_frame,
+                                fps=args.fps, dpi=args.dpi, max_workers=args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"Rendered {n_frames} frames to {args.output} in {elapsed:.1f} s "
+          f"({n_frames / elapsed:.1f} frames/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Hot-Path Instrumentation
+========================
+Opt-in timing of the simulation and the GUI: Profiler.attach() wraps
+step, advance_to, run_full_simulation, every plot_* method, animate,
+blit_frame and the canvas draws of one InteractiveVisualizer, and records
+per-call wall times into rolling windows with p50 / p95 / p99 statistics.
+
+The wrappers are installed as instance attributes and removed again by
+detach(), so nothing is wrapped (and nothing is paid) unless a profiler
+is attached, and other instances are never affected.
+
+Usage:
+    profiler = Profiler()
+    profiler.attach(visualizer, overlay=True)   # before starting the animation
+    ...
+    print(profiler.report())
+    profiler.dump_json("profile.json")
+
+    python irreversible_heat_transfer.py --profile profile.json
+"""
+
+import functools
+import json
+import time
+
+import numpy as np
+
+
+class RollingStats:
+    """Call count and total time, plus the last `window` samples for percentiles."""
+
+    def __init__(self, window):
+        self.samples = np.zeros(window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.samples[self.count % len(self.samples)] = seconds
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def summary(self):
+        """Statistics in seconds; percentiles cover the rolling window only."""
+        recent = self.samples[:min(self.count, len(self.samples))]
+        p50, p95, p99 = np.percentile(recent, [50, 95, 99]) if len(recent) else (0.0,) * 3
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": float(p50),
+            "p95": float(p95),
+            "p99": float(p99),
+            "max": self.max,
+        }
+
+
+class Profiler:
+    """Records per-call timings of instrumented methods."""
+
+    def __init__(self, window=1000):
+        """
+        Parameters:
+        -----------
+        window : int
+            Number of most recent calls per method kept for the percentiles
+        """
+        self.window = window
+        self.stats = {}
+        self._patches = []
+        self._last_frame = None
+        self.overlay = None
+
+    def record(self, name, seconds):
+        """Add one timing sample (s) under name."""
+        if name not in self.stats:
+            self.stats[name] = RollingStats(self.window)
+        self.stats[name].add(seconds)
+
+    def wrap(self, obj, method, name=None):
+        """Time every call of obj.method (an instance-level patch)."""
+        if method in vars(obj):
+            return  # already wrapped
+        original = getattr(obj, method)
+        name = name or f"{type(obj).__name__}.{method}"
+
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.record(name, time.perf_counter() - start)
+
+        setattr(obj, method, timed)
+        self._patches.append((obj, method))
+
+    def attach_simulation(self, sim):
+        """Instrument the stepping methods of an IrreversibleHeatTransfer."""
+        self.wrap(sim, "step")
+        self.wrap(sim, "advance_to")
+        self.wrap(sim, "run_full_simulation")
+
+    def attach(self, visualizer, overlay=False):
+        """
+        Instrument an InteractiveVisualizer and its simulation.
+
+        Attach before starting the animation: the animation timer keeps a
+        reference to the animate method it was started with.
+
+        Parameters:
+        -----------
+        visualizer : InteractiveVisualizer
+            Visualizer to instrument
+        overlay : bool
+            Show FPS and frame latency in the figure while animating
+        """
+        self.attach_simulation(visualizer.sim)
+        methods = ["update_simulation", "blit_frame"] + [
+            name for name in dir(type(visualizer))
+            if name.startswith("plot_") and name != "plot_data"]
+        for method in methods:
+            self.wrap(visualizer, method)
+        canvas = visualizer.fig.canvas
+        self.wrap(canvas, "draw", "canvas.draw")
+        self.wrap(canvas, "draw_idle", "canvas.draw_idle")
+
+        original = visualizer.animate
+
+        @functools.wraps(original)
+        def animate(frame):
+            # The animation timer keeps firing while paused; only frames
+            # that advance the simulation count towards FPS and latency
+            sim, step = visualizer.sim, visualizer.sim.current_step
+            start = time.perf_counter()
+            try:
+                return original(frame)
+            finally:
+                if visualizer.sim is not sim or sim.current_step != step:
+                    if self._last_frame is not None:
+                        self.record("frame_interval", start - self._last_frame)
+                    self._last_frame = start
+                    self.record("InteractiveVisualizer.animate", time.perf_counter() - start)
+                    if self.overlay is not None:
+                        self._update_overlay()
+                else:
+                    # Do not let the next interval span the pause
+                    self._last_frame = None
+
+        visualizer.animate = animate
+        self._patches.append((visualizer, "animate"))
+        if overlay:
+            self._add_overlay(visualizer)
+
+    def _add_overlay(self, visualizer):
+        """Figure text showing FPS and frame latency, drawn with the animated artists."""
+        self.overlay = visualizer.fig.text(
+            0.01, 0.985, "", fontsize=9, family="monospace", va="top",
+            bbox=dict(boxstyle="round", facecolor="white", alpha=0.8))
+        self._overlay_owner = visualizer
+        if visualizer.render_mode == "Blit":
+            self.overlay.set_animated(True)
+            visualizer.dynamic_artists.append(self.overlay)
+
+    def _update_overlay(self):
+        frames = self.stats.get("frame_interval")
+        latency = self.stats.get("InteractiveVisualizer.animate")
+        if frames is None or latency is None:
+            return
+        interval = frames.summary()["p50"]
+        frame = latency.summary()
+        self.overlay.set_text(
+            f"{1 / interval if interval > 0 else 0:5.1f} FPS  "
+            f"frame p50 {frame['p50'] * 1e3:6.1f} ms  p95 {frame['p95'] * 1e3:6.1f} ms")
+
+    def detach(self):
+        """Remove every wrapper and the overlay."""
+        for obj, method in reversed(self._patches):
+            delattr(obj, method)
+        self._patches = []
+        if self.overlay is not None:
+            artists = getattr(self._overlay_owner, "dynamic_artists", [])
+            if self.overlay in artists:
+                artists.remove(self.overlay)
+            self.overlay.remove()
+            self.overlay = None
+        self._last_frame = None
+
+    def reset(self):
+        """Forget all recorded timings."""
+        self.stats = {}
+        self._last_frame = None
+
+    def summary(self):
+        """{name: {count, total, mean, p50, p95, p99, max}} with times in seconds."""
+        return {name: stats.summary() for name, stats in sorted(self.stats.items())}
+
+    def report(self):
+        """The summary as a text table, slowest total first."""
+        rows = sorted(self.summary().items(), key=lambda item: -item[1]["total"])
+        lines = [f"{'method':<42} {'calls':>7} {'total s':>9} "
+                 f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"]
+        for name, s in rows:
+            lines.append(f"{name:<42} {s['count']:>7} {s['total']:>9.3f} "
+                         f"{s['p50'] * 1e3:>8.3f} {s['p95'] * 1e3:>8.3f} {s['p99'] * 1e3:>8.3f}")
+        return "\n".join(lines)
+
+    def dump_json(self, path):
+        """Write the summary to path as JSON."""
+        with open(path, "w") as f:
+            json.dump({"window": self.window, "timings": self.summary()}, f, indent=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.detach()
@@ -7,11 +7,145 @@ with entropy generation analysis.
 Author: Educational Thermodynamics Simulator
 """
 
+from collections import namedtuple
+
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
-from matplotlib.widgets import Slider, Button
-import matplotlib.patches as patches
+
+# matplotlib is imported inside the InteractiveVisualizer methods that
+# draw, so headless users of the simulation core (batch runs, pool workers,
+# the service) only pay for NumPy at import time.
+
+# Simulation engines: 'Loop' advances step() one time step at a time,
+# 'Vectorized' evaluates the same explicit Euler recurrence in bulk NumPy
+# operations, 'Exact' uses the analytic solution of the linear model and
+# 'Adaptive' integrates with error-controlled Dormand-Prince steps.
+ENGINES = ("Loop", "Vectorized", "Exact", "Adaptive")
+
+# Backends of the 'Loop' engine: 'Python' runs step() as written, 'Numba'
+# runs the compiled kernel of compiled_kernels (plain Python without Numba).
+BACKENDS = ("Python", "Numba")
+
+# One fixed-size piece of a streamed trajectory (see iter_chunks)
+TrajectoryChunk = namedtuple(
+    "TrajectoryChunk",
+    ("time", "T_hot", "T_cold", "heat_flux", "Q_transferred", "S_gen_cumulative"))
+
+# Dormand-Prince 5(4) embedded Runge-Kutta pair (first-same-as-last)
+_DOPRI_C = np.array([0, 1/5, 3/10, 4/5, 8/9, 1, 1])
+_DOPRI_A = np.array([
+    [0, 0, 0, 0, 0, 0],
+    [1/5, 0, 0, 0, 0, 0],
+    [3/40, 9/40, 0, 0, 0, 0],
+    [44/45, -56/15, 32/9, 0, 0, 0],
+    [19372/6561, -25360/2187, 64448/6561, -212/729, 0, 0],
+    [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656, 0],
+    [35/384, 0, 500/1113, 125/192, -2187/6784, 11/84],
+])
+_DOPRI_B = np.array([35/384, 0, 500/1113, 125/192, -2187/6784, 11/84, 0])
+_DOPRI_E = _DOPRI_B - np.array([5179/57600, 0, 7571/16695, 393/640,
+                                 -92097/339200, 187/2100, 1/40])
+
+# Per-step quantities stored by a simulation, in the order returned by
+# linear_trajectories()
+TRAJECTORY_FIELDS = ("T_hot", "T_cold", "Q_transferred", "S_gen_cumulative", "heat_flux")
+
+
+def equilibrium_temperature(T_hot, T_cold, m_hot, m_cold, c_p):
+    """Final equilibrium temperature from the energy balance (broadcasts over arrays)."""
+    numerator = m_hot * c_p * T_hot + m_cold * c_p * T_cold
+    denominator = m_hot * c_p + m_cold * c_p
+    return numerator / denominator
+
+
+def _shifted_cumsum(values, start):
+    """Running sum of `values` along the last axis that starts from `start` at index 0."""
+    out = np.empty(np.broadcast(values, start).shape)
+    out[..., 0] = 0.0
+    np.cumsum(values[..., :-1], axis=-1, out=out[..., 1:])
+    if np.any(start != 0):
+        out += start
+    return out
+
+
+def linear_trajectories(T_hot_0, T_cold_0, h, C_hot, C_cold, dt, n_steps,
+                        method="Euler", Q_0=0.0, S_0=0.0):
+    """
+    Evaluate the linear Q_dot = h * (T_hot - T_cold) model without a time loop.
+    
+    The temperature difference obeys dΔT/dt = -k ΔT with
+    k = h * (1/C_hot + 1/C_cold), so the whole trajectory follows from ΔT_0:
+    
+        Euler:  ΔT_n = ΔT_0 * (1 - k*dt)**n      (same recurrence as step())
+        Exact:  ΔT(t) = ΔT_0 * exp(-k*t)
+    
+    Inputs broadcast against each other and the time axis is appended last:
+    scalars give 1-D arrays of length n_steps, (n_cases, 1) columns give
+    (n_cases, n_steps) arrays.
+    
+    Parameters:
+    -----------
+    T_hot_0, T_cold_0 : float or ndarray
+        Reservoir temperatures at the first sample (K)
+    h : float or ndarray
+        Heat transfer coefficient (W/K); pass 0 for an isolated system
+    C_hot, C_cold : float or ndarray
+        Heat capacities m * c_p of the reservoirs (J/K)
+    dt : float
+        Time step (s)
+    n_steps : int
+        Number of samples to produce, including the first one
+    method : str
+        'Euler' or 'Exact'
+    Q_0, S_0 : float or ndarray
+        Heat transferred (J) and entropy generated (J/K) before the first sample
+    
+    Returns:
+    --------
+    T_hot, T_cold, Q_transferred, S_gen_cumulative, heat_flux : ndarray
+        heat_flux holds the rate at every sample, including the last one.
+    """
+    T_hot_0, T_cold_0, h, C_hot, C_cold, Q_0, S_0 = (
+        np.asarray(a, dtype=float)[..., np.newaxis]
+        for a in (T_hot_0, T_cold_0, h, C_hot, C_cold, Q_0, S_0))
+    n = np.arange(n_steps)
+    dT_0 = T_hot_0 - T_cold_0
+    k = h * (1 / C_hot + 1 / C_cold)
+    
+    if method == "Euler":
+        # In-place updates keep the number of full-size temporaries small,
+        # which matters for the (n_cases, n_steps) arrays of batch sweeps.
+        dT = np.power(1 - k * dt, n)
+        dT *= dT_0
+        heat_flux = dT * h
+        Q_transferred = _shifted_cumsum(heat_flux * dt, Q_0)
+        Q = Q_transferred - Q_0 if np.any(Q_0 != 0) else Q_transferred
+        T_hot = Q * (-1 / C_hot)
+        T_hot += T_hot_0
+        T_cold = Q * (1 / C_cold)
+        T_cold += T_cold_0
+        # Same left-endpoint rule as step(): Q_dot * (1/T_c - 1/T_h) rewritten
+        # as h ΔT² / (T_h T_c), which vanishes with ΔT and needs one division.
+        S_gen_dot = heat_flux * dT
+        S_gen_dot /= np.multiply(T_hot, T_cold, out=dT)
+        S_gen_dot *= dt
+        S_gen_cumulative = _shifted_cumsum(S_gen_dot, S_0)
+    elif method == "Exact":
+        decay = np.exp(-k * (n * dt))
+        dT = dT_0 * decay
+        heat_flux = h * dT
+        # Q(t) = h ΔT_0 (1 - exp(-k t)) / k, written without dividing by k
+        Q = dT_0 * C_hot * C_cold / (C_hot + C_cold) * (1 - decay)
+        Q_transferred = Q_0 + Q
+        T_hot = T_hot_0 - Q / C_hot
+        T_cold = T_cold_0 + Q / C_cold
+        # Entropy change of both reservoirs; exact because the pair is isolated
+        S_gen_cumulative = (S_0 + C_hot * np.log(T_hot / T_hot_0)
+                            + C_cold * np.log(T_cold / T_cold_0))
+    else:
+        raise ValueError(f"Unknown method '{method}', expected 'Euler' or 'Exact'")
+    
+    return T_hot, T_cold, Q_transferred, S_gen_cumulative, heat_flux
+
 
 class IrreversibleHeatTransfer:
     """
@@ -25,7 +159,8 @@ class IrreversibleHeatTransfer:
     """
     
     def __init__(self, T_hot_initial=400, T_cold_initial=300, 
-                 mass_hot=1.0, mass_cold=1.0, c_p=1000, system_type="Closed"):
+                 mass_hot=1.0, mass_cold=1.0, c_p=1000, system_type="Closed",
+                 engine="Loop", c_p_table=None, h_table=None, backend="Python"):
         """
         Initialize the thermodynamic system.
         
@@ -43,6 +178,28 @@ class IrreversibleHeatTransfer:
             Specific heat capacity (J/kg·K)
         system_type : str
             Type of system: 'Closed', 'Open', or 'Isolated'
+        engine : str
+            How run_full_simulation computes the trajectory:
+            'Loop'       - call step() for every time step
+            'Vectorized' - same explicit Euler scheme in bulk NumPy operations;
+                           matches 'Loop' to round-off (relative error ~1e-12)
+            'Exact'      - analytic exponential decay of ΔT; differs from the
+                           Euler results by the discretization error O(k*dt),
+                           k = h*(1/(m_hot*c_p) + 1/(m_cold*c_p))
+            'Adaptive'   - Dormand-Prince RK45 with error control (rtol, atol);
+                           stops once |ΔT| <= dT_tol or the entropy generation
+                           rate <= S_gen_rate_tol, so the arrays have variable
+                           length and self.time holds the accepted step times
+        c_p_table : PropertyTable, optional
+            Temperature-dependent c_p(T) replacing c_p (see material_properties);
+            only the 'Loop' and 'Adaptive' engines support property tables
+        h_table : PropertyTable, optional
+            Temperature-dependent h(T) replacing h, evaluated at the mean
+            temperature (T_hot + T_cold) / 2
+        backend : str
+            How step() is executed by the 'Loop' engine: 'Python' or 'Numba'
+            (the compiled kernel of compiled_kernels, which falls back to
+            plain Python when Numba is not installed)
         """
         self.T_hot_0 = T_hot_initial
         self.T_cold_0 = T_cold_initial
@@ -53,9 +210,20 @@ class IrreversibleHeatTransfer:
         # Heat transfer coefficient (controls rate)
         self.h = 50  # W/K
         
+        # Optional temperature-dependent properties (PropertyTable)
+        self.c_p_table = c_p_table
+        self.h_table = h_table
+        
         # System type: 'Closed', 'Open', 'Isolated'
         self.system_type = system_type
 
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {ENGINES}")
+        self.engine = engine
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+        self.backend = backend
+
         # Calculate equilibrium temperature
         self.T_eq = self._calculate_equilibrium_temp()
         
@@ -63,18 +231,37 @@ class IrreversibleHeatTransfer:
         self.dt = 0.1  # time step (s)
         self.t_max = 200  # maximum time (s)
         
+        # Adaptive engine: error tolerances and equilibrium criteria
+        self.rtol = 1e-6
+        self.atol = 1e-6
+        self.dT_tol = 1e-3  # K
+        self.S_gen_rate_tol = None  # W/K, None disables the criterion
+        
         # Initialize arrays
         self.reset_simulation()
     
-    def _calculate_equilibrium_temp(self):
-        """Calculate final equilibrium temperature (energy balance)."""
-        numerator = self.m_hot * self.c_p * self.T_hot_0 + self.m_cold * self.c_p * self.T_cold_0
-        denominator = self.m_hot * self.c_p + self.m_cold * self.c_p
-        return numerator / denominator
+    def _calculate_equilibrium_temp(self, T_h=None, T_c=None):
+        """
+        Calculate final equilibrium temperature (energy balance).
+        
+        Starts from the initial temperatures unless another state (T_h, T_c)
+        is given, e.g. the branch point of branch().
+        """
+        T_h = self.T_hot_0 if T_h is None else T_h
+        T_c = self.T_cold_0 if T_c is None else T_c
+        if self.c_p_table is not None:
+            from material_properties import equilibrium_temperature_tabulated
+            return equilibrium_temperature_tabulated(T_h, T_c, self.m_hot, self.m_cold,
+                                                     self.c_p_table)
+        return equilibrium_temperature(T_h, T_c, self.m_hot, self.m_cold, self.c_p)
     
     def reset_simulation(self):
         """Reset simulation to initial conditions."""
-        self.time = np.arange(0, self.t_max, self.dt)
+        if self.engine == "Adaptive":
+            # Grown on demand by step() and trimmed by run_full_simulation()
+            self.time = np.zeros(256)
+        else:
+            self.time = np.arange(0, self.t_max, self.dt)
         self.n_steps = len(self.time)
         
         self.T_hot = np.zeros(self.n_steps)
@@ -97,8 +284,22 @@ class IrreversibleHeatTransfer:
         """
         if self.system_type == "Isolated":
             return 0.0
+        if self.h_table is not None:
+            return self.h_table(0.5 * (T_h + T_c)) * (T_h - T_c)
         return self.h * (T_h - T_c)
     
+    def heat_capacities(self, T_h, T_c):
+        """Heat capacities m * c_p (J/K) of the hot and cold reservoirs."""
+        if self.c_p_table is not None:
+            return self.m_hot * self.c_p_table(T_h), self.m_cold * self.c_p_table(T_c)
+        return self.m_hot * self.c_p, self.m_cold * self.c_p
+    
+    def _require_constant_properties(self):
+        """The closed-form engines assume constant c_p and h."""
+        if self.c_p_table is not None or self.h_table is not None:
+            raise ValueError("temperature-dependent properties need the 'Loop' "
+                             "or 'Adaptive' engine")
+    
     def calculate_entropy_generation_rate(self, Q_dot, T_h, T_c):
         """
         Calculate entropy generation rate for irreversible process.
@@ -113,8 +314,13 @@ class IrreversibleHeatTransfer:
     
     def step(self):
         """Advance simulation by one time step."""
+        if self.engine == "Adaptive":
+            return self._adaptive_step()
         if self.current_step >= self.n_steps - 1:
             return False
+        if self.backend == "Numba":
+            self._run_kernel(self.current_step + 1)
+            return True
         i = self.current_step
         Q_dot = self.calculate_heat_transfer_rate(self.T_hot[i], self.T_cold[i])
         self.heat_flux[i] = Q_dot
@@ -126,8 +332,9 @@ class IrreversibleHeatTransfer:
             dT_hot = 0.0
             dT_cold = 0.0
         else:
-            dT_hot = -Q_dot * self.dt / (self.m_hot * self.c_p)
-            dT_cold = Q_dot * self.dt / (self.m_cold * self.c_p)
+            C_hot, C_cold = self.heat_capacities(self.T_hot[i], self.T_cold[i])
+            dT_hot = -Q_dot * self.dt / C_hot
+            dT_cold = Q_dot * self.dt / C_cold
 
         self.T_hot[i+1] = self.T_hot[i] + dT_hot
         self.T_cold[i+1] = self.T_cold[i] + dT_cold
@@ -140,35 +347,330 @@ class IrreversibleHeatTransfer:
     def run_full_simulation(self):
         """Run complete simulation to equilibrium."""
         self.reset_simulation()
-        for i in range(self.n_steps - 1):
-            self.step()
+        if self.engine == "Loop" and self.backend == "Numba":
+            self._run_kernel(self.n_steps - 1)
+        elif self.engine == "Loop":
+            for i in range(self.n_steps - 1):
+                self.step()
+        elif self.engine == "Adaptive":
+            while self.step():
+                pass
+            self._resize_arrays(self.current_step + 1)
+        else:
+            self.run_vectorized_simulation(
+                method="Euler" if self.engine == "Vectorized" else "Exact")
+    
+    def _run_kernel(self, stop):
+        """Advance from current_step to index stop with compiled_kernels.euler_steps."""
+        from compiled_kernels import euler_steps, table_arrays
+        euler_steps(self.T_hot, self.T_cold, self.Q_transferred,
+                    self.S_gen_cumulative, self.heat_flux,
+                    self.current_step, stop, float(self.h), float(self.m_hot),
+                    float(self.m_cold), float(self.c_p), float(self.dt),
+                    self.system_type == "Isolated",
+                    *table_arrays(self.h_table), *table_arrays(self.c_p_table))
+        self.current_step = stop
+    
+    def run_vectorized_simulation(self, method="Euler"):
+        """
+        Fill all trajectory arrays at once with linear_trajectories().
+        
+        method='Euler' reproduces the step() recurrence, including the zero
+        heat flux stored at the last sample; method='Exact' stores the
+        analytic solution.
+        """
+        self._require_constant_properties()
+        h = 0.0 if self.system_type == "Isolated" else self.h
+        (self.T_hot[:], self.T_cold[:], self.Q_transferred[:],
+         self.S_gen_cumulative[:], self.heat_flux[:]) = linear_trajectories(
+            self.T_hot_0, self.T_cold_0, h,
+            self.m_hot * self.c_p, self.m_cold * self.c_p,
+            self.dt, self.n_steps, method=method)
+        if method == "Euler":
+            self.heat_flux[-1] = 0.0
+        self.current_step = self.n_steps - 1
+
+    def branch(self, step=None):
+        """
+        Continue the run from sample `step` with the current parameters.
+        
+        Samples 0..step are kept as computed, so h, the masses or the system
+        type can be changed mid-run without recomputing the prefix; the
+        samples after `step` are stale until advance_to() (or step())
+        recomputes them. T_eq is re-derived from the state at `step`, since
+        from there on energy is conserved with the new masses. The initial
+        temperatures define the prefix itself and need run_full_simulation().
+        
+        Parameters:
+        -----------
+        step : int, optional
+            Branch point; defaults to current_step. branch(0) restarts the
+            run from the initial conditions.
+        """
+        step = self.current_step if step is None else step
+        if not 0 <= step <= self.current_step:
+            raise ValueError(f"Cannot branch at step {step}: only samples "
+                             f"0..{self.current_step} have been computed")
+        self.current_step = step
+        self.T_eq = self._calculate_equilibrium_temp(self.T_hot[step], self.T_cold[step])
+        # The adaptive step size carried over from a later sample (or none,
+        # after a cache hit) does not fit the branch point; see _adaptive_step
+        self._dt_next = None
+    
+    def advance_to(self, stop):
+        """
+        Compute the samples after current_step up to index stop.
+        
+        The 'Loop' and 'Adaptive' engines call step(), the compiled backend
+        runs its kernel once, and 'Vectorized' / 'Exact' evaluate the whole
+        segment with linear_trajectories(), continuing from the state at
+        current_step. Returns False once the last sample has been computed,
+        on the same step for every engine.
+        """
+        if self.engine == "Adaptive" or (self.engine == "Loop" and self.backend == "Python"):
+            while self.current_step < stop:
+                if not self.step():
+                    return False
+            if self.engine == "Adaptive":
+                # The adaptive arrays have no fixed end; finished means
+                # the next step() would stop
+                i = self.current_step
+                y = np.array([self.T_hot[i], self.T_cold[i],
+                              self.Q_transferred[i], self.S_gen_cumulative[i]])
+                return not self._adaptive_finished(i, self._rates(y))
+            return self.current_step < self.n_steps - 1
+        stop = min(stop, self.n_steps - 1)
+        i = self.current_step
+        if stop > i and self.engine == "Loop":
+            self._run_kernel(stop)
+        elif stop > i:
+            self._require_constant_properties()
+            method = "Euler" if self.engine == "Vectorized" else "Exact"
+            h = 0.0 if self.system_type == "Isolated" else self.h
+            segment = linear_trajectories(
+                self.T_hot[i], self.T_cold[i], h,
+                self.m_hot * self.c_p, self.m_cold * self.c_p,
+                self.dt, stop - i + 1, method=method,
+                Q_0=self.Q_transferred[i], S_0=self.S_gen_cumulative[i])
+            for name, values in zip(TRAJECTORY_FIELDS, segment):
+                getattr(self, name)[i:stop+1] = values
+            if method == "Euler" and stop == self.n_steps - 1:
+                self.heat_flux[-1] = 0.0
+            self.current_step = stop
+        return self.current_step < self.n_steps - 1
+    
+    def iter_chunks(self, chunk_size=1024, decimate=1, block_size=8192):
+        """
+        Stream the trajectory in fixed-size chunks with bounded memory.
+        
+        Nothing is stored on the simulation object, so t_max / dt may be far
+        larger than would fit in the preallocated arrays of reset_simulation().
+        Samples are generated block by block with linear_trajectories(),
+        continuing from the last state of the previous block, and copied into
+        one reused (6, chunk_size) ring buffer. Memory stays at
+        O(chunk_size + block_size) regardless of the run length.
+        
+        Parameters:
+        -----------
+        chunk_size : int
+            Number of samples per yielded chunk (the last one may be shorter)
+        decimate : int
+            Emit every decimate-th time step
+        block_size : int
+            Approximate number of time steps evaluated per NumPy block
+        
+        Yields:
+        -------
+        TrajectoryChunk
+            Views into the ring buffer; they are overwritten by the next
+            chunk, so copy any arrays that must be kept.
+        """
+        if self.engine == "Adaptive":
+            raise ValueError("iter_chunks needs a fixed time step; "
+                             "use the 'Loop', 'Vectorized' or 'Exact' engine")
+        self._require_constant_properties()
+        method = "Exact" if self.engine == "Exact" else "Euler"
+        h = 0.0 if self.system_type == "Isolated" else self.h
+        C_hot, C_cold = self.m_hot * self.c_p, self.m_cold * self.c_p
+        # Same number of samples as np.arange(0, t_max, dt), without allocating it
+        n_total = int(np.ceil(self.t_max / self.dt))
+        # Blocks start on decimated samples so the stride stays aligned
+        steps_per_block = max(decimate, (block_size // decimate) * decimate)
+        
+        buffer = np.empty((len(TrajectoryChunk._fields), chunk_size))
+        fill = 0
+        state = (self.T_hot_0, self.T_cold_0, 0.0, 0.0)
+        g = 0  # global index of the first sample of the block
+        while g < n_total:
+            L = min(steps_per_block, n_total - g)
+            T_h, T_c, Q, S_gen, flux = linear_trajectories(
+                state[0], state[1], h, C_hot, C_cold, self.dt, L + 1,
+                method=method, Q_0=state[2], S_0=state[3])
+            if method == "Euler" and g + L == n_total:
+                # step() never evaluates the rate at the final sample
+                flux[L - 1] = 0.0
+            columns = (T_h, T_c, flux, Q, S_gen)
+            
+            selected = np.arange(0, L, decimate)
+            pos = 0
+            while pos < len(selected):
+                take = min(chunk_size - fill, len(selected) - pos)
+                sel = selected[pos:pos + take]
+                buffer[0, fill:fill + take] = (g + sel) * self.dt
+                for row, values in enumerate(columns, start=1):
+                    buffer[row, fill:fill + take] = values[sel]
+                fill += take
+                pos += take
+                if fill == chunk_size:
+                    yield TrajectoryChunk(*buffer)
+                    fill = 0
+            
+            state = (T_h[L], T_c[L], Q[L], S_gen[L])
+            g += L
+        if fill:
+            yield TrajectoryChunk(*buffer[:, :fill])
+    
+    def _rates(self, y):
+        """Time derivatives of (T_hot, T_cold, Q_transferred, S_gen_cumulative)."""
+        T_h, T_c = y[0], y[1]
+        Q_dot = self.calculate_heat_transfer_rate(T_h, T_c)
+        S_gen_dot = self.calculate_entropy_generation_rate(Q_dot, T_h, T_c)
+        C_hot, C_cold = self.heat_capacities(T_h, T_c)
+        return np.array([-Q_dot / C_hot, Q_dot / C_cold, Q_dot, S_gen_dot])
+    
+    def _resize_arrays(self, size):
+        """Grow or trim the trajectory arrays of the adaptive engine."""
+        for name in ("time",) + TRAJECTORY_FIELDS:
+            old = getattr(self, name)
+            new = np.zeros(size)
+            n = min(size, len(old))
+            new[:n] = old[:n]
+            setattr(self, name, new)
+        self.n_steps = size
+    
+    def _adaptive_finished(self, i, f):
+        """Whether the adaptive run stops at sample i, f being its rates."""
+        if abs(self.T_hot[i] - self.T_cold[i]) <= self.dT_tol or self.time[i] >= self.t_max:
+            return True
+        return self.S_gen_rate_tol is not None and f[3] <= self.S_gen_rate_tol
+    
+    def _adaptive_step(self):
+        """
+        Take one accepted Dormand-Prince step.
+        
+        The step size starts at self.dt, shrinks when the embedded error
+        estimate exceeds the tolerances and grows as the gradient decays.
+        Returns False once equilibrium (dT_tol / S_gen_rate_tol) or t_max
+        is reached.
+        """
+        i = self.current_step
+        if i == 0:
+            self._dt_next = self.dt
+        elif getattr(self, "_dt_next", None) is None:
+            # After branch() or a cache hit: continue with the step size
+            # that led to sample i
+            self._dt_next = self.time[i] - self.time[i - 1]
+        t = self.time[i]
+        y = np.array([self.T_hot[i], self.T_cold[i],
+                      self.Q_transferred[i], self.S_gen_cumulative[i]])
+        f = self._rates(y)
+        self.heat_flux[i] = f[2]
+        
+        if self._adaptive_finished(i, f):
+            return False
+        
+        dt = min(self._dt_next, self.t_max - t)
+        K = np.zeros((7, 4))
+        K[0] = f
+        while True:
+            for s in range(1, 7):
+                K[s] = self._rates(y + dt * (_DOPRI_A[s, :s] @ K[:s]))
+            y_new = y + dt * (_DOPRI_B @ K)
+            scale = self.atol + self.rtol * np.maximum(np.abs(y), np.abs(y_new))
+            error = np.sqrt(np.mean((dt * (_DOPRI_E @ K) / scale) ** 2))
+            if error <= 1:
+                break
+            dt *= max(0.2, 0.9 * error ** -0.2)
+        self._dt_next = dt * (min(5.0, 0.9 * error ** -0.2) if error > 0 else 5.0)
+        
+        if i + 1 >= self.n_steps:
+            self._resize_arrays(2 * self.n_steps)
+        self.time[i+1] = t + dt
+        (self.T_hot[i+1], self.T_cold[i+1],
+         self.Q_transferred[i+1], self.S_gen_cumulative[i+1]) = y_new
+        self.heat_flux[i+1] = K[6, 2]
+        self.current_step += 1
+        return True
 
 
 class InteractiveVisualizer:
     """Interactive visualization with animation and controls."""
 
-    def __init__(self):
+    def __init__(self, cache=None, lookup_table=None, render_mode="Redraw",
+                 sim=None, interactive=True, level_of_detail=False, incremental=False):
+        """
+        Parameters:
+        -----------
+        render_mode : str
+            'Redraw' clears and rebuilds every axes on each update;
+            'Blit' creates the artists once, updates their data and
+            blits them over a cached background during animation
+        sim : IrreversibleHeatTransfer, optional
+            Simulation to display; a default 'Vectorized' one is created
+        interactive : bool
+            Add the sliders and buttons; False gives just the five panels,
+            e.g. for headless export
+        level_of_detail : bool
+            Plot min/max-preserving downsampled views (level_of_detail.py)
+            with at most a few points per pixel column instead of every
+            sample
+        incremental : bool
+            Mid-run changes of h, the mass ratio or the system type branch
+            the running simulation at the displayed step (see
+            IrreversibleHeatTransfer.branch) instead of re-running it, and
+            the animation computes the rest on demand, frame by frame.
+            Play/Pause then resumes instead of restarting.
+        cache : SimulationCache, optional
+            Result cache shared across slider moves; a private in-memory
+            cache is created by default
+        lookup_table : SliderLookupTable, optional
+            Precomputed slider grid (see slider_table.py); covered slider
+            positions are loaded from it instead of simulated
+        """
+        from simulation_cache import SimulationCache
         self.system_types = ["Closed", "Open", "Isolated"]
-        self.sim = IrreversibleHeatTransfer(system_type="Closed")
+        if sim is None:
+            sim = IrreversibleHeatTransfer(system_type="Closed", engine="Vectorized")
+        self.sim = sim
+        self.interactive = interactive
+        self.cache = cache if cache is not None else SimulationCache()
+        self.lookup_table = lookup_table
+        self.from_table = False
+        if render_mode not in ("Redraw", "Blit"):
+            raise ValueError(f"Unknown render_mode '{render_mode}', expected 'Redraw' or 'Blit'")
+        self.render_mode = render_mode
+        self.level_of_detail = level_of_detail
+        self.lod_views = {}
+        self.incremental = incremental
         self.setup_figure()
         self.is_playing = False
         self.animation = None
 
     def on_system_type_change(self, label):
         self.sim.system_type = label
-        self.sim.T_eq = self.sim._calculate_equilibrium_temp()
-        self.update_simulation()
-        self.plot_all()
+        self.apply_parameters()
         
     def setup_figure(self):
         """Create the figure with subplots and controls."""
+        import matplotlib.pyplot as plt
         self.fig = plt.figure(figsize=(16, 10))
         self.fig.suptitle('Irreversible Heat Transfer: Hot and Cold Reservoirs', 
                          fontsize=16, fontweight='bold')
         
         # Create grid for subplots
         gs = self.fig.add_gridspec(3, 3, hspace=0.35, wspace=0.3, 
-                                   left=0.08, right=0.95, top=0.92, bottom=0.25)
+                                   left=0.08, right=0.95, top=0.92,
+                                   bottom=0.25 if self.interactive else 0.06)
         
         # Main plots
         self.ax_visual = self.fig.add_subplot(gs[0, :])  # Reservoir visualization
@@ -178,8 +680,12 @@ class InteractiveVisualizer:
         self.ax_flux = self.fig.add_subplot(gs[2, 2])     # Heat flux
         
         # Add sliders
-        self.setup_sliders()
-        self.setup_buttons()
+        if self.interactive:
+            self.setup_sliders()
+            self.setup_buttons()
+        
+        if self.render_mode == "Blit":
+            self.setup_artists()
         
         # Initial plot
         self.update_simulation()
@@ -187,8 +693,10 @@ class InteractiveVisualizer:
         
     def setup_sliders(self):
         """Create interactive sliders."""
+        import matplotlib.pyplot as plt
+        from matplotlib.widgets import RadioButtons, Slider
+
         # System type radio buttons
-        from matplotlib.widgets import RadioButtons
         ax_sys = plt.axes([0.55, 0.15, 0.12, 0.08], facecolor='lightgoldenrodyellow')
         self.radio_system = RadioButtons(ax_sys, self.system_types, active=0)
         self.radio_system.on_clicked(self.on_system_type_change)
@@ -218,6 +726,9 @@ class InteractiveVisualizer:
     
     def setup_buttons(self):
         """Create control buttons."""
+        import matplotlib.pyplot as plt
+        from matplotlib.widgets import Button
+
         # Button axes
         ax_play = plt.axes([0.55, 0.10, 0.08, 0.04])
         ax_reset = plt.axes([0.55, 0.05, 0.08, 0.04])
@@ -232,22 +743,48 @@ class InteractiveVisualizer:
     
     def on_slider_change(self, val):
         """Handle slider changes."""
+        initial_state_changed = (self.slider_T_hot.val != self.sim.T_hot_0
+                                 or self.slider_T_cold.val != self.sim.T_cold_0)
         self.sim.T_hot_0 = self.slider_T_hot.val
         self.sim.T_cold_0 = self.slider_T_cold.val
         self.sim.h = self.slider_h.val
         self.sim.m_hot = self.slider_mass_ratio.val
         self.sim.m_cold = 1.0
         
-        self.sim.T_eq = self.sim._calculate_equilibrium_temp()
-        self.update_simulation()
+        self.apply_parameters(initial_state_changed)
+    
+    def apply_parameters(self, initial_state_changed=False):
+        """
+        Bring the simulation in line with changed parameters and redraw.
+        
+        In incremental mode a change in the middle of a run keeps the
+        computed prefix and branches at the displayed step; otherwise, or
+        when the initial temperatures changed, the run is redone in full.
+        """
+        sim = self.sim
+        if (self.incremental and not initial_state_changed and not self.from_table
+                and 0 < sim.current_step < sim.n_steps - 1):
+            sim.branch()
+        else:
+            sim.T_eq = sim._calculate_equilibrium_temp()
+            self.update_simulation()
         self.plot_all()
     
     def update_simulation(self):
-        """Run simulation with current parameters."""
-        self.sim.run_full_simulation()
+        """Run simulation with current parameters (table lookup, then self.cache)."""
+        self.from_table = (self.lookup_table is not None
+                           and self.lookup_table.fill(self.sim))
+        if not self.from_table:
+            self.cache.run(self.sim)
     
     def plot_all(self):
         """Update all plots."""
+        if self.render_mode == "Blit":
+            # Full redraw; on_draw re-captures the background afterwards
+            self.update_static_artists()
+            self.update_artists()
+            self.fig.canvas.draw_idle()
+            return
         self.plot_reservoir_visual()
         self.plot_temperature()
         self.plot_heat_transferred()
@@ -255,8 +792,205 @@ class InteractiveVisualizer:
         self.plot_heat_flux()
         self.fig.canvas.draw_idle()
     
+    @staticmethod
+    def temp_to_color(T):
+        """Color mapping (red = hot, blue = cold)."""
+        # Normalize temperature to color
+        T_min, T_max = 250, 500
+        normalized = (T - T_min) / (T_max - T_min)
+        normalized = np.clip(normalized, 0, 1)
+        # Red for hot, blue for cold
+        r = normalized
+        b = 1 - normalized
+        return (r, 0.2, b)
+    
+    def setup_artists(self):
+        """
+        Create every artist once for the 'Blit' render mode.
+        
+        Artists that change from frame to frame are marked animated, so a
+        normal draw leaves them out of the background that on_draw caches;
+        blit_frame() then only redraws those artists on top of it.
+        """
+        import matplotlib.patches as patches
+
+        ax = self.ax_visual
+        ax.set_xlim(0, 10)
+        ax.set_ylim(0, 3)
+        ax.axis('off')
+        ax.set_title('Thermal Reservoirs', fontsize=14, fontweight='bold')
+        self.hot_rect = ax.add_patch(patches.Rectangle(
+            (1, 0.5), 2, 2, edgecolor='black', linewidth=2, animated=True))
+        self.cold_rect = ax.add_patch(patches.Rectangle(
+            (7, 0.5), 2, 2, edgecolor='black', linewidth=2, animated=True))
+        self.hot_text = ax.text(2, 2.7, '', ha='center', va='center', fontsize=12,
+                                fontweight='bold', animated=True)
+        self.cold_text = ax.text(8, 2.7, '', ha='center', va='center', fontsize=12,
+                                 fontweight='bold', animated=True)
+        self.flow_arrow = ax.add_patch(patches.FancyArrowPatch(
+            (3.2, 1.5), (6.8, 1.5), arrowstyle='->', mutation_scale=30,
+            linewidth=3, color='red', animated=True))
+        self.flow_text = ax.text(5, 1.8, 'Heat Flow', ha='center', fontsize=11,
+                                 color='red', fontweight='bold', animated=True)
+        self.eq_text = ax.text(5, 0.3, '', ha='center', fontsize=11,
+                               bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.8))
+        self.system_text = ax.text(5, 2.95, '', ha='center', fontsize=12,
+                                   fontweight='bold', color='black',
+                                   bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.5))
+        
+        ax = self.ax_temp
+        self.line_T_hot, = ax.plot([], [], 'r-', linewidth=2, label='Hot Reservoir',
+                                   animated=True)
+        self.line_T_cold, = ax.plot([], [], 'b-', linewidth=2, label='Cold Reservoir',
+                                    animated=True)
+        self.line_T_eq = ax.axhline(self.sim.T_eq, color='green', linestyle='--',
+                                    linewidth=2, label='Equilibrium')
+        ax.set_xlabel('Time (s)', fontsize=11)
+        ax.set_ylabel('Temperature (K)', fontsize=11)
+        ax.set_title('Temperature Evolution (Irreversible Process)', fontsize=12)
+        ax.legend(loc='best')
+        
+        ax = self.ax_heat
+        self.line_heat, = ax.plot([], [], 'purple', linewidth=2, animated=True)
+        ax.set_xlabel('Time (s)', fontsize=11)
+        ax.set_ylabel('Heat (kJ)', fontsize=11)
+        ax.set_title('Cumulative Heat\nTransferred', fontsize=12)
+        
+        ax = self.ax_entropy
+        self.line_entropy, = ax.plot([], [], 'orange', linewidth=2,
+                                     label='Total Entropy Generated', animated=True)
+        self.entropy_text = ax.text(0.98, 0.95, '', transform=ax.transAxes,
+                                    ha='right', va='top', animated=True,
+                                    bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.7))
+        ax.set_xlabel('Time (s)', fontsize=11)
+        ax.set_ylabel('Entropy Generation (J/K)', fontsize=11)
+        ax.set_title('Entropy Generation (Irreversibility Measure)', fontsize=12)
+        
+        ax = self.ax_flux
+        self.line_flux, = ax.plot([], [], 'darkgreen', linewidth=2, animated=True)
+        ax.set_xlabel('Time (s)', fontsize=11)
+        ax.set_ylabel('Heat Flux (W)', fontsize=11)
+        ax.set_title('Instantaneous\nHeat Transfer Rate', fontsize=12)
+        
+        for ax in (self.ax_temp, self.ax_heat, self.ax_entropy, self.ax_flux):
+            ax.grid(True, alpha=0.3)
+        
+        self.dynamic_artists = [
+            self.hot_rect, self.cold_rect, self.hot_text, self.cold_text,
+            self.flow_arrow, self.flow_text, self.line_T_hot, self.line_T_cold, self.line_heat,
+            self.line_entropy, self.entropy_text, self.line_flux,
+        ]
+        self.background = None
+        self.fig.canvas.mpl_connect('draw_event', self.on_draw)
+    
+    def set_static_limits(self):
+        """
+        Fix the axes limits from physical bounds of the current parameters.
+        
+        Blitting cannot rescale axes, so the limits must cover the whole run
+        up front: temperatures stay between the initial values, Q and the
+        flux between zero and their initial/final extremes, and S_gen near
+        its exact final value (Euler overshoots slightly, hence the margin).
+        """
+        sim = self.sim
+        C_hot, C_cold = sim.m_hot * sim.c_p, sim.m_cold * sim.c_p
+        dT_0 = sim.T_hot_0 - sim.T_cold_0
+        h = 0.0 if sim.system_type == "Isolated" else sim.h
+        Q_final = dT_0 * C_hot * C_cold / (C_hot + C_cold) if h else 0.0
+        S_final = (C_hot * np.log(sim.T_eq / sim.T_hot_0)
+                   + C_cold * np.log(sim.T_eq / sim.T_cold_0)) if h else 0.0
+        
+        def padded(low, high):
+            pad = 0.05 * (high - low) or 1.0
+            return low - pad, high + pad
+        
+        T_low, T_high = sorted((sim.T_hot_0, sim.T_cold_0))
+        self.ax_temp.set_ylim(*padded(T_low, T_high))
+        self.ax_heat.set_ylim(*padded(*sorted((0.0, Q_final / 1000))))
+        self.ax_entropy.set_ylim(*padded(0.0, 1.1 * S_final))
+        self.ax_flux.set_ylim(*padded(*sorted((0.0, h * dT_0))))
+        for ax in (self.ax_temp, self.ax_heat, self.ax_entropy, self.ax_flux):
+            ax.set_xlim(0, sim.t_max)
+    
+    def update_static_artists(self):
+        """
+        Update the background artists that only change with the parameters.
+        
+        Called before full redraws only: changing non-animated artists marks
+        the figure stale, which would trigger a full redraw per frame.
+        """
+        sim = self.sim
+        self.eq_text.set_text(f'Equilibrium: {sim.T_eq:.1f} K')
+        self.system_text.set_text(f'System: {sim.system_type}')
+        self.line_T_eq.set_ydata([sim.T_eq, sim.T_eq])
+        self.set_static_limits()
+    
+    def update_artists(self):
+        """Point the animated artists at the current simulation state."""
+        sim = self.sim
+        idx = min(sim.current_step, sim.n_steps - 1)
+        T_h = sim.T_hot[idx]
+        T_c = sim.T_cold[idx]
+        
+        self.hot_rect.set_facecolor(self.temp_to_color(T_h))
+        self.cold_rect.set_facecolor(self.temp_to_color(T_c))
+        self.hot_text.set_text(f'HOT\n{T_h:.1f} K')
+        self.cold_text.set_text(f'COLD\n{T_c:.1f} K')
+        # Shown while heat still flows, as in plot_reservoir_visual
+        self.flow_arrow.set_visible(bool(T_h > T_c))
+        self.flow_text.set_visible(bool(T_h > T_c))
+        
+        self.line_T_hot.set_data(*self.plot_data('T_hot', idx))
+        self.line_T_cold.set_data(*self.plot_data('T_cold', idx))
+        t, Q = self.plot_data('Q_transferred', idx)
+        self.line_heat.set_data(t, Q / 1000)
+        self.line_entropy.set_data(*self.plot_data('S_gen_cumulative', idx))
+        self.line_flux.set_data(*self.plot_data('heat_flux', idx))
+        self.entropy_text.set_text(
+            f'Total: {sim.S_gen_cumulative[idx]:.2f} J/K' if idx > 0 else '')
+    
+    def on_draw(self, event):
+        """After a full draw: cache the background and draw the animated artists."""
+        self.background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        for artist in self.dynamic_artists:
+            self.fig.draw_artist(artist)
+    
+    def blit_frame(self):
+        """Redraw only the animated artists over the cached background."""
+        canvas = self.fig.canvas
+        self.update_artists()
+        if self.background is None:
+            canvas.draw()
+            return
+        canvas.restore_region(self.background)
+        for artist in self.dynamic_artists:
+            self.fig.draw_artist(artist)
+        canvas.blit(self.fig.bbox)
+        canvas.flush_events()
+    
+    def plot_data(self, name, idx):
+        """
+        (time, values) of trajectory `name` up to step idx, as handed to the plots.
+        
+        With level_of_detail enabled this is an incrementally maintained
+        M4 view with at most four points per pixel column of the axes; it is
+        rebuilt whenever the simulation replaces its arrays.
+        """
+        t, y = self.sim.time, getattr(self.sim, name)
+        if not self.level_of_detail:
+            return t[:idx+1], y[:idx+1]
+        from level_of_detail import TrajectoryLOD
+        lod = self.lod_views.get(name)
+        if lod is None or lod.y is not y or lod.t is not t:
+            # One bucket per pixel column of the widest trajectory axes
+            n_buckets = self.ax_temp.bbox.width
+            lod = self.lod_views[name] = TrajectoryLOD(t, y, n_buckets)
+        return lod.view(idx)
+    
     def plot_reservoir_visual(self):
         """Visual representation of the two reservoirs."""
+        import matplotlib.patches as patches
+
         self.ax_visual.clear()
         self.ax_visual.set_xlim(0, 10)
         self.ax_visual.set_ylim(0, 3)
@@ -268,20 +1002,9 @@ class InteractiveVisualizer:
         T_h = self.sim.T_hot[idx]
         T_c = self.sim.T_cold[idx]
         
-        # Color mapping (red = hot, blue = cold)
-        def temp_to_color(T):
-            # Normalize temperature to color
-            T_min, T_max = 250, 500
-            normalized = (T - T_min) / (T_max - T_min)
-            normalized = np.clip(normalized, 0, 1)
-            # Red for hot, blue for cold
-            r = normalized
-            b = 1 - normalized
-            return (r, 0.2, b)
-        
         # Hot reservoir (left)
         hot_rect = patches.Rectangle((1, 0.5), 2, 2, 
-                                     facecolor=temp_to_color(T_h), 
+                                     facecolor=self.temp_to_color(T_h), 
                                      edgecolor='black', linewidth=2)
         self.ax_visual.add_patch(hot_rect)
         self.ax_visual.text(2, 2.7, f'HOT\n{T_h:.1f} K', 
@@ -289,7 +1012,7 @@ class InteractiveVisualizer:
         
         # Cold reservoir (right)
         cold_rect = patches.Rectangle((7, 0.5), 2, 2, 
-                                      facecolor=temp_to_color(T_c), 
+                                      facecolor=self.temp_to_color(T_c), 
                                       edgecolor='black', linewidth=2)
         self.ax_visual.add_patch(cold_rect)
         self.ax_visual.text(8, 2.7, f'COLD\n{T_c:.1f} K', 
@@ -319,9 +1042,9 @@ class InteractiveVisualizer:
         
         idx = min(self.sim.current_step, self.sim.n_steps - 1)
         
-        self.ax_temp.plot(self.sim.time[:idx+1], self.sim.T_hot[:idx+1], 
+        self.ax_temp.plot(*self.plot_data('T_hot', idx), 
                          'r-', linewidth=2, label='Hot Reservoir')
-        self.ax_temp.plot(self.sim.time[:idx+1], self.sim.T_cold[:idx+1], 
+        self.ax_temp.plot(*self.plot_data('T_cold', idx), 
                          'b-', linewidth=2, label='Cold Reservoir')
         self.ax_temp.axhline(self.sim.T_eq, color='green', linestyle='--', 
                             linewidth=2, label='Equilibrium')
@@ -339,7 +1062,8 @@ class InteractiveVisualizer:
         
         idx = min(self.sim.current_step, self.sim.n_steps - 1)
         
-        self.ax_heat.plot(self.sim.time[:idx+1], self.sim.Q_transferred[:idx+1]/1000, 
+        t, Q = self.plot_data('Q_transferred', idx)
+        self.ax_heat.plot(t, Q/1000, 
                          'purple', linewidth=2)
         
         self.ax_heat.set_xlabel('Time (s)', fontsize=11)
@@ -354,7 +1078,7 @@ class InteractiveVisualizer:
         
         idx = min(self.sim.current_step, self.sim.n_steps - 1)
         
-        self.ax_entropy.plot(self.sim.time[:idx+1], self.sim.S_gen_cumulative[:idx+1], 
+        self.ax_entropy.plot(*self.plot_data('S_gen_cumulative', idx), 
                             'orange', linewidth=2, label='Total Entropy Generated')
         
         self.ax_entropy.set_xlabel('Time (s)', fontsize=11)
@@ -377,7 +1101,7 @@ class InteractiveVisualizer:
         
         idx = min(self.sim.current_step, self.sim.n_steps - 1)
         
-        self.ax_flux.plot(self.sim.time[:idx+1], self.sim.heat_flux[:idx+1], 
+        self.ax_flux.plot(*self.plot_data('heat_flux', idx), 
                          'darkgreen', linewidth=2)
         
         self.ax_flux.set_xlabel('Time (s)', fontsize=11)
@@ -390,30 +1114,54 @@ class InteractiveVisualizer:
         """Animation function."""
         if self.is_playing and self.sim.current_step < self.sim.n_steps - 1:
             # Advance several steps per frame for smoother animation
-            for _ in range(5):
-                if not self.sim.step():
+            if self.incremental:
+                # Compute only up to the frame being displayed
+                if not self.sim.advance_to(self.sim.current_step + 5):
                     self.is_playing = False
-                    break
-            self.plot_all()
+            else:
+                for _ in range(5):
+                    if not self.sim.step():
+                        self.is_playing = False
+                        break
+            if self.render_mode == "Blit":
+                self.blit_frame()
+            else:
+                self.plot_all()
         return []
     
     def toggle_animation(self, event):
         """Start/stop animation."""
         self.is_playing = not self.is_playing
         if self.is_playing:
-            if self.animation is None:
+            if self.animation is None and self.render_mode == "Blit":
+                # FuncAnimation would force a full draw_idle after every
+                # frame; a plain timer lets blit_frame() do the drawing.
+                self.animation = self.fig.canvas.new_timer(interval=50)
+                self.animation.add_callback(self.animate, None)
+                self.animation.start()
+            elif self.animation is None:
+                from matplotlib.animation import FuncAnimation
                 self.animation = FuncAnimation(self.fig, self.animate, 
                                               interval=50, blit=False)
-            self.sim.current_step = 0  # Restart from beginning
+            if self.from_table:
+                # Table rows are decimated; animate on the full time grid
+                self.sim.reset_simulation()
+                self.from_table = False
+            if not self.incremental:
+                self.sim.current_step = 0  # Restart from beginning
+            elif not 0 < self.sim.current_step < self.sim.n_steps - 1:
+                self.sim.branch(0)  # Finished run: restart, else resume
         
     def reset_animation(self, event):
         """Reset simulation and animation."""
         self.is_playing = False
         self.sim.reset_simulation()
+        self.sim.T_eq = self.sim._calculate_equilibrium_temp()
         self.plot_all()
     
     def show(self):
         """Display the interactive visualization."""
+        import matplotlib.pyplot as plt
         plt.show()
 
 
@@ -438,8 +1186,32 @@ def main():
     print("  • Heat flux decreases as temperatures approach equilibrium")
     print("=" * 70)
     
-    visualizer = InteractiveVisualizer()
+    import argparse
+    parser = argparse.ArgumentParser(description="Irreversible heat transfer simulation")
+    parser.add_argument("--table", help="directory of a baked slider lookup table")
+    parser.add_argument("--incremental", action="store_true",
+                        help="apply h / mass ratio changes from the current step "
+                             "during playback instead of re-running the simulation")
+    parser.add_argument("--profile", metavar="JSON",
+                        help="time the hot paths, show an FPS overlay and write "
+                             "the timings to JSON on exit")
+    args = parser.parse_args()
+    
+    lookup_table = None
+    if args.table:
+        from slider_table import SliderLookupTable
+        lookup_table = SliderLookupTable(args.table)
+    
+    visualizer = InteractiveVisualizer(lookup_table=lookup_table,
+                                       incremental=args.incremental)
+    if args.profile:
+        from instrumentation import Profiler
+        profiler = Profiler()
+        profiler.attach(visualizer, overlay=True)
     visualizer.show()
+    if args.profile:
+        print(profiler.report())
+        profiler.dump_json(args.profile)
 
 
 if __name__ == "__main__":
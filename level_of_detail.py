@@ -0,0 +1,100 @@
+"""
+Level-of-Detail Plotting
+========================
+Min/max-preserving (M4) downsampling of trajectories for plotting.
+
+A line plot cannot show more than a few points per pixel column, so each
+trajectory is split into fixed buckets of consecutive samples, one bucket
+per pixel column of the full time range, and only the first, minimum,
+maximum and last sample of every bucket is drawn. The rendered line is
+then visually identical to the full-resolution one while the number of
+points handed to matplotlib stays below 4 * n_buckets regardless of the
+run length.
+
+The aggregation is incremental: as the displayed prefix grows (e.g. while
+an animation advances current_step) only the new samples are scanned.
+"""
+
+import numpy as np
+
+
+class TrajectoryLOD:
+    """Incrementally maintained M4 view of y(t)."""
+
+    def __init__(self, t, y, n_buckets):
+        """
+        Parameters:
+        -----------
+        t, y : ndarray
+            Sample times and values; they are read, never copied
+        n_buckets : int
+            Number of buckets over the full length, typically the pixel
+            width of the axes
+        """
+        self.t = t
+        self.y = y
+        self.n_buckets = max(1, int(n_buckets))
+        self.bucket_size = max(1, -(-len(y) // self.n_buckets))
+        self.reset()
+
+    def reset(self):
+        """Forget all aggregated samples."""
+        self.processed = 0
+        self.n_complete = 0
+        n = -(-len(self.y) // self.bucket_size)
+        self.i_min = np.zeros(n, dtype=np.intp)
+        self.i_max = np.zeros(n, dtype=np.intp)
+
+    def update(self, idx):
+        """Aggregate samples up to and including idx (only the new ones)."""
+        target = min(idx + 1, len(self.y))
+        if target < self.processed:
+            # The displayed prefix shrank (e.g. animation restart)
+            self.reset()
+        B = self.bucket_size
+        while self.processed < target:
+            k = self.processed // B
+            bucket_start = k * B
+            stop = min(target, bucket_start + B)
+            if self.processed == bucket_start and stop == bucket_start + B:
+                # Whole buckets at once: vectorized argmin/argmax per row
+                n_full = (target - bucket_start) // B
+                block = self.y[bucket_start:bucket_start + n_full * B].reshape(n_full, B)
+                offsets = bucket_start + B * np.arange(n_full)
+                self.i_min[k:k + n_full] = offsets + block.argmin(axis=1)
+                self.i_max[k:k + n_full] = offsets + block.argmax(axis=1)
+                self.processed = bucket_start + n_full * B
+                self.n_complete = k + n_full
+                continue
+            # Extend the partial bucket with the new samples only
+            segment = self.y[self.processed:stop]
+            lo = self.processed + segment.argmin()
+            hi = self.processed + segment.argmax()
+            if self.processed == bucket_start:
+                self.i_min[k], self.i_max[k] = lo, hi
+            else:
+                if self.y[lo] < self.y[self.i_min[k]]:
+                    self.i_min[k] = lo
+                if self.y[hi] > self.y[self.i_max[k]]:
+                    self.i_max[k] = hi
+            self.processed = stop
+            if stop == bucket_start + B:
+                self.n_complete = k + 1
+
+    def view(self, idx):
+        """
+        Downsampled (t, y) for the prefix [:idx+1].
+
+        Returns the raw slices when they are already short enough.
+        """
+        if idx + 1 <= 4 * self.n_buckets or self.bucket_size == 1:
+            return self.t[:idx+1], self.y[:idx+1]
+        self.update(idx)
+        B = self.bucket_size
+        n = -(-self.processed // B)
+        first = B * np.arange(n)
+        last = np.minimum(first + B, self.processed) - 1
+        points = np.stack([first, self.i_min[:n], self.i_max[:n], last], axis=1)
+        points.sort(axis=1)
+        indices = points.ravel()
+        return self.t[indices], self.y[indices]
@@ -0,0 +1,145 @@
+"""
+Temperature-Dependent Material Properties
+=========================================
+Tabulates properties such as c_p(T) and h(T) on a uniform temperature grid
+once, so evaluating them inside the time-stepping loop is an O(1)
+vectorized gather plus a linear blend instead of a Python callable per
+step.
+
+The table also stores the running integral of the property. For c_p this
+is the specific enthalpy h(T) = ∫ c_p dT, which the equilibrium
+temperature of two reservoirs with temperature-dependent c_p is solved
+from:
+
+    m_hot * [H(T_eq) - H(T_hot)] + m_cold * [H(T_eq) - H(T_cold)] = 0
+"""
+
+import hashlib
+
+import numpy as np
+
+
+class PropertyTable:
+    """
+    Property f(T) sampled on a uniform grid with piecewise-linear interpolation.
+
+    Outside [T_min, T_max] the end segments are extrapolated linearly.
+    """
+
+    def __init__(self, T_min, T_max, values):
+        """
+        Parameters:
+        -----------
+        T_min, T_max : float
+            Temperature range of the grid (K)
+        values : array_like
+            Property values at np.linspace(T_min, T_max, len(values))
+        """
+        self.values = np.asarray(values, dtype=float)
+        if self.values.ndim != 1 or len(self.values) < 2:
+            raise ValueError("values must be a 1-D array with at least two samples")
+        self.T_min = float(T_min)
+        self.T_max = float(T_max)
+        self.dT = (self.T_max - self.T_min) / (len(self.values) - 1)
+        # Exact integral of the interpolant at every grid point
+        self.cumulative = np.concatenate(
+            [[0.0], np.cumsum(0.5 * (self.values[1:] + self.values[:-1]) * self.dT)])
+
+    @classmethod
+    def from_samples(cls, T, values, n=4096):
+        """Resample tabulated (T, values) data, e.g. from a handbook, onto n grid points."""
+        T = np.asarray(T, dtype=float)
+        order = np.argsort(T)
+        grid = np.linspace(T[order[0]], T[order[-1]], n)
+        return cls(grid[0], grid[-1], np.interp(grid, T[order], np.asarray(values)[order]))
+
+    @classmethod
+    def from_polynomial(cls, coefficients, T_min, T_max, n=4096):
+        """
+        Tabulate a polynomial sum(coefficients[k] * T**k) on [T_min, T_max].
+
+        Coefficients are in increasing order, as in numpy.polynomial.
+        """
+        grid = np.linspace(T_min, T_max, n)
+        return cls(T_min, T_max, np.polynomial.polynomial.polyval(grid, coefficients))
+
+    @classmethod
+    def constant(cls, value, T_min=0.0, T_max=5000.0):
+        """Temperature-independent property (useful for comparisons)."""
+        return cls(T_min, T_max, [value, value])
+
+    def _locate(self, T):
+        """Grid segment index and fractional position within it."""
+        x = (np.asarray(T, dtype=float) - self.T_min) / self.dT
+        i = np.clip(np.floor(x), 0, len(self.values) - 2).astype(np.intp)
+        return i, x - i
+
+    def __call__(self, T):
+        """Property value(s) at temperature(s) T."""
+        i, w = self._locate(T)
+        f0 = self.values[i]
+        return f0 + w * (self.values[i + 1] - f0)
+
+    def integral(self, T):
+        """∫ f dT from T_min to T (the specific enthalpy for a c_p table)."""
+        i, w = self._locate(T)
+        f0 = self.values[i]
+        return self.cumulative[i] + self.dT * w * (f0 + 0.5 * w * (self.values[i + 1] - f0))
+
+    def fingerprint(self):
+        """Stable hash of the table contents (used by simulation_key)."""
+        digest = hashlib.sha256(np.array([self.T_min, self.T_max]).tobytes())
+        digest.update(self.values.tobytes())
+        return digest.hexdigest()
+
+
+def equilibrium_temperature_tabulated(T_hot, T_cold, m_hot, m_cold, c_p_table,
+                                      tol=1e-10, max_iter=60):
+    """
+    Equilibrium temperature from the enthalpy balance with c_p = c_p_table(T).
+
+    Safeguarded Newton iteration, vectorized over broadcast inputs: every
+    element keeps a bracket [min(T_hot, T_cold), max(T_hot, T_cold)] and
+    falls back to bisection whenever a Newton step leaves it. Requires
+    c_p > 0 over the bracket, so the balance is monotonic in T.
+
+    Parameters:
+    -----------
+    T_hot, T_cold : float or ndarray
+        Initial temperatures (K)
+    m_hot, m_cold : float or ndarray
+        Masses (kg)
+    c_p_table : PropertyTable
+        Specific heat capacity c_p(T) (J/kg·K)
+    tol : float
+        Convergence tolerance on the temperature (K)
+    max_iter : int
+        Iteration limit
+
+    Returns:
+    --------
+    float or ndarray
+        Equilibrium temperature (K)
+    """
+    T_hot, T_cold, m_hot, m_cold = np.broadcast_arrays(
+        *(np.asarray(a, dtype=float) for a in (T_hot, T_cold, m_hot, m_cold)))
+    target = m_hot * c_p_table.integral(T_hot) + m_cold * c_p_table.integral(T_cold)
+    m_total = m_hot + m_cold
+    lo = np.minimum(T_hot, T_cold)
+    hi = np.maximum(T_hot, T_cold)
+    # Constant-c_p solution as the starting point
+    T = (m_hot * T_hot + m_cold * T_cold) / m_total
+
+    for _ in range(max_iter):
+        residual = m_total * c_p_table.integral(T) - target
+        # The balance increases with T: shrink the bracket around the root
+        lo = np.where(residual < 0, T, lo)
+        hi = np.where(residual > 0, T, hi)
+        T_next = T - residual / (m_total * c_p_table(T))
+        outside = (T_next < lo) | (T_next > hi)
+        T_next = np.where(outside, 0.5 * (lo + hi), T_next)
+        converged = np.abs(T_next - T) <= tol
+        T = T_next
+        if np.all(converged):
+            break
+    return T if T.ndim else float(T)
@@ -0,0 +1,199 @@
+"""
+Multi-core Parameter Sweeps: Irreversible Heat Transfer
+=======================================================
+Splits a large grid of reservoir configurations into chunks and runs them on
+a process pool. Each worker simulates its chunk with BatchHeatTransfer and
+writes the results straight into one shared-memory buffer owned by the
+parent, so no trajectory arrays are pickled back.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from batch_simulation import BatchHeatTransfer
+from irreversible_heat_transfer import TRAJECTORY_FIELDS
+
+# Per-case summary vectors, stored ahead of the trajectories in the buffer
+SUMMARY_FIELDS = ("T_eq", "S_gen_final", "Q_final", "time_to_equilibrium")
+
+
+def _buffer_views(buf, n_cases, n_samples, n_fields):
+    """Summary (n_summary, n_cases) and trajectory (n_fields, n_cases, n_samples) views."""
+    summary = np.ndarray((len(SUMMARY_FIELDS), n_cases), dtype=np.float64, buffer=buf)
+    trajectories = np.ndarray((n_fields, n_cases, n_samples), dtype=np.float64,
+                              buffer=buf, offset=summary.nbytes)
+    return summary, trajectories
+
+
+def _fill_chunk(buf, n_cases, n_samples, fields, start, stop, params, options):
+    """Simulate cases [start, stop) and write them into the shared buffer."""
+    summary, trajectories = _buffer_views(buf, n_cases, n_samples, len(fields))
+    out = {name: trajectories[i, start:stop] for i, name in enumerate(fields)}
+    batch = BatchHeatTransfer(*params, **options["batch"])
+    batch.run(fields=fields, out=out, **options["run"])
+    for i, name in enumerate(SUMMARY_FIELDS):
+        summary[i, start:stop] = getattr(batch, name)
+
+
+def _run_chunk(shm_name, *args):
+    """Worker entry point: attach to the parent's buffer and fill one chunk."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        _fill_chunk(shm.buf, *args)
+    finally:
+        shm.close()
+
+
+class SweepResult:
+    """
+    Results of a ParallelSweep, backed by the shared-memory buffer.
+
+    Summary vectors (T_eq, S_gen_final, Q_final, time_to_equilibrium) are
+    (n_cases,) arrays and each stored trajectory field is an
+    (n_cases, n_samples) array, all in the order of the input grid. Call
+    close() (or use the result as a context manager) to release the buffer;
+    copy any arrays that must outlive it.
+    """
+
+    def __init__(self, shm, n_cases, time_samples, fields):
+        self._shm = shm
+        self.n_cases = n_cases
+        self.time_samples = time_samples
+        self.fields = fields
+        summary, trajectories = _buffer_views(shm.buf, n_cases, len(time_samples),
+                                              len(fields))
+        for i, name in enumerate(SUMMARY_FIELDS):
+            setattr(self, name, summary[i])
+        for name in TRAJECTORY_FIELDS:
+            setattr(self, name, trajectories[fields.index(name)] if name in fields else None)
+
+    def close(self):
+        """Drop the array views and free the shared-memory block."""
+        if self._shm is None:
+            return
+        for name in SUMMARY_FIELDS + TRAJECTORY_FIELDS:
+            setattr(self, name, None)
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ParallelSweep:
+    """
+    Process-pool sweep over reservoir configurations.
+
+    Takes the same (broadcastable) parameters as BatchHeatTransfer. Cases are
+    split into contiguous chunks of chunk_size; chunk i always writes rows
+    [i*chunk_size, (i+1)*chunk_size) of the result, so the output order is
+    deterministic regardless of which worker finishes first.
+    """
+
+    def __init__(self, T_hot_initial, T_cold_initial, h=50, mass_hot=1.0,
+                 mass_cold=1.0, c_p=1000, system_type="Closed",
+                 engine="Vectorized", dt=0.1, t_max=200):
+        params = np.broadcast_arrays(*(np.atleast_1d(np.asarray(p, dtype=float))
+                                       for p in (T_hot_initial, T_cold_initial, h,
+                                                 mass_hot, mass_cold, c_p)))
+        if params[0].ndim != 1:
+            raise ValueError("Sweep parameters must broadcast to a 1-D array of cases")
+        self.params = params
+        self.n_cases = len(params[0])
+        self.batch_options = dict(system_type=system_type, engine=engine,
+                                  dt=dt, t_max=t_max)
+        self.time = np.arange(0, t_max, dt)
+
+    def run(self, max_workers=None, chunk_size=8192, fields=TRAJECTORY_FIELDS,
+            decimate=1, equilibrium_tol=0.01, mp_context=None):
+        """
+        Run the sweep and return a SweepResult.
+
+        Parameters:
+        -----------
+        max_workers : int, optional
+            Number of worker processes (default: os.cpu_count()). With 1 the
+            chunks run in this process, which is handy for debugging.
+        chunk_size : int
+            Number of cases handed to a worker at a time
+        fields : sequence of str
+            Trajectory fields to keep; pass () to keep only the summaries
+        decimate : int
+            Keep every decimate-th sample of each trajectory
+        equilibrium_tol : float
+            |T_hot - T_cold| (K) used for time_to_equilibrium
+        mp_context : multiprocessing context, optional
+            Start method for the workers (e.g. multiprocessing.get_context('spawn'))
+        """
+        fields = tuple(fields)
+        unknown = set(fields) - set(TRAJECTORY_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown trajectory fields: {sorted(unknown)}")
+        max_workers = max_workers or os.cpu_count() or 1
+        time_samples = self.time[::decimate]
+        n_samples = len(time_samples)
+
+        nbytes = 8 * self.n_cases * (len(SUMMARY_FIELDS) + len(fields) * n_samples)
+        shm = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+        options = {
+            "batch": self.batch_options,
+            "run": dict(decimate=decimate, equilibrium_tol=equilibrium_tol),
+        }
+        chunks = [(start, min(start + chunk_size, self.n_cases))
+                  for start in range(0, self.n_cases, chunk_size)]
+        try:
+            if max_workers == 1:
+                for start, stop in chunks:
+                    _fill_chunk(shm.buf, self.n_cases, n_samples, fields, start, stop,
+                                [p[start:stop] for p in self.params], options)
+            else:
+                with ProcessPoolExecutor(max_workers=max_workers,
+                                         mp_context=mp_context) as pool:
+                    futures = [pool.submit(_run_chunk, shm.name, self.n_cases, n_samples,
+                                           fields, start, stop,
+                                           [p[start:stop] for p in self.params], options)
+                               for start, stop in chunks]
+                    for future in as_completed(futures):
+                        future.result()
+        except BaseException:
+            shm.close()
+            shm.unlink()
+            raise
+        return SweepResult(shm, self.n_cases, time_samples, fields)
+
+
+def main():
+    """Time a random sweep of reservoir configurations."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--cases", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=8192)
+    parser.add_argument("--decimate", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    sweep = ParallelSweep(rng.uniform(310, 500, args.cases), rng.uniform(250, 400, args.cases),
+                          h=rng.uniform(10, 200, args.cases),
+                          mass_hot=rng.uniform(0.2, 5.0, args.cases))
+    start = time.perf_counter()
+    with sweep.run(max_workers=args.workers, chunk_size=args.chunk_size,
+                   decimate=args.decimate) as result:
+        elapsed = time.perf_counter() - start
+        print(f"{args.cases} cases in {elapsed:.2f} s "
+              f"({args.cases / elapsed:,.0f} cases/s)")
+        print(f"Mean entropy generated: {np.mean(result.S_gen_final):.3f} J/K")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,430 @@
+"""
+Parameter Fitting: Irreversible Heat Transfer
+=============================================
+Recovers the model parameters from measured hot/cold temperature traces,
+many traces at once. The traces are fitted with the analytic solution of
+the IrreversibleHeatTransfer model (the 'Exact' engine), which for a
+time t since the first sample reads
+
+    T_hot(t)  = T_eq + A exp(-k t)
+    T_cold(t) = T_eq - B exp(-k t)
+
+with A = T_hot_0 - T_eq, B = T_eq - T_cold_0 and k = h/C_hot + h/C_cold
+(C = m c_p). Temperatures alone fix k and the ratio C_hot/C_cold = B/A,
+i.e. the rates h/C_hot and h/C_cold; absolute values of h, C_hot, C_cold
+and the entropy generation need one of them to be known.
+
+Each trace is fitted by Levenberg-Marquardt least squares on
+(T_eq, A, B, log k), started from the best k of a log-spaced grid (for
+fixed k the model is linear in the other three parameters). The Jacobian
+is analytic and only enters through a handful of per-trace sums, so every
+iteration is one streaming pass over the data: traces may be irregularly
+sampled, padded with NaN, memory-mapped .npy arrays or CSV files far
+larger than memory.
+
+Usage:
+    fit = fit_traces(array_source(t, T_hot, T_cold), C_cold=1000.0)
+    fit.h, fit.C_hot, fit.S_gen
+
+    fit = fit_traces(csv_source(["rig1.csv", "rig2.csv"]), h=50.0)
+
+    python parameter_fitting.py rig1.csv rig2.csv --C-cold 1000
+"""
+
+import csv
+import itertools
+
+import numpy as np
+
+from entropy_analysis import irreversible_outcome
+from irreversible_heat_transfer import IrreversibleHeatTransfer
+
+
+def array_source(t, T_hot, T_cold, chunk_size=65536):
+    """
+    Trace source over in-memory or memory-mapped arrays.
+
+    Parameters:
+    -----------
+    t : array_like
+        Sample times (s), (n_samples,) shared by all traces or
+        (n_traces, n_samples) per trace
+    T_hot, T_cold : array_like
+        Measured temperatures (K), (n_samples,) for a single trace or
+        (n_traces, n_samples); NaN marks missing or padding samples
+    chunk_size : int
+        Number of samples per chunk; memory-mapped inputs
+        (np.load(..., mmap_mode='r')) are only read one chunk at a time
+
+    Returns:
+    --------
+    callable
+        Returns a fresh iterator of (t, T_hot, T_cold) chunks of shape
+        (n_traces, chunk) on each call
+    """
+    t = np.asarray(t)
+    T_hot = T_hot if np.ndim(T_hot) == 2 else np.atleast_2d(T_hot)
+    T_cold = T_cold if np.ndim(T_cold) == 2 else np.atleast_2d(T_cold)
+    n_samples = T_hot.shape[1]
+
+    def chunks():
+        for start in range(0, n_samples, chunk_size):
+            sl = slice(start, start + chunk_size)
+            t_chunk = np.asarray(t[..., sl], dtype=float)
+            yield (np.broadcast_to(t_chunk, T_hot[:, sl].shape),
+                   np.asarray(T_hot[:, sl], dtype=float),
+                   np.asarray(T_cold[:, sl], dtype=float))
+    return chunks
+
+
+def csv_source(paths, columns=("time", "T_hot", "T_cold"), chunk_size=65536):
+    """
+    Trace source streaming one CSV file per trace.
+
+    Every file needs a header row naming the columns; rows are read
+    chunk_size at a time, and shorter files are padded with NaN. Each pass
+    of the fit re-reads the files, so memory stays at O(n_traces * chunk_size).
+
+    Parameters:
+    -----------
+    paths : str or sequence of str
+        CSV file(s), one trace each
+    columns : tuple of str
+        Names of the time (s), hot and cold temperature (K) columns
+    chunk_size : int
+        Number of rows read per file and chunk
+    """
+    paths = [paths] if isinstance(paths, str) else list(paths)
+
+    def read_chunk(reader, index):
+        rows = list(itertools.islice(reader, chunk_size))
+        if not rows:
+            return np.empty((0, 3))
+        return np.array([[row[i] for i in index] for row in rows], dtype=float)
+
+    def chunks():
+        files = [open(path, newline="") for path in paths]
+        try:
+            readers = [csv.reader(f) for f in files]
+            indices = []
+            for path, reader in zip(paths, readers):
+                header = [name.strip() for name in next(reader)]
+                missing = [name for name in columns if name not in header]
+                if missing:
+                    raise ValueError(f"{path}: missing columns {missing}")
+                indices.append([header.index(name) for name in columns])
+            while True:
+                blocks = [read_chunk(reader, index)
+                          for reader, index in zip(readers, indices)]
+                width = max(len(block) for block in blocks)
+                if width == 0:
+                    return
+                chunk = np.full((3, len(blocks), width), np.nan)
+                for i, block in enumerate(blocks):
+                    chunk[:, i, :len(block)] = block.T
+                yield tuple(chunk)
+        finally:
+            for f in files:
+                f.close()
+    return chunks
+
+
+def _valid(t, T_hot, T_cold):
+    """Mask of usable samples and the chunk with NaNs replaced by zeros."""
+    mask = np.isfinite(t) & np.isfinite(T_hot) & np.isfinite(T_cold)
+    return (mask, np.where(mask, t, 0.0), np.where(mask, T_hot, 0.0),
+            np.where(mask, T_cold, 0.0))
+
+
+def _scan(source):
+    """First pass: sample count, first/last sample time and plain moments per trace."""
+    stats = None
+    for t, T_hot, T_cold in source():
+        mask, t, T_hot, T_cold = _valid(t, T_hot, T_cold)
+        if stats is None:
+            n = len(t)
+            stats = {"n": np.zeros(n), "t_first": np.full(n, np.nan),
+                     "t_last": np.full(n, np.nan), "sum": np.zeros(n),
+                     "sum_sq": np.zeros(n)}
+        has = mask.any(axis=1)
+        first = np.where(has, t[np.arange(len(t)), mask.argmax(axis=1)], np.nan)
+        stats["t_first"] = np.where(np.isnan(stats["t_first"]), first, stats["t_first"])
+        t_max = np.where(mask, t, -np.inf).max(axis=1)
+        stats["t_last"] = np.where(has, np.fmax(stats["t_last"], t_max), stats["t_last"])
+        stats["n"] += mask.sum(axis=1)
+        stats["sum"] += (T_hot + T_cold).sum(axis=1)
+        stats["sum_sq"] += (T_hot ** 2 + T_cold ** 2).sum(axis=1)
+    if stats is None:
+        raise ValueError("the trace source yielded no data")
+    return stats
+
+
+def _grid_start(source, stats, n_grid):
+    """
+    Best (T_eq, A, B, log k) per trace over a log-spaced grid of k.
+
+    For fixed k the model is linear in (T_eq, A, B), so one pass collects
+    the sums of its 3x3 normal equations for every grid value at once.
+    """
+    duration = np.maximum(stats["t_last"] - stats["t_first"], 1e-12)
+    # k * duration from 1e-2 (barely decayed) to 1e3 (equilibrated at once)
+    kd = np.logspace(-2, 3, n_grid)
+    k = kd[:, None] / duration[None, :]
+    n_traces = len(duration)
+    sums = np.zeros((4, n_grid, n_traces))  # Σe, Σe², Σe T_hot, Σe T_cold
+    for t, T_hot, T_cold in source():
+        mask, t, T_hot, T_cold = _valid(t, T_hot, T_cold)
+        t = (t - stats["t_first"][:, None]) * mask
+        for g in range(n_grid):
+            e = np.exp(-k[g][:, None] * t)
+            e *= mask
+            sums[0, g] += e.sum(axis=1)
+            sums[1, g] += (e * e).sum(axis=1)
+            sums[2, g] += (e * T_hot).sum(axis=1)
+            sums[3, g] += (e * T_cold).sum(axis=1)
+
+    s_e, s_ee, s_eh, s_ec = sums
+    N = np.broadcast_to(stats["n"], s_e.shape)
+    M = np.zeros(s_e.shape + (3, 3))
+    M[..., 0, 0] = 2 * N
+    M[..., 0, 1] = M[..., 1, 0] = s_e
+    M[..., 0, 2] = M[..., 2, 0] = -s_e
+    M[..., 1, 1] = M[..., 2, 2] = s_ee
+    rhs = np.stack([np.broadcast_to(stats["sum"], s_e.shape), s_eh, -s_ec], axis=-1)
+    # Tiny ridge keeps traces without decay (k -> 0, e == 1) solvable
+    M += 1e-12 * np.eye(3) * (1 + M[..., [0], [0]][..., None])
+    u = np.linalg.solve(M, rhs[..., None])[..., 0]
+    sse = (stats["sum_sq"] - 2 * np.einsum("...i,...i", u, rhs)
+           + np.einsum("...i,...ij,...j", u, M, u))
+    best = np.argmin(sse, axis=0)
+    cols = np.arange(n_traces)
+    return np.column_stack([u[best, cols], np.log(k[best, cols])])
+
+
+def _normal_equations(source, t_first, n, theta, rows):
+    """
+    One pass: J^T J, J^T r and the residual sum of squares of the traces `rows`.
+
+    With e = exp(-k t) and g = k t e, the model derivatives with respect to
+    (T_eq, A, B, log k) are (1, e, 0, -A g) for the hot and (1, 0, -e, B g)
+    for the cold trace, so J^T J and J^T r follow from ten sums per trace
+    instead of an (n_samples, 4) Jacobian. Only the selected rows of each
+    chunk are evaluated, so converged traces cost nothing but the read.
+    """
+    t_first, n = t_first[rows], n[rows]
+    T_eq, A, B = theta[:, 0, None], theta[:, 1, None], theta[:, 2, None]
+    k = np.exp(theta[:, 3, None])
+    s = dict.fromkeys(("e", "ee", "g", "eg", "gg", "r", "e_rh", "e_rc",
+                       "g_rh", "g_rc", "sse"), 0.0)
+    for t, T_hot, T_cold in source():
+        mask, t, T_hot, T_cold = _valid(t[rows], T_hot[rows], T_cold[rows])
+        t = (t - t_first[:, None]) * mask
+        e = np.exp(-k * t)
+        e *= mask
+        g = k * t * e
+        r_h = (T_hot - T_eq - A * e) * mask
+        r_c = (T_cold - T_eq + B * e) * mask
+        for name, values in (("e", e), ("ee", e * e), ("g", g), ("eg", e * g),
+                             ("gg", g * g), ("r", r_h + r_c), ("e_rh", e * r_h),
+                             ("e_rc", e * r_c), ("g_rh", g * r_h), ("g_rc", g * r_c),
+                             ("sse", r_h * r_h + r_c * r_c)):
+            s[name] = s[name] + values.sum(axis=1)
+
+    A, B = A[:, 0], B[:, 0]
+    JTJ = np.zeros((len(theta), 4, 4))
+    JTJ[:, 0, 0] = 2 * n
+    JTJ[:, 0, 1] = s["e"]
+    JTJ[:, 0, 2] = -s["e"]
+    JTJ[:, 0, 3] = (B - A) * s["g"]
+    JTJ[:, 1, 1] = s["ee"]
+    JTJ[:, 1, 3] = -A * s["eg"]
+    JTJ[:, 2, 2] = s["ee"]
+    JTJ[:, 2, 3] = -B * s["eg"]
+    JTJ[:, 3, 3] = (A * A + B * B) * s["gg"]
+    JTJ += np.triu(JTJ, 1).transpose(0, 2, 1)
+    JTr = np.column_stack([s["r"], s["e_rh"], -s["e_rc"],
+                           -A * s["g_rh"] + B * s["g_rc"]])
+    return JTJ, JTr, s["sse"]
+
+
+class TraceFit:
+    """
+    Fitted parameters of a batch of traces; every attribute is an (n_traces,) array.
+
+    Always available: T_hot_0 and T_cold_0 (K, at the first sample),
+    T_eq (K), k (1/s), rate_hot = h/C_hot and rate_cold = h/C_cold (1/s),
+    capacity_ratio = C_hot/C_cold (= m_hot/m_cold for a common c_p),
+    rms (K, residual over both traces), n_samples, t_start and duration
+    (s, first sample time and recording length), iterations and converged.
+
+    With a known scale (h, C_hot or C_cold passed to fit_traces) also:
+    h (W/K), C_hot and C_cold (J/K), S_gen (J/K, generated until
+    equilibrium) and S_gen_window (J/K, generated during the recording);
+    otherwise these are NaN.
+    """
+
+    def __init__(self, theta, stats, sse, iterations, converged, h=None, C_hot=None,
+                 C_cold=None):
+        T_eq, A, B, log_k = theta.T
+        self.T_eq = T_eq
+        self.T_hot_0 = T_eq + A
+        self.T_cold_0 = T_eq - B
+        self.k = np.exp(log_k)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.rate_hot = self.k * A / (A + B)
+            self.rate_cold = self.k * B / (A + B)
+            self.capacity_ratio = B / A
+        self.n_samples = stats["n"].astype(int)
+        self.t_start = stats["t_first"]
+        self.duration = stats["t_last"] - stats["t_first"]
+        self.rms = np.sqrt(sse / np.maximum(2 * stats["n"], 1))
+        self.iterations = iterations
+        self.converged = converged
+
+        given = [name for name, value in (("h", h), ("C_hot", C_hot), ("C_cold", C_cold))
+                 if value is not None]
+        if len(given) > 1:
+            raise ValueError(f"Pass at most one of h, C_hot and C_cold, got {given}")
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if h is not None:
+                self.h = np.broadcast_to(np.asarray(h, dtype=float), T_eq.shape).copy()
+            elif C_hot is not None:
+                self.h = self.rate_hot * C_hot
+            elif C_cold is not None:
+                self.h = self.rate_cold * C_cold
+            else:
+                self.h = np.full(T_eq.shape, np.nan)
+            self.C_hot = self.h / self.rate_hot
+            self.C_cold = self.h / self.rate_cold
+
+        # Entropy generation of the fitted process (heat capacities as m with c_p = 1)
+        self.S_gen = irreversible_outcome(self.T_hot_0, self.T_cold_0, self.C_hot,
+                                          self.C_cold, 1.0).S_gen
+        decay = np.exp(-self.k * self.duration)
+        self.S_gen_window = (self.C_hot * np.log((T_eq + A * decay) / self.T_hot_0)
+                             + self.C_cold * np.log((T_eq - B * decay) / self.T_cold_0))
+
+    def __len__(self):
+        return len(self.T_eq)
+
+    def predict(self, t, trace=0):
+        """Fitted (T_hot, T_cold) of one trace at sample times t (s, same clock as the data)."""
+        e = np.exp(-self.k[trace] * (np.asarray(t, dtype=float) - self.t_start[trace]))
+        return (self.T_eq[trace] + (self.T_hot_0[trace] - self.T_eq[trace]) * e,
+                self.T_eq[trace] - (self.T_eq[trace] - self.T_cold_0[trace]) * e)
+
+    def simulation(self, trace=0, c_p=1000, **kwargs):
+        """
+        IrreversibleHeatTransfer reproducing one fitted trace.
+
+        Needs a known scale; the masses are C_hot / c_p and C_cold / c_p.
+        The 'Exact' engine is used unless another engine is passed.
+        """
+        if np.isnan(self.h[trace]):
+            raise ValueError("absolute parameters unknown; fit with h, C_hot or C_cold")
+        kwargs.setdefault("engine", "Exact")
+        sim = IrreversibleHeatTransfer(self.T_hot_0[trace], self.T_cold_0[trace],
+                                       mass_hot=self.C_hot[trace] / c_p,
+                                       mass_cold=self.C_cold[trace] / c_p,
+                                       c_p=c_p, **kwargs)
+        sim.h = self.h[trace]
+        return sim
+
+    def summary(self):
+        """Return the per-trace results as a dict of arrays."""
+        return {name: getattr(self, name) for name in (
+            "T_hot_0", "T_cold_0", "T_eq", "k", "rate_hot", "rate_cold",
+            "capacity_ratio", "h", "C_hot", "C_cold", "S_gen", "S_gen_window",
+            "rms", "n_samples", "converged")}
+
+
+def fit_traces(source, h=None, C_hot=None, C_cold=None, max_iter=50, rtol=1e-10,
+               n_grid=24):
+    """
+    Fit the two-reservoir model to every trace of a source.
+
+    Parameters:
+    -----------
+    source : callable
+        Trace source from array_source() or csv_source(), or any callable
+        returning an iterator of (t, T_hot, T_cold) chunks of shape
+        (n_traces, chunk)
+    h, C_hot, C_cold : float or array_like, optional
+        At most one known scale (W/K or J/K, scalar or per trace) that turns
+        the fitted rates into absolute h, C_hot, C_cold and S_gen
+    max_iter : int
+        Maximum number of Levenberg-Marquardt iterations (one pass each)
+    rtol : float
+        A trace has converged once an accepted step reduces its residual
+        sum of squares by less than this fraction
+    n_grid : int
+        Number of k values tried for the starting point
+
+    Returns:
+    --------
+    TraceFit
+    """
+    stats = _scan(source)
+    if np.any(stats["n"] < 4):
+        raise ValueError("every trace needs at least four valid samples")
+    theta = _grid_start(source, stats, n_grid)
+    n_traces = len(theta)
+    JTJ, JTr, sse = _normal_equations(source, stats["t_first"], stats["n"], theta,
+                                      np.arange(n_traces))
+
+    damping = np.full(n_traces, 1e-3)
+    converged = np.zeros(n_traces, dtype=bool)
+    iterations = np.zeros(n_traces, dtype=int)
+    eye = np.eye(4)
+    for _ in range(max_iter):
+        active = np.flatnonzero(~converged)
+        if not len(active):
+            break
+        # Marquardt scaling: damp each parameter relative to its curvature
+        diagonal = np.einsum("nii->ni", JTJ[active])
+        lhs = JTJ[active] + (damping[active, None] * diagonal + 1e-30)[:, :, None] * eye
+        trial = theta[active] + np.linalg.solve(lhs, JTr[active, :, None])[..., 0]
+        JTJ_t, JTr_t, sse_t = _normal_equations(source, stats["t_first"], stats["n"],
+                                                trial, active)
+
+        better = sse_t <= sse[active]
+        iterations[active] += 1
+        converged[active] = ((better & (sse[active] - sse_t <= rtol * sse[active]))
+                             | (damping[active] > 1e12))
+        accepted = active[better]
+        theta[accepted] = trial[better]
+        JTJ[accepted], JTr[accepted], sse[accepted] = JTJ_t[better], JTr_t[better], sse_t[better]
+        damping[active] = np.where(better, damping[active] / 3, damping[active] * 4)
+
+    return TraceFit(theta, stats, sse, iterations, converged, h=h, C_hot=C_hot,
+                    C_cold=C_cold)
+
+
+def main():
+    """Fit CSV traces from the command line and print one row per trace."""
+    import argparse
+    parser = argparse.ArgumentParser(description="Fit h and heat capacities to "
+                                                 "measured temperature traces")
+    parser.add_argument("paths", nargs="+", help="CSV files with time, T_hot, T_cold columns")
+    scale = parser.add_mutually_exclusive_group()
+    scale.add_argument("--h", type=float, help="known heat transfer coefficient (W/K)")
+    scale.add_argument("--C-hot", type=float, help="known hot heat capacity m*c_p (J/K)")
+    scale.add_argument("--C-cold", type=float, help="known cold heat capacity m*c_p (J/K)")
+    parser.add_argument("--columns", nargs=3, default=("time", "T_hot", "T_cold"),
+                        metavar=("TIME", "HOT", "COLD"), help="CSV column names")
+    args = parser.parse_args()
+
+    fit = fit_traces(csv_source(args.paths, columns=tuple(args.columns)),
+                     h=args.h, C_hot=args.C_hot, C_cold=args.C_cold)
+    print(f"{'trace':<24} {'T_hot_0':>8} {'T_cold_0':>8} {'T_eq':>8} {'h/C_hot':>10} "
+          f"{'h/C_cold':>10} {'h':>9} {'C_hot':>10} {'C_cold':>10} {'S_gen':>9} {'rms':>7}")
+    for i, path in enumerate(args.paths):
+        print(f"{path[-24:]:<24} {fit.T_hot_0[i]:8.2f} {fit.T_cold_0[i]:8.2f} "
+              f"{fit.T_eq[i]:8.2f} {fit.rate_hot[i]:10.3e} {fit.rate_cold[i]:10.3e} "
+              f"{fit.h[i]:9.3f} {fit.C_hot[i]:10.2f} {fit.C_cold[i]:10.2f} "
+              f"{fit.S_gen[i]:9.3f} {fit.rms[i]:7.3f}"
+              + ("" if fit.converged[i] else "  (not converged)"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,575 @@
+"""
+Simulation Service: Irreversible Heat Transfer over HTTP and WebSocket
+=====================================================================
+Serves IrreversibleHeatTransfer runs to many dashboard clients at once from
+one asyncio event loop (standard library only):
+
+    POST /simulate   JSON parameter set -> NDJSON trajectory stream
+    GET  /simulate?T_hot_initial=450&h=80   same, parameters in the query
+    GET  /stats      request, coalescing, cache and slow-client counters
+    GET  /ws         WebSocket; every text message is a parameter set with
+                     an optional "id", answered by a stream of messages
+                     carrying that id
+
+A response is a sequence of JSON objects: one "meta" object, "data"
+objects with up to chunk_size samples of time and every trajectory field,
+and an "end" object with the final values.
+
+The event loop never simulates: runs go to a process pool, whose workers
+also encode the response, so the loop only moves bytes. Identical
+parameter sets that are in flight at the same time share one run
+(coalescing), and finished responses are kept in an LRU with a byte
+budget. Every write waits for the client to drain its socket buffer, so a
+slow client only holds back its own stream, and a client that takes
+longer than send_timeout to accept data is disconnected. Beyond
+max_inflight distinct runs, new ones are refused with 503 / "busy".
+
+Usage:
+    python simulation_service.py --port 8765 --workers 4
+    curl -d '{"T_hot_initial": 450, "h": 80, "decimate": 10}' localhost:8765/simulate
+    python benchmarks/load_test_service.py --clients 64 --requests 5000
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import signal
+import struct
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qsl, urlsplit
+
+from irreversible_heat_transfer import ENGINES, TRAJECTORY_FIELDS, IrreversibleHeatTransfer
+
+# Accepted request parameters and their defaults (IrreversibleHeatTransfer's)
+PARAM_DEFAULTS = {
+    "T_hot_initial": 400.0,
+    "T_cold_initial": 300.0,
+    "h": 50.0,
+    "mass_hot": 1.0,
+    "mass_cold": 1.0,
+    "c_p": 1000.0,
+    "system_type": "Closed",
+    "engine": "Vectorized",
+    "dt": 0.1,
+    "t_max": 200.0,
+    "decimate": 1,
+}
+SYSTEM_TYPES = ("Closed", "Open", "Isolated")
+
+# Largest run a request may ask for (t_max / dt)
+MAX_STEPS = 10**6
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class ServiceBusy(Exception):
+    """Raised when max_inflight distinct runs are already in progress."""
+
+
+class BadRequest(ValueError):
+    """Raised for an HTTP request that cannot be parsed."""
+
+
+class SlowClient(ConnectionError):
+    """Raised when a client does not accept data within send_timeout."""
+
+
+def normalize_params(raw):
+    """
+    Validate a request's parameter set and fill in the defaults.
+
+    Raises ValueError with a message for the client on unknown names,
+    non-numeric or non-finite values, out-of-range values, runs longer
+    than MAX_STEPS or Euler time steps beyond the stability limit.
+    """
+    unknown = set(raw) - set(PARAM_DEFAULTS)
+    if unknown:
+        raise ValueError(f"unknown parameters {sorted(unknown)}")
+    params = dict(PARAM_DEFAULTS)
+    for name, value in raw.items():
+        default = PARAM_DEFAULTS[name]
+        try:
+            params[name] = type(default)(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{name} must be {type(default).__name__}, got {value!r}")
+        if isinstance(params[name], float) and not math.isfinite(params[name]):
+            raise ValueError(f"{name} must be finite, got {value!r}")
+    if params["system_type"] not in SYSTEM_TYPES:
+        raise ValueError(f"system_type must be one of {SYSTEM_TYPES}")
+    if params["engine"] not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}")
+    if not (params["dt"] > 0 and params["t_max"] > 0 and params["decimate"] >= 1):
+        raise ValueError("dt, t_max and decimate must be positive")
+    if params["t_max"] / params["dt"] > MAX_STEPS:
+        raise ValueError(f"t_max / dt must not exceed {MAX_STEPS}")
+    if min(params["T_hot_initial"], params["T_cold_initial"], params["mass_hot"],
+           params["mass_cold"], params["c_p"]) <= 0:
+        raise ValueError("temperatures, masses and c_p must be positive")
+    if params["h"] < 0:
+        raise ValueError("h must not be negative")
+    # Explicit Euler ('Loop', 'Vectorized') multiplies ΔT by 1 - k*dt per
+    # step, which only decays for k*dt < 2
+    k = params["h"] * (1 / params["mass_hot"] + 1 / params["mass_cold"]) / params["c_p"]
+    if (params["engine"] in ("Loop", "Vectorized") and params["system_type"] != "Isolated"
+            and k * params["dt"] >= 2):
+        raise ValueError(f"unstable: h (1/C_hot + 1/C_cold) dt = {k * params['dt']:.3g} "
+                         f"must be below 2 for the explicit Euler engine "
+                         f"'{params['engine']}'; use dt < {2 / k:.3g} or engine 'Exact'")
+    return params
+
+
+def _reject_constant(name):
+    """json.loads hook: refuse the non-standard NaN / Infinity literals."""
+    raise ValueError(f"{name} is not valid JSON")
+
+
+def request_key(params):
+    """Canonical hash of a normalized parameter set (the coalescing key)."""
+    return hashlib.sha256(repr(sorted(params.items())).encode()).hexdigest()
+
+
+def simulate_frames(params, chunk_size=500):
+    """
+    Run one simulation and encode it as newline-terminated JSON objects.
+
+    Runs in the worker processes; returns the list of encoded frames.
+    """
+    sim = IrreversibleHeatTransfer(params["T_hot_initial"], params["T_cold_initial"],
+                                   params["mass_hot"], params["mass_cold"], params["c_p"],
+                                   system_type=params["system_type"],
+                                   engine=params["engine"])
+    sim.h = params["h"]
+    sim.dt = params["dt"]
+    sim.t_max = params["t_max"]
+    sim.reset_simulation()
+    sim.run_full_simulation()
+
+    step = params["decimate"]
+    columns = {"time": sim.time[::step]}
+    columns.update((name, getattr(sim, name)[::step]) for name in TRAJECTORY_FIELDS)
+    n_samples = len(columns["time"])
+
+    def encode(obj):
+        return json.dumps(obj, separators=(",", ":"), allow_nan=False).encode() + b"\n"
+
+    frames = [encode({"type": "meta", "params": params, "n_samples": n_samples,
+                      "fields": list(columns)})]
+    for start in range(0, n_samples, chunk_size):
+        data = {"type": "data", "offset": start}
+        data.update((name, values[start:start + chunk_size].tolist())
+                    for name, values in columns.items())
+        frames.append(encode(data))
+    frames.append(encode({"type": "end", "T_eq": float(sim.T_eq),
+                          "T_hot_final": float(sim.T_hot[-1]),
+                          "T_cold_final": float(sim.T_cold[-1]),
+                          "Q_final": float(sim.Q_transferred[-1]),
+                          "S_gen_final": float(sim.S_gen_cumulative[-1])}))
+    return frames
+
+
+class SimulationService:
+    """
+    asyncio HTTP/WebSocket front end for a process pool of simulations.
+
+    Counters (stats()):
+    - requests:       parameter sets received (HTTP and WebSocket)
+    - computed:       runs submitted to the process pool
+    - coalesced:      requests attached to an identical in-flight run
+    - cache_hits:     requests answered from the response cache
+    - rejected:       requests refused (bad parameters or busy)
+    - errors:         runs that failed in the worker (500 / "error")
+    - slow_clients:   connections dropped after send_timeout
+    """
+
+    def __init__(self, max_workers=None, chunk_size=500, cache_bytes=256 * 2**20,
+                 max_inflight=1024, send_timeout=10.0, write_buffer=256 * 2**10,
+                 max_streams=8, mp_context=None):
+        """
+        Parameters:
+        -----------
+        max_workers : int, optional
+            Simulation worker processes (default: os.cpu_count())
+        chunk_size : int
+            Samples per "data" frame
+        cache_bytes : int
+            Budget of the finished-response LRU (bytes of encoded frames)
+        max_inflight : int
+            Distinct runs queued or running at once before refusing new ones
+        send_timeout : float
+            Seconds a client may take to drain write_buffer before it is
+            disconnected
+        write_buffer : int
+            Socket write buffer (bytes) above which a stream pauses
+        max_streams : int
+            Concurrent streams per WebSocket connection; further messages
+            are not read until one finishes
+        mp_context : multiprocessing context, optional
+            Start method for the workers. Defaults to 'forkserver' (or
+            'spawn'): workers forked from the serving process would inherit
+            its client sockets and keep closed connections open.
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.cache_bytes = cache_bytes
+        self.max_inflight = max_inflight
+        self.send_timeout = send_timeout
+        self.write_buffer = write_buffer
+        self.max_streams = max_streams
+        if mp_context is None:
+            method = ("forkserver" if "forkserver" in multiprocessing.get_all_start_methods()
+                      else "spawn")
+            mp_context = multiprocessing.get_context(method)
+        self.pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=mp_context)
+        self._inflight = {}
+        self._results = OrderedDict()
+        self._cached_bytes = 0
+        self.counters = dict.fromkeys(("requests", "computed", "coalesced", "cache_hits",
+                                       "rejected", "errors", "slow_clients"), 0)
+        self.server = None
+
+    async def start(self, host="127.0.0.1", port=8765):
+        """Start the workers, then listen; returns the asyncio.Server."""
+        # Let the workers import the model before the first request needs them
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.pool, normalize_params, {})
+                               for _ in range(self.max_workers)))
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self.server
+
+    async def close(self):
+        """Stop accepting connections and shut the worker pool down."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        """Counters plus the current in-flight and cache sizes."""
+        return dict(self.counters, inflight=len(self._inflight),
+                    cached=len(self._results), cached_bytes=self._cached_bytes)
+
+    async def simulate(self, params):
+        """
+        Encoded frames for a normalized parameter set.
+
+        Served from the cache, attached to an identical in-flight run, or
+        submitted to the pool. Awaiters are shielded from each other: a
+        client that disconnects does not cancel the run for the others.
+        """
+        self.counters["requests"] += 1
+        key = request_key(params)
+        frames = self._results.get(key)
+        if frames is not None:
+            self._results.move_to_end(key)
+            self.counters["cache_hits"] += 1
+            return frames
+        future = self._inflight.get(key)
+        if future is not None:
+            self.counters["coalesced"] += 1
+        else:
+            if len(self._inflight) >= self.max_inflight:
+                self.counters["rejected"] += 1
+                raise ServiceBusy(f"{self.max_inflight} runs in progress")
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.pool, simulate_frames, params, self.chunk_size)
+            self._inflight[key] = future
+            future.add_done_callback(lambda f: self._finish(key, f))
+            self.counters["computed"] += 1
+        return await asyncio.shield(future)
+
+    def _finish(self, key, future):
+        """Move a completed run from the in-flight table into the cache."""
+        del self._inflight[key]
+        if future.cancelled() or future.exception() is not None:
+            return
+        frames = future.result()
+        size = sum(len(frame) for frame in frames)
+        if size > self.cache_bytes:
+            return
+        self._results[key] = frames
+        self._cached_bytes += size
+        while self._cached_bytes > self.cache_bytes:
+            _, old = self._results.popitem(last=False)
+            self._cached_bytes -= sum(len(frame) for frame in old)
+
+    async def _send(self, writer, data):
+        """Write data and wait until the client has taken it (backpressure)."""
+        writer.write(data)
+        try:
+            await asyncio.wait_for(writer.drain(), self.send_timeout)
+        except asyncio.TimeoutError:
+            self.counters["slow_clients"] += 1
+            raise SlowClient(f"client did not read for {self.send_timeout} s")
+
+    async def handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests (keep-alive) or one WebSocket session."""
+        writer.transport.set_write_buffer_limits(high=self.write_buffer)
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except BadRequest as error:
+                    # The stream position is unknown after a bad request
+                    self.counters["requests"] += 1
+                    self.counters["rejected"] += 1
+                    await self._respond(writer, 400, {"error": str(error)}, False)
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                if headers.get("upgrade", "").lower() == "websocket":
+                    await self._serve_websocket(reader, writer, headers)
+                    break
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._serve_http(writer, method, target, body, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            writer.close()
+
+    async def _serve_http(self, writer, method, target, body, keep_alive):
+        url = urlsplit(target)
+        if url.path == "/stats" and method == "GET":
+            await self._respond(writer, 200, self.stats(), keep_alive)
+            return
+        if url.path != "/simulate":
+            await self._respond(writer, 404, {"error": f"no route {url.path}"}, keep_alive)
+            return
+        if method not in ("GET", "POST"):
+            await self._respond(writer, 405, {"error": "use GET or POST"}, keep_alive)
+            return
+        try:
+            if method == "POST":
+                raw = json.loads(body or b"{}", parse_constant=_reject_constant)
+                if not isinstance(raw, dict):
+                    raise ValueError("body must be a JSON object")
+            else:
+                raw = dict(parse_qsl(url.query))
+            params = normalize_params(raw)
+        except ValueError as error:
+            self.counters["requests"] += 1
+            self.counters["rejected"] += 1
+            await self._respond(writer, 400, {"error": str(error)}, keep_alive)
+            return
+        try:
+            frames = await self.simulate(params)
+        except ServiceBusy as error:
+            await self._respond(writer, 503, {"error": str(error)}, keep_alive)
+            return
+        except Exception as error:
+            self.counters["errors"] += 1
+            await self._respond(writer, 500, {"error": f"simulation failed: {error}"},
+                                keep_alive)
+            return
+
+        await self._send(writer, _status_line(200, keep_alive, {
+            "Content-Type": "application/x-ndjson", "Transfer-Encoding": "chunked"}))
+        for frame in frames:
+            await self._send(writer, b"%x\r\n%s\r\n" % (len(frame), frame))
+        await self._send(writer, b"0\r\n\r\n")
+
+    async def _respond(self, writer, status, obj, keep_alive):
+        """Send a small JSON response with Content-Length."""
+        body = json.dumps(obj, allow_nan=False).encode()
+        await self._send(writer, _status_line(status, keep_alive, {
+            "Content-Type": "application/json", "Content-Length": str(len(body))}) + body)
+
+    async def _serve_websocket(self, reader, writer, headers):
+        key = headers.get("sec-websocket-key")
+        if key is None:
+            await self._respond(writer, 400, {"error": "missing Sec-WebSocket-Key"}, False)
+            return
+        accept = base64.b64encode(hashlib.sha1((key + _WS_GUID).encode()).digest()).decode()
+        writer.write(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+                     b"Connection: Upgrade\r\nSec-WebSocket-Accept: %s\r\n\r\n"
+                     % accept.encode())
+
+        lock = asyncio.Lock()
+        slots = asyncio.Semaphore(self.max_streams)
+        tasks = set()
+
+        async def send_message(payload, opcode=0x1):
+            async with lock:
+                await self._send(writer, _ws_frame(payload, opcode))
+
+        async def stream(message):
+            try:
+                request_id = None
+                try:
+                    raw = json.loads(message, parse_constant=_reject_constant)
+                    if not isinstance(raw, dict):
+                        raise ValueError("message must be a JSON object")
+                    request_id = raw.pop("id", None)
+                    params = normalize_params(raw)
+                except ValueError as error:
+                    self.counters["requests"] += 1
+                    self.counters["rejected"] += 1
+                    reason = str(error)
+                else:
+                    reason = None
+                    try:
+                        frames = await self.simulate(params)
+                    except ServiceBusy as error:
+                        reason = str(error)
+                    except Exception as error:
+                        self.counters["errors"] += 1
+                        reason = f"simulation failed: {error}"
+                if reason is not None:
+                    await send_message(json.dumps({"id": request_id, "type": "error",
+                                                   "error": reason}).encode())
+                    return
+                prefix = b'{"id":%s,' % json.dumps(request_id).encode()
+                for frame in frames:
+                    # Splice the id into the shared pre-encoded frame
+                    await send_message(prefix + frame[1:-1])
+            except ConnectionError:
+                writer.close()
+            finally:
+                slots.release()
+
+        try:
+            while True:
+                opcode, payload = await _read_ws_message(reader)
+                if opcode == 0x8:  # close
+                    await send_message(payload[:2], opcode=0x8)
+                    break
+                if opcode == 0x9:  # ping
+                    await send_message(payload, opcode=0xA)
+                elif opcode == 0x1:
+                    # Stop reading (TCP backpressure) while max_streams are busy
+                    await slots.acquire()
+                    task = asyncio.ensure_future(stream(payload))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+async def _read_request(reader, max_body=2**20):
+    """
+    Parse one HTTP request: (method, target, headers, body), or None at EOF.
+
+    Raises BadRequest for a malformed request line or Content-Length.
+    """
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as error:
+        if not error.partial.strip():
+            return None
+        raise
+    lines = head.decode("latin-1").split("\r\n")
+    request_line = lines[0].split(" ")
+    if len(request_line) != 3 or not request_line[2].startswith("HTTP/"):
+        raise BadRequest(f"malformed request line {lines[0][:80]!r}")
+    method, target, _ = request_line
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise BadRequest(f"invalid Content-Length {headers['content-length'][:40]!r}")
+    if length < 0:
+        raise BadRequest("negative Content-Length")
+    if length > max_body:
+        raise ConnectionError("request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method, target, headers, body
+
+
+def _status_line(status, keep_alive, headers):
+    lines = [f"HTTP/1.1 {status} {_REASONS[status]}"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    lines.append("Connection: " + ("keep-alive" if keep_alive else "close"))
+    return ("\r\n".join(lines) + "\r\n\r\n").encode()
+
+
+def _ws_frame(payload, opcode=0x1):
+    """Unmasked server-to-client WebSocket frame."""
+    n = len(payload)
+    if n < 126:
+        header = struct.pack("!BB", 0x80 | opcode, n)
+    elif n < 2**16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, n)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, n)
+    return header + payload
+
+
+async def _read_ws_message(reader, max_size=2**20):
+    """Read one (possibly fragmented) client message: (opcode, payload)."""
+    message_opcode, parts, size = None, [], 0
+    while True:
+        first, second = await reader.readexactly(2)
+        opcode, length = first & 0x0F, second & 0x7F
+        if length == 126:
+            length, = struct.unpack("!H", await reader.readexactly(2))
+        elif length == 127:
+            length, = struct.unpack("!Q", await reader.readexactly(8))
+        size += length
+        if size > max_size:
+            raise ConnectionError("WebSocket message too large")
+        mask = await reader.readexactly(4) if second & 0x80 else b"\0\0\0\0"
+        data = bytearray(await reader.readexactly(length))
+        for i in range(4):
+            data[i::4] = bytes(b ^ mask[i] for b in data[i::4])
+        if opcode >= 0x8:
+            return opcode, bytes(data)  # control frames are never fragmented
+        if opcode:
+            message_opcode = opcode
+        parts.append(bytes(data))
+        if first & 0x80:
+            return message_opcode, b"".join(parts)
+
+
+def main():
+    """Run the service until interrupted (Ctrl-C or SIGTERM)."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve heat transfer simulations "
+                                                 "over HTTP and WebSocket")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--send-timeout", type=float, default=10.0)
+    args = parser.parse_args()
+
+    async def serve():
+        service = SimulationService(max_workers=args.workers, chunk_size=args.chunk_size,
+                                    send_timeout=args.send_timeout)
+        server = await service.start(args.host, args.port)
+        print(f"Serving on http://{args.host}:{args.port} "
+              f"({service.max_workers} workers)", flush=True)
+        serving = asyncio.ensure_future(server.serve_forever())
+        # SIGTERM (e.g. from a supervisor) shuts down like Ctrl-C, so the
+        # worker pool and its forkserver do not outlive the service
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, serving.cancel)
+        try:
+            async with server:
+                await serving
+        except asyncio.CancelledError:
+            pass
+        finally:
+            await service.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
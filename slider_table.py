@@ -0,0 +1,167 @@
+"""
+Precomputed Slider Lookup Table
+===============================
+Bakes every combination of the InteractiveVisualizer slider positions into a
+memory-mapped table so slider moves load a row instead of simulating.
+
+The table is compact because most of a trajectory is reconstructed from a
+few numbers: under explicit Euler, ΔT_n / ΔT_0 = (1 - k*dt)**n only depends
+on h and the mass ratio, and energy conservation then gives T_hot, T_cold,
+Q and the heat flux exactly. Only S_gen_cumulative depends on all four
+sliders, and it is stored decimated as float32.
+
+Usage:
+    python slider_table.py bake slider_table/ --decimate 10
+    python irreversible_heat_transfer.py --table slider_table/
+"""
+
+import json
+import os
+import time
+
+import numpy as np
+
+from batch_simulation import BatchHeatTransfer
+
+# Slider domains of InteractiveVisualizer.setup_sliders: (start, stop, step)
+SLIDER_GRID = {
+    "T_hot": (310, 500, 10),
+    "T_cold": (250, 400, 10),
+    "h": (10, 200, 10),
+    "mass_ratio": (0.2, 5.0, 0.1),
+}
+
+
+def _axis(start, stop, step):
+    """Slider positions, including the end point."""
+    return start + step * np.arange(int(round((stop - start) / step)) + 1)
+
+
+def bake(directory, decimate=10, c_p=1000, m_cold=1.0, dt=0.1, t_max=200,
+         verbose=True):
+    """
+    Precompute the lookup table for every slider combination.
+
+    Parameters:
+    -----------
+    directory : str
+        Output directory (created if missing)
+    decimate : int
+        Keep every decimate-th time step
+    c_p, m_cold, dt, t_max : float
+        Fixed simulation parameters the table is valid for
+    """
+    os.makedirs(directory, exist_ok=True)
+    axes = {name: _axis(*spec) for name, spec in SLIDER_GRID.items()}
+    T_hot, T_cold, h, ratio = (axes[name] for name in SLIDER_GRID)
+    n = np.arange(len(np.arange(0, t_max, dt)))[::decimate]
+
+    # ΔT / ΔT_0 for every (h, mass ratio) pair
+    k = h[:, None] * (1 / (ratio[None, :] * m_cold * c_p) + 1 / (m_cold * c_p))
+    decay = (1 - k[..., None] * dt) ** n
+    np.save(os.path.join(directory, "decay.npy"), decay)
+
+    # S_gen_cumulative for every combination, one T_hot slab at a time
+    s_gen = np.lib.format.open_memmap(
+        os.path.join(directory, "s_gen.npy"), mode='w+', dtype=np.float32,
+        shape=(len(T_hot), len(T_cold), len(h), len(ratio), len(n)))
+    grid = np.meshgrid(T_cold, h, ratio, indexing='ij')
+    start = time.perf_counter()
+    for i, T in enumerate(T_hot):
+        batch = BatchHeatTransfer(T, grid[0].ravel(), grid[1].ravel(),
+                                  mass_hot=grid[2].ravel() * m_cold, mass_cold=m_cold,
+                                  c_p=c_p, dt=dt, t_max=t_max)
+        batch.run(fields=("S_gen_cumulative",), decimate=decimate)
+        s_gen[i] = batch.S_gen_cumulative.reshape(s_gen.shape[1:])
+        if verbose:
+            print(f"  T_hot = {T:.0f} K done ({time.perf_counter() - start:.1f} s)")
+    s_gen.flush()
+    del s_gen
+
+    meta = {
+        "axes": {name: list(map(float, SLIDER_GRID[name])) for name in SLIDER_GRID},
+        "decimate": decimate, "c_p": c_p, "m_cold": m_cold, "dt": dt, "t_max": t_max,
+    }
+    with open(os.path.join(directory, "meta.json"), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+
+class SliderLookupTable:
+    """Read-only view of a baked table; rows are loaded zero-copy from disk."""
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.axes = {name: _axis(*spec) for name, spec in self.meta["axes"].items()}
+        self.decay = np.load(os.path.join(directory, "decay.npy"), mmap_mode='r')
+        self.s_gen = np.load(os.path.join(directory, "s_gen.npy"), mmap_mode='r')
+        self.time = (np.arange(self.decay.shape[-1]) * self.meta["decimate"]
+                     * self.meta["dt"])
+
+    def _index(self, name, value):
+        """Grid index of a slider value, or None if it is off the grid."""
+        start, _, step = self.meta["axes"][name]
+        i = int(round((value - start) / step))
+        values = self.axes[name]
+        if 0 <= i < len(values) and abs(values[i] - value) <= 1e-9 * max(1.0, abs(value)):
+            return i
+        return None
+
+    def fill(self, sim):
+        """
+        Load sim's trajectory from the table.
+
+        Returns False (leaving sim untouched) when the parameters are not
+        covered: off-grid values, a different c_p / m_cold / dt / t_max,
+        property tables, the Isolated system type, or an engine other than
+        'Loop'/'Vectorized'.
+        The arrays hold the decimated samples only.
+        """
+        meta = self.meta
+        if (sim.system_type == "Isolated" or sim.engine not in ("Loop", "Vectorized")
+                or sim.c_p_table is not None or sim.h_table is not None
+                or sim.c_p != meta["c_p"] or sim.m_cold != meta["m_cold"]
+                or sim.dt != meta["dt"] or sim.t_max != meta["t_max"]):
+            return False
+        idx = [self._index(name, value) for name, value in
+               zip(SLIDER_GRID, (sim.T_hot_0, sim.T_cold_0, sim.h,
+                                 sim.m_hot / sim.m_cold))]
+        if None in idx:
+            return False
+        i_hot, i_cold, i_h, i_ratio = idx
+
+        C_hot, C_cold = sim.m_hot * sim.c_p, sim.m_cold * sim.c_p
+        dT_0 = sim.T_hot_0 - sim.T_cold_0
+        dT = dT_0 * self.decay[i_h, i_ratio]
+        # Energy conservation: (T_hot - T_cold) falls by Q * (1/C_hot + 1/C_cold)
+        Q = (dT_0 - dT) / (1 / C_hot + 1 / C_cold)
+        sim.time = self.time
+        sim.T_hot = sim.T_hot_0 - Q / C_hot
+        sim.T_cold = sim.T_cold_0 + Q / C_cold
+        sim.Q_transferred = Q
+        sim.heat_flux = sim.h * dT
+        sim.S_gen_cumulative = self.s_gen[i_hot, i_cold, i_h, i_ratio]
+        sim.n_steps = len(self.time)
+        sim.current_step = sim.n_steps - 1
+        return True
+
+
+def main():
+    """Command-line entry point: bake a table."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Precompute the slider lookup table.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    bake_parser = subparsers.add_parser("bake", help="precompute all slider combinations")
+    bake_parser.add_argument("directory")
+    bake_parser.add_argument("--decimate", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.command == "bake":
+        start = time.perf_counter()
+        bake(args.directory, decimate=args.decimate)
+        print(f"Table written to {args.directory} in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
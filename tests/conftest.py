@@ -0,0 +1,6 @@
+"""Make the flat top-level modules importable when pytest runs from anywhere."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
@@ -0,0 +1,54 @@
+"""BatchHeatTransfer against single IrreversibleHeatTransfer runs."""
+
+import numpy as np
+import pytest
+
+from batch_simulation import BatchHeatTransfer, simulate_batch
+from irreversible_heat_transfer import IrreversibleHeatTransfer
+
+T_HOT = np.array([400.0, 450.0, 350.0, 420.0, 400.0])
+H = np.array([50.0, 120.0, 2500.0, 5000.0, 10000.0])
+
+
+def single(T_hot, h, engine, t_max=50.0):
+    sim = IrreversibleHeatTransfer(T_hot, 300.0, engine=engine)
+    sim.h = h
+    sim.t_max = t_max
+    sim.reset_simulation()
+    sim.run_full_simulation()
+    return sim
+
+
+@pytest.mark.parametrize("engine,single_engine", [("Vectorized", "Loop"), ("Exact", "Exact")])
+def test_batch_matches_single_runs(engine, single_engine):
+    batch = simulate_batch(T_HOT[:3], 300.0, H[:3], engine=engine, t_max=50.0)
+    for i in range(3):
+        sim = single(T_HOT[i], H[i], single_engine)
+        np.testing.assert_allclose(batch.T_hot[i], sim.T_hot, rtol=1e-10)
+        np.testing.assert_allclose(batch.S_gen_cumulative[i], sim.S_gen_cumulative,
+                                   rtol=1e-10, atol=1e-12)
+        assert batch.S_gen_final[i] == pytest.approx(sim.S_gen_cumulative[-1])
+
+
+@pytest.mark.parametrize("engine,single_engine", [("Vectorized", "Loop"), ("Exact", "Exact")])
+def test_time_to_equilibrium_matches_trajectory_scan(engine, single_engine):
+    # k*dt = 0.01, 0.024, 0.5, 1 (Euler equilibrates in one step) and 2
+    # (Euler oscillates forever)
+    batch = BatchHeatTransfer(T_HOT, 300.0, H, engine=engine, t_max=50.0)
+    batch.run(store_trajectories=False, equilibrium_tol=0.01)
+    for i in range(len(H)):
+        sim = single(T_HOT[i], H[i], single_engine)
+        reached = np.flatnonzero(np.abs(sim.T_hot - sim.T_cold) <= 0.01)
+        expected = sim.time[reached[0]] if len(reached) else np.nan
+        np.testing.assert_allclose(batch.time_to_equilibrium[i], expected, err_msg=f"h={H[i]}")
+
+
+def test_decimated_fields_and_preallocated_output():
+    out = {"T_hot": np.empty((2, 50))}
+    batch = BatchHeatTransfer([400.0, 500.0], 300.0, engine="Exact", t_max=50.0)
+    batch.run(fields=("T_hot",), decimate=10, out=out)
+    full = BatchHeatTransfer([400.0, 500.0], 300.0, engine="Exact", t_max=50.0).run()
+    assert batch.T_hot is out["T_hot"]
+    np.testing.assert_array_equal(batch.T_hot, full.T_hot[:, ::10])
+    np.testing.assert_array_equal(batch.time_samples, full.time[::10])
+    assert batch.T_cold is None
@@ -0,0 +1,109 @@
+"""The simulation engines against each other and against the closed form."""
+
+import numpy as np
+import pytest
+
+from entropy_analysis import irreversible_outcome
+from irreversible_heat_transfer import IrreversibleHeatTransfer, equilibrium_temperature
+
+
+def run(engine, T_hot=420.0, T_cold=290.0, mass_hot=1.5, mass_cold=0.7, h=60.0,
+        dt=0.1, t_max=120.0, system_type="Closed", **kwargs):
+    sim = IrreversibleHeatTransfer(T_hot, T_cold, mass_hot, mass_cold, 1000,
+                                   system_type=system_type, engine=engine, **kwargs)
+    sim.h = h
+    sim.dt = dt
+    sim.t_max = t_max
+    sim.reset_simulation()
+    sim.run_full_simulation()
+    return sim
+
+
+def closed_form(t, T_hot=420.0, T_cold=290.0, mass_hot=1.5, mass_cold=0.7, h=60.0):
+    C_hot, C_cold = mass_hot * 1000, mass_cold * 1000
+    T_eq = equilibrium_temperature(T_hot, T_cold, mass_hot, mass_cold, 1000)
+    decay = np.exp(-h * (1 / C_hot + 1 / C_cold) * t)
+    return T_eq + (T_hot - T_eq) * decay, T_eq + (T_cold - T_eq) * decay
+
+
+FIELDS = ("T_hot", "T_cold", "Q_transferred", "S_gen_cumulative", "heat_flux")
+
+
+@pytest.mark.parametrize("system_type", ["Closed", "Isolated"])
+def test_vectorized_matches_loop(system_type):
+    loop = run("Loop", system_type=system_type)
+    vectorized = run("Vectorized", system_type=system_type)
+    assert vectorized.current_step == loop.current_step == loop.n_steps - 1
+    for name in FIELDS:
+        np.testing.assert_allclose(getattr(vectorized, name), getattr(loop, name),
+                                   rtol=1e-10, atol=1e-9, err_msg=name)
+
+
+def test_numba_backend_matches_python():
+    python = run("Loop")
+    compiled = run("Loop", backend="Numba")
+    for name in FIELDS:
+        np.testing.assert_allclose(getattr(compiled, name), getattr(python, name),
+                                   rtol=1e-12, atol=1e-9, err_msg=name)
+
+
+def test_exact_matches_closed_form():
+    sim = run("Exact")
+    T_hot, T_cold = closed_form(sim.time)
+    np.testing.assert_allclose(sim.T_hot, T_hot, rtol=1e-12)
+    np.testing.assert_allclose(sim.T_cold, T_cold, rtol=1e-12)
+
+
+def test_euler_converges_to_exact_at_first_order():
+    errors = []
+    for dt in (0.2, 0.1, 0.05):
+        sim = run("Vectorized", dt=dt)
+        T_hot, _ = closed_form(sim.time)
+        errors.append(np.abs(sim.T_hot - T_hot).max())
+    ratios = np.array(errors[:-1]) / np.array(errors[1:])
+    np.testing.assert_allclose(ratios, 2.0, rtol=0.1)
+
+
+def test_adaptive_matches_closed_form_and_stops_at_equilibrium():
+    sim = run("Adaptive", t_max=1e4)
+    T_hot, T_cold = closed_form(sim.time)
+    np.testing.assert_allclose(sim.T_hot, T_hot, atol=1e-3)
+    np.testing.assert_allclose(sim.T_cold, T_cold, atol=1e-3)
+    assert abs(sim.T_hot[-1] - sim.T_cold[-1]) <= sim.dT_tol
+    assert sim.time[-1] < sim.t_max
+    assert len(sim.time) == sim.n_steps == sim.current_step + 1
+
+
+@pytest.mark.parametrize("engine", ["Loop", "Vectorized", "Exact", "Adaptive"])
+def test_energy_balance_and_second_law(engine):
+    sim = run(engine)
+    n = sim.current_step + 1
+    # Heat leaving the hot reservoir is the heat transferred
+    np.testing.assert_allclose(1500 * (420.0 - sim.T_hot[:n]), sim.Q_transferred[:n],
+                               rtol=1e-6, atol=1e-6)
+    np.testing.assert_allclose(1500 * sim.T_hot[:n] + 700 * sim.T_cold[:n],
+                               1500 * 420.0 + 700 * 290.0, rtol=1e-12)
+    # Non-decreasing up to the adaptive engine's absolute tolerance (1e-6)
+    assert np.all(np.diff(sim.S_gen_cumulative[:n]) >= -1e-6)
+
+
+def test_exact_entropy_generation_approaches_closed_form():
+    sim = run("Exact", t_max=2000.0, dt=1.0)
+    outcome = irreversible_outcome(420.0, 290.0, 1.5, 0.7, 1000)
+    # S_gen is integrated with the rectangle rule of step(); dt = 1 s
+    assert sim.S_gen_cumulative[-1] == pytest.approx(outcome.S_gen, rel=2e-2)
+    assert sim.Q_transferred[-1] == pytest.approx(outcome.Q, rel=1e-9)
+
+
+def test_isolated_system_does_not_exchange_heat():
+    sim = run("Vectorized", system_type="Isolated")
+    assert np.all(sim.T_hot == 420.0) and np.all(sim.T_cold == 290.0)
+    assert np.all(sim.S_gen_cumulative == 0.0)
+
+
+def test_closed_form_engines_reject_property_tables():
+    from material_properties import PropertyTable
+    table = PropertyTable.from_polynomial([800, 0.8], 200, 600)
+    sim = IrreversibleHeatTransfer(engine="Exact", c_p_table=table)
+    with pytest.raises(ValueError):
+        sim.run_full_simulation()
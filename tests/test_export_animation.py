@@ -0,0 +1,37 @@
+"""Headless export: frames rendered in parallel from one simulation run."""
+
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip("matplotlib")
+pytest.importorskip("PIL")
+
+from export_animation import export_animation, export_figure
+from irreversible_heat_transfer import IrreversibleHeatTransfer
+
+
+def short_sim():
+    sim = IrreversibleHeatTransfer(400, 300, system_type="Closed", engine="Vectorized")
+    sim.t_max = 20.0
+    sim.reset_simulation()
+    return sim
+
+
+@pytest.mark.parametrize("render_mode", ["Blit", "Redraw"])
+def test_workers_do_not_resimulate(tmp_path, monkeypatch, render_mode):
+    parent = os.getpid()
+    run = IrreversibleHeatTransfer.run_full_simulation
+
+    def run_in_parent_only(sim):
+        # Forked workers inherit the patch; simulating there is the bug
+        assert os.getpid() == parent, "a render worker re-ran the simulation"
+        return run(sim)
+
+    monkeypatch.setattr(IrreversibleHeatTransfer, "run_full_simulation", run_in_parent_only)
+    n_frames = export_animation(short_sim(), str(tmp_path), steps_per_frame=50, dpi=20,
+                                max_workers=2, render_mode=render_mode)
+    assert n_frames == 5
+    assert sorted(os.listdir(tmp_path)) == [f"frame_{i:06d}.png" for i in range(5)]
+
@@ -0,0 +1,110 @@
+"""branch() and advance_to(): mid-run parameter changes."""
+
+import numpy as np
+import pytest
+
+from irreversible_heat_transfer import IrreversibleHeatTransfer, equilibrium_temperature
+from simulation_cache import SimulationCache
+
+FIELDS = ("T_hot", "T_cold", "Q_transferred", "S_gen_cumulative", "heat_flux")
+FIXED_STEP = [("Loop", "Python"), ("Loop", "Numba"), ("Vectorized", "Python"),
+              ("Exact", "Python")]
+
+
+def make(engine, backend="Python", t_max=60.0):
+    sim = IrreversibleHeatTransfer(410, 290, 1.3, 0.9, engine=engine, backend=backend)
+    sim.t_max = t_max
+    sim.reset_simulation()
+    return sim
+
+
+@pytest.mark.parametrize("engine,backend", FIXED_STEP)
+def test_advance_to_in_pieces_matches_full_run(engine, backend):
+    full = make(engine, backend)
+    full.run_full_simulation()
+    sim = make(engine, backend)
+    for stop in (1, 17, 250, 251, sim.n_steps + 10):
+        sim.advance_to(stop)
+    for name in FIELDS:
+        np.testing.assert_allclose(getattr(sim, name), getattr(full, name),
+                                   rtol=1e-10, atol=1e-9, err_msg=name)
+
+
+@pytest.mark.parametrize("engine,backend", FIXED_STEP)
+def test_branch_matches_a_run_that_changed_h_at_the_same_step(engine, backend):
+    branched = make(engine, backend)
+    branched.run_full_simulation()
+    branched.branch(200)
+    branched.h = 90
+    branched.advance_to(branched.n_steps - 1)
+
+    reference = make(engine, backend)
+    reference.advance_to(200)
+    reference.h = 90
+    reference.advance_to(reference.n_steps - 1)
+    for name in FIELDS:
+        np.testing.assert_allclose(getattr(branched, name), getattr(reference, name),
+                                   rtol=1e-10, atol=1e-9, err_msg=name)
+
+
+def test_branched_euler_engines_agree():
+    results = []
+    for engine, backend in (("Loop", "Python"), ("Vectorized", "Python")):
+        sim = make(engine, backend)
+        sim.run_full_simulation()
+        sim.branch(123)
+        sim.m_hot = 2.0
+        sim.advance_to(sim.n_steps - 1)
+        results.append(sim)
+    for name in FIELDS:
+        np.testing.assert_allclose(getattr(results[1], name), getattr(results[0], name),
+                                   rtol=1e-10, atol=1e-9, err_msg=name)
+
+
+def test_branch_recomputes_equilibrium_from_the_branch_state():
+    sim = make("Vectorized")
+    sim.run_full_simulation()
+    sim.m_hot = 3.0
+    sim.branch(100)
+    assert sim.current_step == 100
+    assert sim.T_eq == pytest.approx(equilibrium_temperature(
+        sim.T_hot[100], sim.T_cold[100], 3.0, 0.9, 1000))
+
+
+def test_branch_beyond_the_computed_prefix_is_rejected():
+    sim = make("Vectorized")
+    sim.advance_to(10)
+    with pytest.raises(ValueError):
+        sim.branch(11)
+
+
+@pytest.mark.parametrize("engine,backend", FIXED_STEP + [("Adaptive", "Python")])
+def test_advance_to_reports_completion_on_the_last_sample(engine, backend):
+    reference = make(engine, backend)
+    reference.run_full_simulation()
+    last = reference.current_step
+    sim = make(engine, backend)
+    assert sim.advance_to(last - 1) is True
+    assert sim.advance_to(last) is False
+    assert sim.advance_to(last + 5) is False
+    assert sim.current_step == last
+
+
+def test_adaptive_branch_after_cache_hit():
+    cache = SimulationCache()
+    cache.run(make("Adaptive", t_max=1e4))
+    sim = make("Adaptive", t_max=1e4)
+    cache.run(sim)
+    assert cache.stats()["hits"] == 1
+    sim.branch(5)
+    sim.h = 80
+    assert sim.advance_to(10**6) is False
+
+    # From sample 5 on the run follows the analytic decay with h = 80
+    t_5 = sim.time[5]
+    T_eq = equilibrium_temperature(sim.T_hot[5], sim.T_cold[5], 1.3, 0.9, 1000)
+    k = 80 * (1 / 1300 + 1 / 900)
+    n = sim.current_step + 1
+    expected = T_eq + (sim.T_hot[5] - T_eq) * np.exp(-k * (sim.time[5:n] - t_5))
+    np.testing.assert_allclose(sim.T_hot[5:n], expected, atol=1e-3)
+    assert abs(sim.T_hot[n - 1] - sim.T_cold[n - 1]) <= sim.dT_tol
@@ -0,0 +1,47 @@
+"""iter_chunks() against a full run_full_simulation()."""
+
+import numpy as np
+import pytest
+
+from irreversible_heat_transfer import IrreversibleHeatTransfer, TrajectoryChunk
+
+
+def make(engine, t_max=53.7, dt=0.1):
+    sim = IrreversibleHeatTransfer(430, 280, 1.2, 0.8, engine=engine)
+    sim.h = 70
+    sim.dt = dt
+    sim.t_max = t_max
+    sim.reset_simulation()
+    return sim
+
+
+def collect(sim, **kwargs):
+    chunks = [TrajectoryChunk(*(np.array(column) for column in chunk))
+              for chunk in sim.iter_chunks(**kwargs)]
+    return chunks, TrajectoryChunk(*(np.concatenate(c) for c in zip(*chunks)))
+
+
+@pytest.mark.parametrize("engine", ["Loop", "Vectorized", "Exact"])
+@pytest.mark.parametrize("chunk_size,decimate,block_size",
+                         [(1024, 1, 8192), (100, 1, 64), (7, 3, 50), (64, 10, 10)])
+def test_chunks_match_full_run(engine, chunk_size, decimate, block_size):
+    sim = make(engine)
+    chunks, streamed = collect(sim, chunk_size=chunk_size, decimate=decimate,
+                               block_size=block_size)
+    sim.run_full_simulation()
+    assert all(len(chunk.time) == chunk_size for chunk in chunks[:-1])
+    assert 0 < len(chunks[-1].time) <= chunk_size
+    np.testing.assert_allclose(streamed.time, sim.time[::decimate], rtol=1e-12, atol=1e-12)
+    for name in TrajectoryChunk._fields[1:]:
+        np.testing.assert_allclose(getattr(streamed, name), getattr(sim, name)[::decimate],
+                                   rtol=1e-9, atol=1e-9, err_msg=name)
+
+
+def test_chunks_reuse_one_buffer():
+    chunks = list(make("Exact").iter_chunks(chunk_size=10))
+    assert np.shares_memory(chunks[0].T_hot, chunks[1].T_hot)
+
+
+def test_adaptive_engine_is_rejected():
+    with pytest.raises(ValueError):
+        next(make("Adaptive").iter_chunks())
@@ -0,0 +1,61 @@
+"""fit_traces recovers the parameters of synthetic traces."""
+
+import numpy as np
+import pytest
+
+from batch_simulation import BatchHeatTransfer
+from entropy_analysis import irreversible_outcome
+from parameter_fitting import array_source, csv_source, fit_traces
+
+H = np.array([20.0, 45.0, 80.0, 130.0])
+MASS_HOT = np.array([0.5, 1.0, 2.0, 1.3])
+T_HOT = np.array([360.0, 400.0, 450.0, 420.0])
+C_P = 1000.0
+
+
+def traces(noise=0.0, seed=0):
+    batch = BatchHeatTransfer(T_HOT, 300.0, h=H, mass_hot=MASS_HOT, engine="Exact",
+                              dt=0.5, t_max=150)
+    batch.run()
+    rng = np.random.default_rng(seed)
+    return (batch.time, batch.T_hot + noise * rng.standard_normal(batch.T_hot.shape),
+            batch.T_cold + noise * rng.standard_normal(batch.T_cold.shape))
+
+
+def test_exact_traces_are_recovered():
+    fit = fit_traces(array_source(*traces()), C_cold=C_P)
+    assert fit.converged.all()
+    np.testing.assert_allclose(fit.h, H, rtol=1e-6)
+    np.testing.assert_allclose(fit.C_hot, MASS_HOT * C_P, rtol=1e-6)
+    np.testing.assert_allclose(fit.T_hot_0, T_HOT, atol=1e-6)
+    expected = irreversible_outcome(T_HOT, 300.0, MASS_HOT, 1.0, C_P).S_gen
+    np.testing.assert_allclose(fit.S_gen, expected, rtol=1e-6)
+
+
+def test_noisy_traces_small_chunks_and_padding():
+    t, T_hot, T_cold = traces(noise=0.05)
+    # Trace 0 stops recording after 100 s
+    T_hot[0, 200:] = T_cold[0, 200:] = np.nan
+    fit = fit_traces(array_source(t, T_hot, T_cold, chunk_size=37), C_cold=C_P)
+    assert fit.converged.all()
+    assert fit.n_samples[0] == 200
+    np.testing.assert_allclose(fit.h, H, rtol=0.02)
+    np.testing.assert_allclose(fit.rms, 0.05, rtol=0.2)
+
+
+def test_csv_source_matches_array_source(tmp_path):
+    t, T_hot, T_cold = traces(noise=0.05)
+    paths = []
+    for i in range(2):
+        path = tmp_path / f"rig{i}.csv"
+        np.savetxt(path, np.column_stack([t, T_hot[i], T_cold[i]]), delimiter=",",
+                   header="time,T_hot,T_cold", comments="")
+        paths.append(str(path))
+    from_csv = fit_traces(csv_source(paths, chunk_size=50), h=H[:2])
+    from_arrays = fit_traces(array_source(t, T_hot[:2], T_cold[:2]), h=H[:2])
+    np.testing.assert_allclose(from_csv.C_hot, from_arrays.C_hot, rtol=1e-9)
+
+
+def test_more_than_one_scale_is_rejected():
+    with pytest.raises(ValueError, match="at most one"):
+        fit_traces(array_source(*traces()), h=50.0, C_cold=C_P)
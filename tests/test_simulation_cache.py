@@ -0,0 +1,55 @@
+"""SimulationCache hits, misses, eviction and the on-disk tier."""
+
+import numpy as np
+
+from irreversible_heat_transfer import IrreversibleHeatTransfer
+from simulation_cache import SimulationCache, simulation_key
+
+
+def make(h=50, engine="Vectorized", t_max=20.0):
+    sim = IrreversibleHeatTransfer(400, 300, engine=engine)
+    sim.h = h
+    sim.t_max = t_max
+    sim.reset_simulation()
+    return sim
+
+
+def test_hit_returns_the_same_trajectory():
+    cache = SimulationCache()
+    first = cache.run(make())
+    second = cache.run(make())
+    assert cache.stats()["misses"] == 1 and cache.stats()["hits"] == 1
+    np.testing.assert_array_equal(second.T_hot, first.T_hot)
+    assert second.current_step == second.n_steps - 1
+    # The simulation gets a copy: writing to it leaves the cache intact
+    second.T_hot[:] = 0
+    assert cache.run(make()).T_hot[0] == 400
+
+
+def test_key_normalizes_numbers_and_sees_every_parameter():
+    assert simulation_key(make(h=50)) == simulation_key(make(h=50.0))
+    assert simulation_key(make(h=50)) != simulation_key(make(h=51))
+    assert simulation_key(make()) != simulation_key(make(engine="Exact"))
+
+
+def test_lru_eviction_within_the_byte_budget():
+    entry_bytes = 6 * 200 * 8
+    cache = SimulationCache(max_bytes=2 * entry_bytes)
+    for h in (10, 20, 30):
+        cache.run(make(h=h))
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["evictions"] == 1
+    assert stats["nbytes"] <= cache.max_bytes
+    cache.run(make(h=30))
+    cache.run(make(h=10))  # evicted first, simulated again
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 4
+
+
+def test_disk_tier_survives_a_new_cache(tmp_path):
+    SimulationCache(directory=str(tmp_path)).run(make())
+    cache = SimulationCache(directory=str(tmp_path))
+    sim = cache.run(make())
+    assert cache.stats()["disk_hits"] == 1 and cache.stats()["misses"] == 0
+    reference = make()
+    reference.run_full_simulation()
+    np.testing.assert_array_equal(sim.T_hot, reference.T_hot)
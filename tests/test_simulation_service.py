@@ -0,0 +1,195 @@
+"""simulation_service: HTTP parsing, validation and request handling."""
+
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from simulation_service import BadRequest, SimulationService, _read_request, normalize_params
+
+
+def parse(raw):
+    """Run _read_request over raw bytes."""
+    async def read():
+        reader = asyncio.StreamReader()
+        reader.feed_data(raw)
+        reader.feed_eof()
+        return await _read_request(reader)
+    return asyncio.run(read())
+
+
+def test_read_request_parses_method_target_headers_and_body():
+    method, target, headers, body = parse(
+        b"POST /simulate HTTP/1.1\r\nContent-Length: 9\r\nX-Test: a:b\r\n\r\n{\"h\": 80}")
+    assert (method, target, body) == ("POST", "/simulate", b'{"h": 80}')
+    assert headers["x-test"] == "a:b"
+
+
+def test_read_request_returns_none_at_eof():
+    assert parse(b"") is None
+
+
+@pytest.mark.parametrize("raw", [
+    b"GARBAGE\r\n\r\n",
+    b"GET /simulate\r\n\r\n",
+    b"GET /a b HTTP/1.1\r\n\r\n",
+    b"GET /stats FTP/1.0\r\n\r\n",
+    b"POST /simulate HTTP/1.1\r\nContent-Length: abc\r\n\r\n",
+    b"POST /simulate HTTP/1.1\r\nContent-Length: -5\r\n\r\n",
+])
+def test_read_request_rejects_malformed_requests(raw):
+    with pytest.raises(BadRequest):
+        parse(raw)
+
+
+def serve(client):
+    """Run client(port, service) against a service with a thread pool."""
+    async def main():
+        service = SimulationService(max_workers=1)
+        service.pool.shutdown()  # no worker processes in the tests
+        service.pool = ThreadPoolExecutor(2)
+        server = await service.start(port=0)
+        try:
+            return await client(server.sockets[0].getsockname()[1], service)
+        finally:
+            await service.close()
+    return asyncio.run(main())
+
+
+async def exchange(port, raw):
+    """Send raw bytes, read until the server closes; returns (status, headers, body)."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(raw)
+    response = await asyncio.wait_for(reader.read(), 10)
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    lines = head.decode().split("\r\n")
+    headers = dict(line.lower().split(": ", 1) for line in lines[1:])
+    if headers.get("transfer-encoding") == "chunked":
+        chunks = []
+        while True:
+            size, _, body = body.partition(b"\r\n")
+            size = int(size, 16)
+            if size == 0:
+                break
+            chunks.append(body[:size])
+            body = body[size + 2:]
+        body = b"".join(chunks)
+    return int(lines[0].split()[1]), headers, body
+
+
+def post(params, connection="close"):
+    body = json.dumps(params).encode() if isinstance(params, dict) else params
+    return (b"POST /simulate HTTP/1.1\r\nContent-Length: %d\r\nConnection: %s\r\n\r\n%s"
+            % (len(body), connection.encode(), body))
+
+
+@pytest.mark.parametrize("raw", [
+    b"GARBAGE\r\n\r\n",
+    b"POST /simulate HTTP/1.1\r\nContent-Length: abc\r\n\r\n",
+    b"POST /simulate HTTP/1.1\r\nContent-Length: -1\r\n\r\n",
+])
+def test_malformed_request_gets_400_and_the_connection_is_closed(raw):
+    async def client(port, service):
+        # exchange() reads to EOF, so it also checks that the server closes
+        status, headers, body = await exchange(port, raw)
+        return status, headers, json.loads(body), service.stats()
+
+    status, headers, body, stats = serve(client)
+    assert status == 400
+    assert headers["connection"] == "close"
+    assert "error" in body
+    assert stats["rejected"] == 1
+
+
+def test_simulate_streams_meta_data_and_end():
+    async def client(port, service):
+        return await exchange(port, post({"h": 80, "t_max": 20, "decimate": 10}))
+
+    status, headers, body = serve(client)
+    assert status == 200 and headers["content-type"] == "application/x-ndjson"
+    frames = [json.loads(line) for line in body.splitlines()]
+    assert [frame["type"] for frame in frames] == ["meta", "data", "end"]
+    assert frames[0]["params"]["h"] == 80.0
+    assert len(frames[1]["T_hot"]) == frames[0]["n_samples"] == 20
+
+
+@pytest.mark.parametrize("params", [
+    {"h": -1}, {"h": "nan"}, {"T_hot_initial": "inf"}, {"mass_hot": 0},
+    {"engine": "Magic"}, {"colour": "red"}, {"dt": 0.1, "t_max": 1e6}, b'{"h": NaN}', b"[1]",
+])
+def test_invalid_parameters_get_400(params):
+    async def client(port, service):
+        return await exchange(port, post(params))
+
+    status, _, body = serve(client)
+    assert status == 400 and "error" in json.loads(body)
+
+
+def test_routes_and_methods():
+    async def client(port, service):
+        missing = await exchange(port, b"GET /nowhere HTTP/1.1\r\nConnection: close\r\n\r\n")
+        wrong = await exchange(port, b"PUT /simulate HTTP/1.1\r\nConnection: close\r\n\r\n")
+        stats = await exchange(port, b"GET /stats HTTP/1.1\r\nConnection: close\r\n\r\n")
+        return missing[0], wrong[0], stats
+
+    missing, wrong, stats = serve(client)
+    assert (missing, wrong) == (404, 405)
+    assert stats[0] == 200 and "requests" in json.loads(stats[2])
+
+
+def test_identical_requests_share_one_run_and_the_cache():
+    async def client(port, service):
+        raw = post({"t_max": 50, "decimate": 5})
+        first = await asyncio.gather(*(exchange(port, raw) for _ in range(4)))
+        again = await exchange(port, raw)
+        return first + [again], service.stats()
+
+    responses, stats = serve(client)
+    assert len({body for _, _, body in responses}) == 1
+    assert stats["computed"] == 1
+    assert stats["coalesced"] + stats["cache_hits"] == 4
+
+
+def test_worker_failure_gets_500(monkeypatch):
+    import simulation_service
+
+    def fail(params, chunk_size):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(simulation_service, "simulate_frames", fail)
+
+    async def client(port, service):
+        return await exchange(port, post({})), service.stats()
+
+    (status, _, body), stats = serve(client)
+    assert status == 500 and "boom" in json.loads(body)["error"]
+    assert stats["errors"] == 1
+
+
+def test_unstable_euler_time_step_gets_400():
+    async def client(port, service):
+        unstable = await exchange(port, post({"h": 1e5}))
+        exact = await exchange(port, post({"h": 1e5, "engine": "Exact", "t_max": 1}))
+        return unstable, exact
+
+    (status, _, body), exact = serve(client)
+    assert status == 400 and "unstable" in json.loads(body)["error"]
+    assert exact[0] == 200
+
+
+def test_stability_limit():
+    # k = h * 2 / 1000, so k*dt = 2 at h = 1e4 with dt = 0.1
+    normalize_params({"h": 9999})
+    with pytest.raises(ValueError, match="unstable"):
+        normalize_params({"h": 1e4})
+    normalize_params({"h": 1e4, "engine": "Exact"})
+    normalize_params({"h": 1e4, "system_type": "Isolated"})
+    normalize_params({"h": 1e4, "dt": 0.05})
+
+
+def test_normalize_params_fills_defaults_and_converts_types():
+    params = normalize_params({"T_hot_initial": "450", "decimate": "4"})
+    assert params["T_hot_initial"] == 450.0 and params["decimate"] == 4
+    assert params["engine"] == "Vectorized"
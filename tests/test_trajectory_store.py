@@ -0,0 +1,84 @@
+"""TrajectoryStore round trips through .npy files and Arrow."""
+
+import gc
+
+import numpy as np
+import pytest
+
+from batch_simulation import BatchHeatTransfer
+from trajectory_store import TrajectoryStore
+
+
+@pytest.fixture
+def store():
+    store = TrajectoryStore(n_samples=200, dt=0.1, decimate=10)
+    store.run_batch(BatchHeatTransfer(np.linspace(350, 450, 7), 300,
+                                      h=np.linspace(20, 80, 7)))
+    return store
+
+
+def assert_same_runs(loaded, store):
+    assert len(loaded) == len(store)
+    np.testing.assert_array_equal(loaded.buffer[:, :len(loaded)], store.buffer[:, :len(store)])
+    np.testing.assert_array_equal(loaded.params, store.params)
+    assert loaded.fields == store.fields and loaded.dtype == store.dtype
+
+
+def test_npy_round_trip_is_memory_mapped(store, tmp_path):
+    store.save(tmp_path)
+    loaded = TrajectoryStore.load(tmp_path)
+    assert isinstance(loaded.buffer, np.memmap)
+    assert_same_runs(loaded, store)
+
+
+def test_load_arrow_is_zero_copy(store, tmp_path):
+    pytest.importorskip("pyarrow")
+    path = str(tmp_path / "runs.arrow")
+    store.save_arrow(path)
+    loaded = TrajectoryStore.load_arrow(path)
+    # A read-only view of the mapped file, valid after the file object is gone
+    assert not loaded.buffer.flags.writeable and not loaded.buffer.flags.owndata
+    gc.collect()
+    assert_same_runs(loaded, store)
+    np.testing.assert_array_equal(loaded[3].S_gen_cumulative,
+                                  store.column("S_gen_cumulative")[3])
+
+
+@pytest.mark.parametrize("fields", [("T_hot",), ("T_hot", "heat_flux")])
+def test_load_arrow_field_subsets(tmp_path, fields):
+    pytest.importorskip("pyarrow")
+    store = TrajectoryStore(n_samples=200, dt=0.1, decimate=10, fields=fields,
+                            dtype=np.float64)
+    store.run_batch(BatchHeatTransfer(np.linspace(350, 450, 5), 300))
+    path = str(tmp_path / "runs.arrow")
+    store.save_arrow(path)
+    loaded = TrajectoryStore.load_arrow(path)
+    assert not loaded.buffer.flags.writeable
+    assert_same_runs(loaded, store)
+
+
+def test_appending_to_a_zero_copy_store_reallocates(store, tmp_path):
+    pytest.importorskip("pyarrow")
+    path = str(tmp_path / "runs.arrow")
+    store.save_arrow(path)
+    loaded = TrajectoryStore.load_arrow(path)
+    loaded.run_batch(BatchHeatTransfer([500.0], 300))
+    assert len(loaded) == len(store) + 1 and loaded.buffer.flags.writeable
+    np.testing.assert_array_equal(loaded.buffer[:, :len(store)], store.buffer[:, :len(store)])
+
+
+def test_from_arrow_copies_chunked_tables(store):
+    pa = pytest.importorskip("pyarrow")
+    table = store.to_arrow()
+    chunked = pa.concat_tables([table.slice(0, 3), table.slice(3)])
+    loaded = TrajectoryStore.from_arrow(chunked, copy=False)
+    assert loaded.buffer.flags.writeable
+    assert_same_runs(loaded, store)
+    assert TrajectoryStore.from_arrow(table).buffer.flags.writeable
+
+
+def test_parquet_round_trip(store, tmp_path):
+    pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "runs.parquet")
+    store.save_parquet(path)
+    assert_same_runs(TrajectoryStore.load_parquet(path), store)
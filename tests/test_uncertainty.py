@@ -0,0 +1,100 @@
+"""Monte Carlo propagation: sampling and streaming percentile bands."""
+
+import warnings
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from batch_simulation import BatchHeatTransfer
+from uncertainty import INPUTS, InputSampler, StreamingQuantiles, propagate
+
+DISTRIBUTIONS = {"T_hot_initial": stats.norm(400, 5), "h": stats.uniform(40, 20),
+                 "c_p": stats.lognorm(0.05, scale=1000), "mass_hot": stats.uniform(0.5, 1)}
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def brute_force(method, n_samples, chunk_size, seed, fields):
+    """Every sample drawn the way propagate() draws them, simulated at once."""
+    sampler = InputSampler(DISTRIBUTIONS, method=method, seed=seed)
+    parts = [sampler.draw(min(chunk_size, n_samples - start))
+             for start in range(0, n_samples, chunk_size)]
+    inputs = [np.concatenate([np.broadcast_to(part[name], len(part["h"])) for part in parts])
+              for name in INPUTS]
+    batch = BatchHeatTransfer(*inputs, engine="Exact", t_max=100)
+    return batch.run(fields=fields, decimate=10)
+
+
+@pytest.mark.parametrize("method", ["lhs", "sobol", "random"])
+def test_bands_match_np_percentile(method):
+    fields = ("T_hot", "S_gen_cumulative")
+    result = propagate(DISTRIBUTIONS, n_samples=6000, method=method, seed=1,
+                       percentiles=PERCENTILES, fields=fields, chunk_size=1024, t_max=100)
+    batch = brute_force(method, 6000, 1024, 1, fields)
+    np.testing.assert_array_equal(result.time_samples, batch.time_samples)
+    for name in fields:
+        values = getattr(batch, name)
+        expected = np.percentile(values, PERCENTILES, axis=0)
+        # Within a couple of histogram bins (bin = 2 x spread / 2048)
+        tolerance = 4 * np.ptp(values, axis=0) / 2048 + 1e-9
+        assert np.all(np.abs(result.bands[name] - expected) <= tolerance), name
+        np.testing.assert_allclose(result.mean[name], values.mean(axis=0), rtol=1e-9)
+        np.testing.assert_allclose(result.std[name], values.std(axis=0),
+                                   rtol=1e-5, atol=1e-9)
+    np.testing.assert_allclose(result.final["S_gen_final"]["bands"],
+                               np.percentile(batch.S_gen_final, PERCENTILES),
+                               atol=4 * np.ptp(batch.S_gen_final) / 2048)
+
+
+def test_small_chunks_do_not_degrade_the_bands():
+    result = propagate(DISTRIBUTIONS, n_samples=2000, method="random", seed=3,
+                       percentiles=PERCENTILES, fields=("T_hot",), chunk_size=1, t_max=10)
+    batch = brute_force("random", 2000, 1, 3, ("T_hot",))
+    expected = np.percentile(batch.T_hot[:, 0], PERCENTILES)
+    np.testing.assert_allclose(result.bands["T_hot"][:, 0], expected, atol=0.05)
+
+
+def test_time_to_equilibrium_is_conditional_on_reaching_it():
+    result = propagate({"h": stats.uniform(5, 95)}, n_samples=3000, method="lhs", seed=0,
+                       fields=("T_hot",), t_max=60)
+    final = result.final["time_to_equilibrium"]
+    assert 0 < final["count"] < result.n_samples
+    assert np.all(final["bands"] <= 60)
+
+
+def test_sampling_is_seeded_and_respects_fixed_inputs():
+    a = InputSampler(DISTRIBUTIONS, method="sobol", seed=7).draw(256)
+    b = InputSampler(DISTRIBUTIONS, method="sobol", seed=7).draw(256)
+    np.testing.assert_array_equal(a["h"], b["h"])
+    assert a["T_cold_initial"] == 300.0
+    assert np.all((a["h"] >= 40) & (a["h"] <= 60))
+    # A Latin hypercube puts exactly one sample in each of n equal strata
+    u = stats.uniform(40, 20).cdf(InputSampler({"h": stats.uniform(40, 20)},
+                                               method="lhs", seed=2).draw(100)["h"])
+    assert sorted(np.floor(u * 100).astype(int)) == list(range(100))
+
+
+def test_unknown_inputs_and_methods_are_rejected():
+    with pytest.raises(ValueError):
+        InputSampler({"viscosity": stats.norm()})
+    with pytest.raises(ValueError):
+        InputSampler({}, method="grid")
+
+
+def test_streaming_quantiles_warn_when_the_range_was_too_narrow():
+    estimator = StreamingQuantiles(n_bins=64, warmup=4)
+    rng = np.random.default_rng(0)
+    for i in range(500):
+        estimator.update(rng.normal(size=(1, 3)) * (1 + i / 10))
+    with pytest.warns(RuntimeWarning):
+        estimator.quantiles([0.05])
+
+
+def test_streaming_quantiles_before_warmup_completes():
+    estimator = StreamingQuantiles()
+    estimator.update(np.arange(10.0)[:, None])
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        # Inverse-CDF convention: the median of 0..9 lies between 4 and 5
+        assert 4 <= estimator.quantiles([0.5])[0, 0] <= 5
+    assert estimator.mean()[0] == pytest.approx(4.5)
@@ -0,0 +1,41 @@
+"""The 'Blit' render mode against the 'Redraw' reference."""
+
+import pytest
+
+matplotlib = pytest.importorskip("matplotlib")
+matplotlib.use("Agg")
+
+from irreversible_heat_transfer import InteractiveVisualizer, IrreversibleHeatTransfer
+
+
+def visualizer(render_mode):
+    sim = IrreversibleHeatTransfer(400, 300, system_type="Closed", engine="Vectorized")
+    vis = InteractiveVisualizer(sim=sim, interactive=False, render_mode=render_mode)
+    vis.fig.canvas.draw()
+    return vis
+
+
+def redraw_shows_flow(vis):
+    # plot_reservoir_visual adds the arrow as a third patch
+    return len(vis.ax_visual.patches) == 3
+
+
+def test_blit_flow_arrow_follows_the_displayed_temperatures():
+    import matplotlib.pyplot as plt
+
+    blit, redraw = visualizer("Blit"), visualizer("Redraw")
+    # Equilibrium reached exactly halfway: no more heat flow after it
+    for vis in (blit, redraw):
+        sim = vis.sim
+        half = sim.n_steps // 2
+        sim.T_hot[half:] = sim.T_cold[half:] = sim.T_eq
+    for step, flows in ((0, True), (blit.sim.n_steps // 2, False), (1, True)):
+        blit.sim.current_step = redraw.sim.current_step = step
+        blit.blit_frame()
+        redraw.plot_all()
+        assert redraw_shows_flow(redraw) is flows
+        assert blit.flow_arrow.get_visible() is flows
+        assert blit.flow_text.get_visible() is flows
+        # Animated artists must not force a full redraw of the figure
+        assert not blit.fig.stale
+    plt.close("all")
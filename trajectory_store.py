@@ -0,0 +1,339 @@
+"""
+Compact Trajectory Storage
+==========================
+Keeps many simulation runs in one contiguous (n_fields, n_runs, n_samples)
+buffer of a selectable dtype. Each field is a contiguous (n_runs, n_samples)
+block that is handed out as a zero-copy view, the time axis is computed
+from dt on demand instead of being stored, and the per-run parameters
+live in a small structured array next to it.
+
+With float32 and every 10th sample, 10⁵ runs of the default 200 s
+simulation take about 400 MB. A store saves to a directory of .npy files
+that load back memory-mapped (no parsing, pages are read on access), or
+to Arrow IPC / Parquet when pyarrow is installed. Arrow IPC files load
+back as zero-copy views of the memory-mapped file as well; Parquet is
+always decoded into memory.
+
+Usage:
+    store = TrajectoryStore(n_samples=200, dt=0.1, decimate=10)
+    store.run_batch(BatchHeatTransfer(T_hot, T_cold, h=h))
+    store.append(sim)
+    store.column("S_gen_cumulative")[:, -1]
+    store.save("runs/"); store = TrajectoryStore.load("runs/")
+"""
+
+import json
+import os
+
+import numpy as np
+
+from irreversible_heat_transfer import TRAJECTORY_FIELDS
+
+# Per-run parameters stored alongside the trajectories
+PARAM_FIELDS = ("T_hot_0", "T_cold_0", "m_hot", "m_cold", "c_p", "h")
+PARAM_DTYPE = np.dtype([(name, np.float64) for name in PARAM_FIELDS])
+
+
+def _stack_views(views):
+    """
+    One (n_fields, n_runs, n_samples) view over equally shaped field views.
+
+    Works without copying when the fields are evenly spaced in memory, as
+    the column buffers of an Arrow IPC file are; returns None otherwise.
+    """
+    first = views[0]
+    addresses = [view.__array_interface__["data"][0] for view in views]
+    step = addresses[1] - addresses[0] if len(views) > 1 else first.nbytes
+    if step < first.nbytes or any(b - a != step for a, b in zip(addresses, addresses[1:])):
+        return None
+    return np.lib.stride_tricks.as_strided(first, (len(views),) + first.shape,
+                                           (step,) + first.strides, writeable=False)
+
+
+class Trajectory:
+    """Zero-copy view of one stored run; fields are attributes."""
+
+    def __init__(self, buffer, fields, time, params):
+        self._buffer = buffer
+        self.fields = fields
+        self._time = time
+        self.params = params
+
+    def __getattr__(self, name):
+        fields = self.__dict__.get("fields", ())
+        if name in fields:
+            return self._buffer[fields.index(name)]
+        raise AttributeError(name)
+
+    @property
+    def time(self):
+        return self._time()
+
+    def fill(self, sim):
+        """
+        Load this run into an IrreversibleHeatTransfer for display.
+
+        Fields that were not stored are left as zeros; the arrays are
+        float64 copies, so sim may modify them freely.
+        """
+        sim.time = self.time
+        sim.n_steps = len(sim.time)
+        for name in TRAJECTORY_FIELDS:
+            values = np.zeros(sim.n_steps)
+            if name in self.fields:
+                values[:] = getattr(self, name)
+            setattr(sim, name, values)
+        sim.current_step = sim.n_steps - 1
+
+
+class TrajectoryStore:
+    """Many equally sampled runs in one contiguous buffer."""
+
+    def __init__(self, n_samples, dt, decimate=1, fields=TRAJECTORY_FIELDS,
+                 dtype=np.float32, capacity=16):
+        """
+        Parameters:
+        -----------
+        n_samples : int
+            Samples per run (after decimation)
+        dt : float
+            Simulation time step (s)
+        decimate : int
+            Runs are stored every decimate-th step
+        fields : sequence of str
+            Which of TRAJECTORY_FIELDS to keep
+        dtype : numpy dtype
+            np.float32 (half the memory, ~7 significant digits) or np.float64
+        capacity : int
+            Initial number of runs allocated; grows by doubling
+        """
+        unknown = set(fields) - set(TRAJECTORY_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fields {sorted(unknown)}, expected {TRAJECTORY_FIELDS}")
+        self.fields = tuple(fields)
+        self.n_samples = n_samples
+        self.dt = dt
+        self.decimate = decimate
+        self.buffer = np.zeros((len(self.fields), capacity, n_samples), dtype=dtype)
+        self._params = np.zeros(capacity, dtype=PARAM_DTYPE)
+        self.n_runs = 0
+
+    @property
+    def dtype(self):
+        return self.buffer.dtype
+
+    @property
+    def time(self):
+        """Sample times (s), computed from dt and decimate."""
+        return np.arange(self.n_samples) * (self.dt * self.decimate)
+
+    @property
+    def params(self):
+        """Structured array of the per-run parameters (PARAM_FIELDS)."""
+        return self._params[:self.n_runs]
+
+    @property
+    def nbytes(self):
+        """Bytes used by the stored runs."""
+        return (self.n_runs * (len(self.fields) * self.n_samples * self.dtype.itemsize
+                               + PARAM_DTYPE.itemsize))
+
+    def __len__(self):
+        return self.n_runs
+
+    def __getitem__(self, k):
+        if not -self.n_runs <= k < self.n_runs:
+            raise IndexError(f"run {k} out of range for {self.n_runs} runs")
+        k %= self.n_runs
+        return Trajectory(self.buffer[:, k], self.fields, lambda: self.time, self._params[k])
+
+    def column(self, name):
+        """(n_runs, n_samples) view of one field."""
+        return self.buffer[self.fields.index(name), :self.n_runs]
+
+    def reserve(self, n_runs):
+        """Make room for n_runs in total (one reallocation, capacity doubles)."""
+        capacity = self.buffer.shape[1]
+        if n_runs <= capacity:
+            return
+        capacity = max(n_runs, 2 * capacity)
+        buffer = np.zeros((len(self.fields), capacity, self.n_samples), dtype=self.dtype)
+        buffer[:, :self.n_runs] = self.buffer[:, :self.n_runs]
+        params = np.zeros(capacity, dtype=PARAM_DTYPE)
+        params[:self.n_runs] = self._params[:self.n_runs]
+        self.buffer, self._params = buffer, params
+
+    def shrink_to_fit(self):
+        """Release the unused capacity."""
+        self.buffer = np.ascontiguousarray(self.buffer[:, :self.n_runs])
+        self._params = self._params[:self.n_runs].copy()
+
+    def append(self, sim):
+        """Store a finished fixed-step IrreversibleHeatTransfer run; returns its index."""
+        if sim.engine == "Adaptive":
+            raise ValueError("stored runs share one time axis; the 'Adaptive' "
+                             "engine has variable time steps")
+        if sim.dt != self.dt:
+            raise ValueError(f"run has dt={sim.dt}, the store expects dt={self.dt}")
+        n = len(sim.time[::self.decimate])
+        if n != self.n_samples:
+            raise ValueError(f"run has {n} samples, the store expects {self.n_samples}")
+        k = self.n_runs
+        self.reserve(k + 1)
+        for row, name in enumerate(self.fields):
+            self.buffer[row, k] = getattr(sim, name)[::self.decimate]
+        self._params[k] = tuple(float(getattr(sim, name)) for name in PARAM_FIELDS)
+        self.n_runs += 1
+        return k
+
+    def run_batch(self, batch, **run_kwargs):
+        """
+        Run a BatchHeatTransfer straight into the store.
+
+        The batch writes its trajectories into views of the buffer, so no
+        intermediate float64 copy of the whole batch is made. Returns the
+        index range of the new runs.
+        """
+        if batch.dt != self.dt:
+            raise ValueError(f"batch has dt={batch.dt}, the store expects dt={self.dt}")
+        if len(batch.time[::self.decimate]) != self.n_samples:
+            raise ValueError("batch sample count does not match the store")
+        start = self.n_runs
+        stop = start + batch.n_cases
+        self.reserve(stop)
+        out = {name: self.buffer[row, start:stop] for row, name in enumerate(self.fields)}
+        batch.run(fields=self.fields, decimate=self.decimate, out=out, **run_kwargs)
+        for name in PARAM_FIELDS:
+            self._params[name][start:stop] = getattr(batch, name)
+        self.n_runs = stop
+        return range(start, stop)
+
+    def _meta(self):
+        return {"fields": list(self.fields), "n_samples": self.n_samples, "dt": self.dt,
+                "decimate": self.decimate, "dtype": self.dtype.str, "n_runs": self.n_runs}
+
+    def save(self, directory):
+        """Write trajectories.npy, params.npy and meta.json to directory."""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "trajectories.npy"), self.buffer[:, :self.n_runs])
+        np.save(os.path.join(directory, "params.npy"), self.params)
+        with open(os.path.join(directory, "meta.json"), "w") as f:
+            json.dump(self._meta(), f, indent=2)
+
+    @classmethod
+    def load(cls, directory, mmap_mode="r"):
+        """
+        Open a saved store; with mmap_mode the buffer is memory-mapped.
+
+        Use mmap_mode='c' for a writable copy-on-write view or None to read
+        everything into memory.
+        """
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        store = cls.__new__(cls)
+        store.fields = tuple(meta["fields"])
+        store.n_samples = meta["n_samples"]
+        store.dt = meta["dt"]
+        store.decimate = meta["decimate"]
+        store.buffer = np.load(os.path.join(directory, "trajectories.npy"), mmap_mode=mmap_mode)
+        store._params = np.load(os.path.join(directory, "params.npy"))
+        store.n_runs = meta["n_runs"]
+        return store
+
+    def to_arrow(self):
+        """
+        pyarrow Table with one row per run.
+
+        Parameters are float64 columns; every field is a fixed-size list
+        column built zero-copy on top of the buffer.
+        """
+        import pyarrow as pa
+        columns = {name: pa.array(np.ascontiguousarray(self.params[name]))
+                   for name in PARAM_FIELDS}
+        for name in self.fields:
+            values = pa.array(np.ascontiguousarray(self.column(name)).ravel())
+            columns[name] = pa.FixedSizeListArray.from_arrays(values, self.n_samples)
+        metadata = {"trajectory_store": json.dumps(self._meta())}
+        return pa.table(columns).replace_schema_metadata(metadata)
+
+    @classmethod
+    def from_arrow(cls, table, copy=True):
+        """
+        Rebuild a store from a table written by to_arrow().
+
+        With copy=False the buffer is a read-only view of the table's
+        memory where the layout allows it: every field a single chunk
+        without nulls, of the stored dtype, and the fields evenly spaced in
+        memory (as in a file from save_arrow()). Otherwise the fields are
+        copied into a new buffer. The per-run parameters are always copied.
+        """
+        meta = json.loads(table.schema.metadata[b"trajectory_store"])
+        dtype = np.dtype(meta["dtype"])
+        shape = (table.num_rows, meta["n_samples"])
+        buffer = None if copy else cls._arrow_views(table, meta["fields"], shape, dtype)
+        store = cls(meta["n_samples"], meta["dt"], decimate=meta["decimate"],
+                    fields=meta["fields"], dtype=dtype,
+                    capacity=table.num_rows if buffer is None else 0)
+        if buffer is None:
+            for row, name in enumerate(store.fields):
+                values = table.column(name).combine_chunks().flatten()
+                store.buffer[row] = values.to_numpy().reshape(shape)
+        else:
+            store.buffer = buffer
+            store._params = np.zeros(table.num_rows, dtype=PARAM_DTYPE)
+            # The views do not own their memory; keep the table alive with them
+            store._arrow_table = table
+        for name in PARAM_FIELDS:
+            store._params[name] = table.column(name).to_numpy()
+        store.n_runs = table.num_rows
+        return store
+
+    @staticmethod
+    def _arrow_views(table, fields, shape, dtype):
+        """Zero-copy (n_fields, n_runs, n_samples) view of the field columns, or None."""
+        views = []
+        for name in fields:
+            chunks = table.column(name).chunks
+            if len(chunks) != 1:
+                return None
+            try:
+                values = chunks[0].flatten().to_numpy(zero_copy_only=True)
+            except ValueError:
+                # pyarrow.ArrowInvalid: nulls need a copy
+                return None
+            if values.dtype != dtype:
+                return None
+            views.append(values.reshape(shape))
+        return _stack_views(views) if views else None
+
+    def save_arrow(self, path):
+        """Write an Arrow IPC file (memory-mappable)."""
+        import pyarrow as pa
+        table = self.to_arrow()
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    @classmethod
+    def load_arrow(cls, path, copy=False):
+        """
+        Open an Arrow IPC file through a memory map.
+
+        By default the buffer is a read-only view of the mapped file (see
+        from_arrow), so pages are read on access like load(); appending
+        reallocates first. copy=True reads everything into memory.
+        """
+        import pyarrow as pa
+        source = pa.memory_map(path, "r")
+        # The mapping stays open while the table's buffers reference it
+        return cls.from_arrow(pa.ipc.open_file(source).read_all(), copy=copy)
+
+    def save_parquet(self, path):
+        """Write a Parquet file (compressed, for archiving and exchange)."""
+        import pyarrow.parquet as pq
+        pq.write_table(self.to_arrow(), path)
+
+    @classmethod
+    def load_parquet(cls, path):
+        """Read a Parquet file written by save_parquet()."""
+        import pyarrow.parquet as pq
+        return cls.from_arrow(pq.read_table(path))
@@ -0,0 +1,307 @@
+"""
+Uncertainty Propagation: Irreversible Heat Transfer
+===================================================
+Monte Carlo propagation of uncertain inputs through the batched
+simulation. Each of T_hot_initial, T_cold_initial, mass_hot, mass_cold,
+c_p and h is either a fixed number or a distribution with a ppf (inverse
+CDF), e.g. a frozen scipy.stats distribution. Samples are drawn on the
+unit hypercube by a seeded Latin hypercube or scrambled Sobol design (or
+plain pseudo-random numbers) and mapped through the ppfs.
+
+Samples are simulated chunk by chunk with BatchHeatTransfer and folded
+into streaming per-time-step quantile estimators, so memory stays at
+O(chunk_size * n_times + n_bins * n_times) whatever the number of samples:
+10⁶ samples never exist as trajectories at the same time.
+
+The estimator is a fixed-bin histogram per time step and field. Its range
+is taken from the first n_bins samples (buffered across chunks) with a
+margin on both sides; values beyond it land in two overflow bins bounded
+by the exact running minimum and maximum. Ranks are exact, so a
+percentile is resolved to within one bin width (about 0.1 % of the spread
+with the defaults). A percentile that falls into an overflow bin is only
+interpolated between the range edge and the extreme value; the estimator
+warns when that happens.
+
+Usage:
+    from scipy import stats
+    result = propagate({"T_hot_initial": stats.norm(400, 5),
+                        "h": stats.uniform(40, 20),
+                        "c_p": stats.lognorm(0.05, scale=1000)},
+                       n_samples=10**6, method="sobol", seed=0)
+    result.bands["S_gen_cumulative"]     # (n_percentiles, n_times)
+"""
+
+import warnings
+
+import numpy as np
+from scipy.stats import qmc
+
+from batch_simulation import BatchHeatTransfer
+
+# Uncertain inputs, named as the BatchHeatTransfer parameters
+INPUTS = ("T_hot_initial", "T_cold_initial", "h", "mass_hot", "mass_cold", "c_p")
+INPUT_DEFAULTS = {"T_hot_initial": 400.0, "T_cold_initial": 300.0, "h": 50.0,
+                  "mass_hot": 1.0, "mass_cold": 1.0, "c_p": 1000.0}
+
+SAMPLING_METHODS = ("lhs", "sobol", "random")
+
+
+class InputSampler:
+    """
+    Chunked, seeded sampler of the uncertain inputs.
+
+    Successive draw() calls continue one design: the Sobol sequence carries
+    on where the previous chunk ended, and every 'lhs' chunk is a Latin
+    hypercube of its own.
+    """
+
+    def __init__(self, distributions, method="lhs", seed=None):
+        """
+        Parameters:
+        -----------
+        distributions : dict
+            Input name (see INPUTS) -> number or object with a ppf(u) method;
+            inputs not listed keep INPUT_DEFAULTS
+        method : str
+            'lhs' (Latin hypercube), 'sobol' (scrambled Sobol) or 'random'
+        seed : int, optional
+            Seed of the design, for reproducible results
+        """
+        unknown = set(distributions) - set(INPUTS)
+        if unknown:
+            raise ValueError(f"Unknown inputs {sorted(unknown)}, expected some of {INPUTS}")
+        if method not in SAMPLING_METHODS:
+            raise ValueError(f"Unknown method '{method}', expected one of {SAMPLING_METHODS}")
+        self.values = dict(INPUT_DEFAULTS)
+        self.values.update(distributions)
+        self.uncertain = [name for name in INPUTS if hasattr(self.values[name], "ppf")]
+        self.method = method
+        d = max(len(self.uncertain), 1)
+        if method == "lhs":
+            self.engine = qmc.LatinHypercube(d, seed=seed)
+        elif method == "sobol":
+            self.engine = qmc.Sobol(d, scramble=True, seed=seed)
+        else:
+            self.engine = np.random.default_rng(seed)
+
+    def draw(self, n):
+        """Next n samples as a dict of (n,) arrays (fixed inputs stay scalars)."""
+        if self.method == "random":
+            u = self.engine.random((n, max(len(self.uncertain), 1)))
+        elif self.method == "sobol":
+            # A final chunk that is not a power of two only loses balance
+            # within that chunk; the points before it are unaffected.
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", UserWarning)
+                u = self.engine.random(n)
+        else:
+            u = self.engine.random(n)
+        samples = dict(self.values)
+        for i, name in enumerate(self.uncertain):
+            samples[name] = np.asarray(self.values[name].ppf(u[:, i]), dtype=float)
+        return samples
+
+
+class StreamingQuantiles:
+    """
+    Per-column quantiles of a stream of (n_rows, n_columns) blocks.
+
+    One histogram of n_bins equal bins per column, plus an underflow and
+    an overflow bin bounded by the exact running minimum and maximum.
+    Rows are buffered until at least `warmup` (default n_bins) have
+    arrived; the range is then fixed from them, widened by `margin` of
+    their spread on both sides. Also tracks the running mean and standard
+    deviation.
+    """
+
+    def __init__(self, n_bins=2048, margin=0.5, warmup=None):
+        self.n_bins = n_bins
+        self.margin = margin
+        self.warmup = n_bins if warmup is None else warmup
+        self.counts = None
+        self.count = 0
+        self._pending = []
+
+    def update(self, block):
+        """Add the rows of a (n_rows, n_columns) block."""
+        block = np.asarray(block, dtype=float)
+        self.count += len(block)
+        if self.counts is None:
+            self._pending.append(block)
+            if self.count >= self.warmup:
+                self._fix_range()
+            return
+        self._add(block)
+
+    def _fix_range(self):
+        """Set the histogram range from the buffered rows and bin them."""
+        block = np.concatenate(self._pending)
+        self._pending = []
+        n_columns = block.shape[1]
+        low, high = block.min(axis=0), block.max(axis=0)
+        pad = self.margin * (high - low)
+        # Columns without spread get a tiny range around their value
+        pad = np.maximum(pad, 1e-9 * np.maximum(np.abs(low), 1.0))
+        self.low = low - pad
+        self.width = (high + pad - self.low) / self.n_bins
+        self.counts = np.zeros((n_columns, self.n_bins + 2), dtype=np.int64)
+        self.minimum = np.full(n_columns, np.inf)
+        self.maximum = np.full(n_columns, -np.inf)
+        self.sum = np.zeros(n_columns)
+        self.sum_sq = np.zeros(n_columns)
+        self._add(block)
+
+    def _add(self, block):
+        n_columns = block.shape[1]
+        # Bin 0 is the underflow, bin n_bins + 1 the overflow
+        bins = np.floor((block - self.low) / self.width)
+        np.clip(bins, -1, self.n_bins, out=bins)
+        bins = bins.astype(np.int64) + 1
+        bins += np.arange(n_columns) * (self.n_bins + 2)
+        self.counts += np.bincount(bins.ravel(), minlength=self.counts.size).reshape(
+            self.counts.shape)
+        np.minimum(self.minimum, block.min(axis=0), out=self.minimum)
+        np.maximum(self.maximum, block.max(axis=0), out=self.maximum)
+        self.sum += block.sum(axis=0)
+        self.sum_sq += np.einsum("ij,ij->j", block, block)
+
+    def quantiles(self, q):
+        """
+        Estimated quantiles, (len(q), n_columns), for q in [0, 1].
+
+        Linear interpolation inside the bin holding the target rank; the
+        overflow bins span the running minimum / maximum. Warns when a
+        quantile falls into an overflow bin, i.e. the data drifted outside
+        the range fixed after warmup and the estimate is coarse.
+        """
+        if self.counts is None:
+            self._fix_range()
+        q = np.atleast_1d(np.asarray(q, dtype=float))
+        n_columns = self.counts.shape[0]
+        # Bin edges per column, including the running extremes
+        edges = self.low[:, None] + self.width[:, None] * np.arange(self.n_bins + 1)
+        edges = np.column_stack([np.minimum(self.minimum, edges[:, 0]), edges,
+                                 np.maximum(self.maximum, edges[:, -1])])
+        cdf = np.cumsum(self.counts, axis=1)
+        rows = np.arange(n_columns)
+        out = np.empty((len(q), n_columns))
+        for i, p in enumerate(q):
+            target = p * self.count
+            b = np.minimum((cdf < target).sum(axis=1), self.n_bins + 1)
+            below = np.where(b > 0, cdf[rows, b - 1], 0)
+            inside = self.counts[rows, b]
+            frac = np.where(inside > 0, (target - below) / np.maximum(inside, 1), 0.0)
+            out[i] = edges[rows, b] + frac * (edges[rows, b + 1] - edges[rows, b])
+            if ((b == 0) | (b == self.n_bins + 1)).any():
+                warnings.warn(f"quantile {p:g} lies outside the histogram range fixed "
+                              f"after {self.warmup} rows; increase warmup or margin",
+                              RuntimeWarning, stacklevel=2)
+        return np.clip(out, self.minimum, self.maximum)
+
+    def mean(self):
+        if self.counts is None:
+            self._fix_range()
+        return self.sum / self.count
+
+    def std(self):
+        if self.counts is None:
+            self._fix_range()
+        variance = self.sum_sq / self.count - self.mean() ** 2
+        return np.sqrt(np.maximum(variance, 0.0))
+
+
+class UncertaintyResult:
+    """
+    Percentile bands of a Monte Carlo run.
+
+    bands[field] is a (len(percentiles), n_times) array on time_samples;
+    mean[field] and std[field] are (n_times,) arrays. final[name] holds the
+    same statistics for the scalar outputs T_eq, S_gen_final and
+    time_to_equilibrium as dicts with 'bands', 'mean', 'std' and 'count'
+    (samples summarized). time_to_equilibrium only covers the samples that
+    reach equilibrium within t_max, so its bands are conditional on that;
+    'count' / n_samples is the fraction that did.
+    """
+
+    def __init__(self, time_samples, percentiles, estimators, n_samples, method):
+        self.time_samples = time_samples
+        self.percentiles = np.asarray(percentiles, dtype=float)
+        self.n_samples = n_samples
+        self.method = method
+        q = self.percentiles / 100
+        self.bands, self.mean, self.std = {}, {}, {}
+        self.final = {}
+        for name, estimator in estimators.items():
+            if estimator.count == 0:
+                continue
+            if name.startswith("final:"):
+                self.final[name[6:]] = {"bands": estimator.quantiles(q)[:, 0],
+                                        "mean": estimator.mean()[0],
+                                        "std": estimator.std()[0],
+                                        "count": estimator.count}
+            else:
+                self.bands[name] = estimator.quantiles(q)
+                self.mean[name] = estimator.mean()
+                self.std[name] = estimator.std()
+
+
+def propagate(distributions, n_samples=10**5, method="lhs", seed=None,
+              percentiles=(5, 25, 50, 75, 95),
+              fields=("T_hot", "T_cold", "S_gen_cumulative"), chunk_size=4096,
+              decimate=10, n_bins=2048, system_type="Closed", engine="Exact",
+              dt=0.1, t_max=200):
+    """
+    Propagate uncertain inputs through the simulation.
+
+    Parameters:
+    -----------
+    distributions : dict
+        Input name -> number or distribution with ppf(), see InputSampler
+    n_samples : int
+        Number of Monte Carlo samples
+    method : str
+        'lhs', 'sobol' or 'random'
+    seed : int, optional
+        Seed of the sampling design
+    percentiles : sequence of float
+        Percentiles (0-100) of the returned bands
+    fields : sequence of str
+        Trajectory fields to summarize (see TRAJECTORY_FIELDS)
+    chunk_size : int
+        Samples simulated together; bounds the trajectory memory
+    decimate : int
+        Summarize every decimate-th time step
+    n_bins : int
+        Histogram bins per time step of the quantile estimators
+    system_type, engine, dt, t_max :
+        As for BatchHeatTransfer ('Exact' or 'Vectorized' engine)
+
+    Returns:
+    --------
+    UncertaintyResult
+    """
+    sampler = InputSampler(distributions, method=method, seed=seed)
+    estimators = {name: StreamingQuantiles(n_bins) for name in fields}
+    estimators.update((f"final:{name}", StreamingQuantiles(n_bins))
+                      for name in ("T_eq", "S_gen_final", "time_to_equilibrium"))
+    time_samples = None
+    done = 0
+    while done < n_samples:
+        n = min(chunk_size, n_samples - done)
+        samples = sampler.draw(n)
+        # Fixed inputs broadcast against the sampled ones; np.full keeps n
+        # cases when every input is fixed
+        batch = BatchHeatTransfer(np.full(n, samples["T_hot_initial"]),
+                                  *(samples[name] for name in INPUTS[1:]),
+                                  system_type=system_type, engine=engine, dt=dt, t_max=t_max)
+        batch.run(fields=fields, decimate=decimate, chunk_size=256)
+        time_samples = batch.time_samples
+        for name in fields:
+            estimators[name].update(getattr(batch, name))
+        for name in ("T_eq", "S_gen_final"):
+            estimators[f"final:{name}"].update(getattr(batch, name)[:, None])
+        reached = batch.time_to_equilibrium[~np.isnan(batch.time_to_equilibrium)]
+        if len(reached):
+            estimators["final:time_to_equilibrium"].update(reached[:, None])
+        done += n
+    return UncertaintyResult(time_samples, percentiles, estimators, n_samples, method)